@@ -1,13 +1,20 @@
 from __future__ import annotations
 
-import io
 import json
-import zipfile
+import os
+import secrets
+import shutil
+import time
 from pathlib import Path
 
 import streamlit as st
 
-from excel_translator.processor import process_excel_file
+from excel_translator.batch import count_inputs, default_jobs
+from excel_translator.job_queue import CANCELLED, JobQueue
+from excel_translator.jobs import COMPLETED, FAILED, JobStore
+from excel_translator.logging_utils import TranslationLog
+from excel_translator.metrics import otel_json, prometheus_text
+from excel_translator.translation_memory import TranslationMemory
 
 LANGUAGES = {
     "English": "en",
@@ -19,20 +26,120 @@ LANGUAGES = {
     "Japanese": "ja",
 }
 
+LOG_PAGE_SIZES = [50, 200, 1000]
+UPLOAD_CHUNK_BYTES = 1024 * 1024
 
-def _extract_excel_files(uploaded_files: list) -> list[tuple[str, bytes]]:
-    extracted: list[tuple[str, bytes]] = []
-    for up in uploaded_files:
-        name = up.name
-        data = up.read()
-        if name.lower().endswith(".xlsx"):
-            extracted.append((name, data))
-        elif name.lower().endswith(".zip"):
-            with zipfile.ZipFile(io.BytesIO(data), "r") as zf:
-                for member in zf.infolist():
-                    if member.filename.lower().endswith(".xlsx"):
-                        extracted.append((Path(member.filename).name, zf.read(member.filename)))
-    return extracted
+
+@st.cache_resource
+def _translation_memory() -> TranslationMemory | None:
+    path = os.getenv("TRANSLATION_MEMORY_PATH")
+    if not path:
+        return None
+    max_age_days = os.getenv("TRANSLATION_MEMORY_MAX_AGE_DAYS")
+    return TranslationMemory(
+        path,
+        max_entries=int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "1000000")),
+        max_age_seconds=float(max_age_days) * 86400 if max_age_days else None,
+    )
+
+
+def _spool_uploads(uploaded_files: list, dest: Path) -> list[str]:
+    """Copy uploads to ``dest`` in chunks; each gets its own sub-directory so equal names cannot clash."""
+    paths: list[str] = []
+    for i, up in enumerate(uploaded_files):
+        if not up.name.lower().endswith((".xlsx", ".zip")):
+            continue
+        target = dest / str(i) / Path(up.name).name
+        target.parent.mkdir(parents=True)
+        up.seek(0)
+        with open(target, "wb") as out:
+            shutil.copyfileobj(up, out, UPLOAD_CHUNK_BYTES)
+        paths.append(str(target))
+    return paths
+
+
+@st.cache_resource
+def _job_store() -> JobStore:
+    return JobStore()
+
+
+@st.cache_resource
+def _job_queue() -> JobQueue:
+    # Opening the shared store once applies the configured eviction limits before workers attach to it.
+    _translation_memory()
+    return JobQueue(_job_store(), memory_path=os.getenv("TRANSLATION_MEMORY_PATH") or None)
+
+
+def _owner() -> str:
+    """Who the queue schedules this browser's jobs for; kept in the URL so a refresh keeps it."""
+    if "owner" not in st.query_params:
+        st.query_params["owner"] = secrets.token_hex(4)
+    return st.query_params["owner"]
+
+
+def _submit(job_id: str) -> None:
+    _job_queue().submit(job_id, owner=_owner(), max_workers=jobs)
+    st.query_params["job"] = job_id
+    st.session_state.pop("last_run", None)
+
+
+def _load_run(store: JobStore, job_id: str) -> dict:
+    """Everything the results view needs, read back from the job directory."""
+    job = store.status(job_id)
+    checkpoints = store.checkpoints(job_id)
+    run_stats: dict[str, int] = {}
+    for checkpoint in checkpoints:
+        for key, value in checkpoint.stats.items():
+            run_stats[key] = run_stats.get(key, 0) + value
+    archive_path = store.path(job_id) / f"translated_{job.target_lang}.zip"
+    if len(checkpoints) > 1:
+        store.export(job_id, str(archive_path))
+    return {
+        "job_id": job_id,
+        "archive": str(archive_path),
+        "outputs": {checkpoint.output_path: str(store.output_file(job_id, checkpoint)) for checkpoint in checkpoints},
+        "logs": store.logs(job_id),
+        "stats": run_stats,
+        "metrics": [checkpoint.to_result() for checkpoint in checkpoints],
+        "target_lang": job.target_lang,
+    }
+
+
+@st.fragment(run_every=2)
+def _job_progress(job_id: str) -> None:
+    """Polls the background queue; once the job is done, loads its results into the page."""
+    store = _job_store()
+    if not store.exists(job_id):
+        return
+    queued = _job_queue().get(job_id)
+    status = store.status(job_id)
+    if queued is None or queued.finished:
+        if status.state in (COMPLETED, FAILED) or (queued is not None and queued.finished):
+            if st.session_state.get("last_run", {}).get("job_id") != job_id:
+                st.session_state["last_run"] = _load_run(store, job_id)
+                st.rerun(scope="app")
+            if status.failed:
+                st.warning(f"Job {job_id} finished with {len(status.failed)} failed file(s).")
+                for name, error in status.failed.items():
+                    st.error(f"{name}: {error}")
+            elif queued is not None and queued.error:
+                st.error(f"Job {job_id} stopped: {queued.error}")
+            elif queued is not None and queued.state == CANCELLED:
+                st.info(f"Job {job_id} was cancelled after {status.completed}/{status.total} file(s); resume it from the Jobs panel.")
+            else:
+                st.success(f"Job {job_id} completed.")
+            return
+        # Not in this server's queue (e.g. after a restart) and not finished.
+        st.info(f"Job {job_id} is {status.state} with {status.completed}/{status.total} file(s) done.")
+        if st.button("Resume job"):
+            _submit(job_id)
+            st.rerun(scope="app")
+        return
+    st.progress(min(1.0, queued.done / queued.total) if queued.total else 0.0)
+    where = f", last finished: {queued.current}" if queued.current else ""
+    st.info(f"Job {job_id} is {queued.state}: {queued.done}/{queued.total} file(s) done{where}")
+    if st.button("Cancel job", help="Stops after the files in progress; finished files are kept and the job can be resumed"):
+        _job_queue().cancel(job_id)
 
 
 st.set_page_config(page_title="Excel Translator", layout="wide")
@@ -45,60 +152,140 @@ uploaded_files = st.file_uploader(
 )
 source_lang_label = st.selectbox("Source language", list(LANGUAGES.keys()), index=0)
 target_lang_label = st.selectbox("Target language", list(LANGUAGES.keys()), index=1)
-engine = st.radio("Translation engine", ["azure", "local"], help="Azure auto-falls back to local on failure")
+engine = st.radio(
+    "Translation engine",
+    ["azure", "local", "budget"],
+    help="Azure auto-falls back to local on failure; budget picks Azure or local per batch from string length, observed latency and errors, and the Azure character budget",
+)
+jobs = st.slider("Parallel files", min_value=1, max_value=max(os.cpu_count() or 1, default_jobs()), value=default_jobs())
 st.caption("Translate cells, sheet names, chart/drawing text (titles, labels, text boxes, shapes), comments, and notes while preserving workbook formatting.")
 
 if st.button("Translate", type="primary"):
-    files = _extract_excel_files(uploaded_files or [])
-    if not files:
+    store = _job_store()
+    job_id = store.new_id()
+    # Uploads are copied into the job so it can be resumed after a restart.
+    inputs = _spool_uploads(uploaded_files or [], store.inputs_dir(job_id))
+    if not count_inputs(inputs):
+        store.delete(job_id)
         st.warning("No Excel files found in upload.")
         st.stop()
 
-    source_lang = LANGUAGES[source_lang_label]
-    target_lang = LANGUAGES[target_lang_label]
+    store.create(inputs, LANGUAGES[source_lang_label], LANGUAGES[target_lang_label], engine, job_id=job_id)
+    # The job runs on the background queue; this script only polls it.
+    _submit(job_id)
 
-    all_outputs: list[tuple[str, bytes]] = []
-    all_logs = []
+if "job" in st.query_params:
+    _job_progress(st.query_params["job"])
 
-    progress = st.progress(0.0)
-    status = st.empty()
-
-    for idx, (name, payload) in enumerate(files, start=1):
-        status.info(f"Processing {idx}/{len(files)}: {name}")
-        result = process_excel_file(
-            file_name=name,
-            file_bytes=payload,
-            source_lang=source_lang,
-            target_lang=target_lang,
-            selected_engine=engine,
+with st.expander("Jobs", expanded=False):
+    store = _job_store()
+    known_jobs = store.list()
+    if not known_jobs:
+        st.caption("No jobs yet.")
+    else:
+        st.dataframe(
+            [
+                {
+                    "job": job.job_id,
+                    "state": job.state,
+                    "done": f"{job.completed}/{job.total}",
+                    "failed": len(job.failed),
+                    "target": job.target_lang,
+                    "updated": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(job.updated)),
+                }
+                for job in known_jobs
+            ],
+            use_container_width=True,
         )
-        all_outputs.append((result.output_filename, result.output_bytes))
-        all_logs.extend([entry.__dict__ for entry in result.logs])
-        progress.progress(idx / len(files))
+        selected_job = st.selectbox("Job", [job.job_id for job in known_jobs])
+        queued = _job_queue().get(selected_job)
+        active = queued is not None and not queued.finished
+        resume_col, show_col, delete_col = st.columns(3)
+        if resume_col.button("Resume", disabled=active, help="Queue the files this job has not finished; finished files are kept"):
+            _submit(selected_job)
+            st.rerun()
+        if show_col.button("Show results"):
+            st.query_params["job"] = selected_job
+            # Kept in the session so paging through the logs (a rerun) does not lose the results.
+            st.session_state["last_run"] = _load_run(store, selected_job)
+        if delete_col.button("Delete", disabled=active):
+            store.delete(selected_job)
+            if st.session_state.get("last_run", {}).get("job_id") == selected_job:
+                del st.session_state["last_run"]
+            if st.query_params.get("job") == selected_job:
+                del st.query_params["job"]
+            st.rerun()
+
+
+def _render_run(run: dict) -> None:
+    run_stats: dict[str, int] = run["stats"]
+    run_logs: TranslationLog = run["logs"]
+    outputs: dict[str, str] = run["outputs"]
+
+    st.caption(
+        f"Deduplication: {run_stats.get('dedup_misses', 0)} unique strings translated, "
+        f"{run_stats.get('dedup_hits', 0)} repeats reused."
+    )
+    if _translation_memory() is not None:
+        st.caption(f"Translation memory: {run_stats.get('cache_hits', 0)} hits, {run_stats.get('cache_misses', 0)} misses.")
+
+    metrics_results = run["metrics"]
+    with st.expander("Run metrics", expanded=False):
+        cols = st.columns(5)
+        cols[0].metric("Strings", run_stats.get("strings", 0))
+        cols[1].metric("Characters sent", run_stats.get("engine_chars", 0))
+        cols[2].metric("HTTP requests", run_stats.get("http_requests", 0))
+        cols[3].metric("Retries", run_stats.get("azure_retries", 0))
+        cols[4].metric("Fallbacks", run_stats.get("fallbacks", 0))
 
-    status.success("Translation completed.")
+        stage_totals: dict[str, dict[str, float]] = {}
+        for result in metrics_results:
+            for stage, metrics in result.stages.items():
+                totals = stage_totals.setdefault(stage, {"seconds": 0.0, "peak_rss_mib": 0.0})
+                totals["seconds"] += metrics["seconds"]
+                totals["peak_rss_mib"] = max(totals["peak_rss_mib"], metrics["peak_rss_bytes"] / 2**20)
+        st.dataframe(
+            [{"stage": stage, "seconds": round(t["seconds"], 3), "peak_rss_mib": round(t["peak_rss_mib"], 1)} for stage, t in stage_totals.items()],
+            use_container_width=True,
+        )
+        st.caption("Counters: " + ", ".join(f"{key}={value}" for key, value in sorted(run_stats.items())))
+        st.download_button("Download metrics (Prometheus)", prometheus_text(metrics_results), file_name="metrics.prom", mime="text/plain")
+        st.download_button(
+            "Download traces (OpenTelemetry JSON)",
+            json.dumps(otel_json(metrics_results), indent=2),
+            file_name="traces.json",
+            mime="application/json",
+        )
 
     st.subheader("Logs")
-    st.dataframe(all_logs, use_container_width=True)
+    page_size = st.selectbox("Rows per page", LOG_PAGE_SIZES, index=1)
+    pages = max(1, -(-len(run_logs) // page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    st.dataframe(run_logs.page((page - 1) * page_size, page_size), use_container_width=True)
+    st.caption(f"{len(run_logs)} log rows")
 
     st.subheader("Downloads")
-    for name, payload in all_outputs:
+    if not outputs:
+        return
+    # Downloads are read back from the job directory, one workbook at a time.
+    member = st.selectbox("Translated file", list(outputs)) if len(outputs) > 1 else next(iter(outputs))
+    with open(outputs[member], "rb") as payload:
         st.download_button(
-            label=f"Download {name}",
+            label=f"Download {Path(member).name}",
             data=payload,
-            file_name=name,
+            file_name=Path(member).name,
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         )
 
-    if len(all_outputs) > 1:
-        zip_buf = io.BytesIO()
-        with zipfile.ZipFile(zip_buf, "w", zipfile.ZIP_DEFLATED) as zout:
-            for name, payload in all_outputs:
-                zout.writestr(name, payload)
-            zout.writestr("translation_logs.json", json.dumps(all_logs, ensure_ascii=False, indent=2))
-        st.download_button(
-            label="Download all translated files (ZIP)",
-            data=zip_buf.getvalue(),
-            file_name=f"translated_{target_lang}.zip",
-            mime="application/zip",
-        )
+    if len(outputs) > 1:
+        with open(run["archive"], "rb") as archive:
+            st.download_button(
+                label="Download all translated files (ZIP)",
+                data=archive,
+                file_name=f"translated_{run['target_lang']}.zip",
+                mime="application/zip",
+            )
+
+
+if "last_run" in st.session_state:
+    _render_run(st.session_state["last_run"])
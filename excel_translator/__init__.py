@@ -1,5 +1,7 @@
 """Excel translation package."""
 
+from .batch import translate_directory, translate_files
+from .jobs import JobStore
 from .processor import ProcessingResult, process_excel_file
 
-__all__ = ["ProcessingResult", "process_excel_file"]
+__all__ = ["JobStore", "ProcessingResult", "process_excel_file", "translate_directory", "translate_files"]
@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+import glob
+import os
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path, PurePosixPath
+from typing import Callable, Container, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from .batching import TranslationMemo
+from .filters import SkipRules
+from .incremental import TranslationManifest
+from .processor import ProcessingResult, process_excel_file
+from .routing import AZURE_BUDGET_PATH_ENV
+from .translation_memory import TranslationMemory
+from .translators import RoutedTranslator
+
+BatchPayload = Union[bytes, str, "os.PathLike[str]"]
+ProgressCallback = Callable[[int, Optional[int], str], None]
+ErrorCallback = Callable[[int, str, BaseException], None]
+ManifestKey = Callable[[int, str], str]
+
+
+class _WorkerState:
+    """Memo, translation memory and routers of one worker: a pool process, or a serial :class:`BatchRunner`."""
+
+    def __init__(self) -> None:
+        self.memo: TranslationMemo = {}
+        self.memory: Optional[TranslationMemory] = None
+        # One router per engine mode, so pooled connections survive across workbooks.
+        self.translators: Dict[str, RoutedTranslator] = {}
+        self.budget_path: Optional[str] = None
+
+    def open(self, memory_path: Optional[str], budget_path: Optional[str]) -> None:
+        self.close()
+        self.memo = {}
+        self.budget_path = budget_path
+        # Eviction is left to whoever owns the store; workers only read and append.
+        self.memory = TranslationMemory(memory_path, max_entries=None) if memory_path else None
+
+    def close(self) -> None:
+        for translator in self.translators.values():
+            translator.close()
+        self.translators.clear()
+        if self.memory is not None:
+            self.memory.close()
+            self.memory = None
+
+    def translator(self, selected_engine: str) -> RoutedTranslator:
+        if selected_engine not in self.translators:
+            self.translators[selected_engine] = RoutedTranslator(selected_engine=selected_engine, budget_path=self.budget_path)
+        return self.translators[selected_engine]
+
+
+# The state of a pool process, set up once by _init_worker.
+_WORKER = _WorkerState()
+
+
+def default_jobs() -> int:
+    return int(os.getenv("EXCEL_TRANSLATOR_JOBS", str(min(4, os.cpu_count() or 1))))
+
+
+def _init_worker(memory_path: Optional[str], budget_path: Optional[str] = None) -> None:
+    _WORKER.open(memory_path, budget_path)
+
+
+def _read_payload(payload: BatchPayload) -> bytes:
+    if isinstance(payload, bytes):
+        return payload
+    return Path(payload).read_bytes()
+
+
+def _manifest_path(manifest_dir: str, key: str) -> Path:
+    return Path(manifest_dir) / f"{key}.manifest.json"
+
+
+def _translate_in_worker(
+    name: str,
+    payload: BatchPayload,
+    source_lang: str,
+    target_lang: str,
+    selected_engine: str,
+    manifest_dir: Optional[str] = None,
+    skip_rules: Optional[SkipRules] = None,
+    state: Optional[_WorkerState] = None,
+    manifest_key: Optional[str] = None,
+) -> ProcessingResult:
+    state = _WORKER if state is None else state
+    previous = None
+    if manifest_dir is not None:
+        manifest_path = _manifest_path(manifest_dir, manifest_key or name)
+        if manifest_path.exists():
+            previous = TranslationManifest.load(str(manifest_path))
+
+    result = process_excel_file(
+        file_name=name,
+        file_bytes=_read_payload(payload),
+        source_lang=source_lang,
+        target_lang=target_lang,
+        selected_engine=selected_engine,
+        memo=state.memo,
+        memory=state.memory,
+        previous=previous,
+        record_manifest=manifest_dir is not None,
+        translator=state.translator(selected_engine),
+        skip_rules=skip_rules,
+    )
+    if manifest_dir is not None and result.manifest is not None:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        result.manifest.save(str(manifest_path))
+        # Already on disk; no need to ship it back to the parent process.
+        result.manifest = None
+    return result
+
+
+class BatchRunner:
+    """Engines, translation memory and worker processes for translating workbooks, kept across :meth:`run` calls.
+
+    With ``max_workers > 1`` a process pool is started up front; otherwise the
+    workbooks are translated on the calling thread (any thread, one run at a
+    time). Either way the routers, with their pooled connections, circuit
+    breakers and routing statistics, live until :meth:`close`, so a caller
+    that translates a batch in several slices keeps them between slices.
+    ``memory_path`` and ``budget_path`` are as in :func:`translate_files`.
+    """
+
+    def __init__(self, max_workers: int = 1, memory_path: Optional[str] = None, budget_path: Optional[str] = None):
+        self.max_workers = max_workers
+        self._scratch_dir = tempfile.mkdtemp(prefix="excel-translator-")
+        budget_path = budget_path or os.getenv(AZURE_BUDGET_PATH_ENV) or os.path.join(self._scratch_dir, "azure-budget.sqlite")
+        self._state: Optional[_WorkerState] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if max_workers <= 1:
+            self._state = _WorkerState()
+            self._state.open(memory_path, budget_path)
+            return
+        if memory_path is None:
+            memory_path = os.path.join(self._scratch_dir, "batch-memory.sqlite")
+            TranslationMemory(memory_path).close()
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(memory_path, budget_path))
+
+    def run(
+        self,
+        files: Iterable[Tuple[str, BatchPayload]],
+        source_lang: str,
+        target_lang: str,
+        selected_engine: str,
+        progress: Optional[ProgressCallback] = None,
+        on_error: Optional[ErrorCallback] = None,
+        manifest_dir: Optional[str] = None,
+        skip_rules: Optional[SkipRules] = None,
+        manifest_key: Optional[ManifestKey] = None,
+    ) -> Iterator[Tuple[int, ProcessingResult]]:
+        """Translate ``files``; arguments and results are those of :func:`translate_files`."""
+        total = len(files) if hasattr(files, "__len__") else None  # type: ignore[arg-type]
+        done = 0
+
+        if self._pool is None:
+            for idx, (name, payload) in enumerate(files):
+                try:
+                    result: Optional[ProcessingResult] = _translate_in_worker(
+                        name, payload, source_lang, target_lang, selected_engine, manifest_dir, skip_rules, self._state,
+                        manifest_key(idx, name) if manifest_key is not None else None,
+                    )
+                except Exception as exc:
+                    if on_error is None:
+                        raise
+                    on_error(idx, name, exc)
+                    result = None
+                done += 1
+                if progress is not None:
+                    progress(done, total, name)
+                if result is not None:
+                    yield idx, result
+            return
+
+        pending: Dict[Future, Tuple[int, str]] = {}
+        inputs = enumerate(files)
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                while not exhausted and len(pending) < 2 * self.max_workers:
+                    try:
+                        idx, (name, payload) = next(inputs)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    future = self._pool.submit(
+                        _translate_in_worker, name, payload, source_lang, target_lang, selected_engine, manifest_dir, skip_rules,
+                        manifest_key=manifest_key(idx, name) if manifest_key is not None else None,
+                    )
+                    pending[future] = (idx, name)
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    idx, name = pending.pop(future)
+                    exc = future.exception()
+                    if exc is not None and on_error is None:
+                        raise exc
+                    if exc is not None:
+                        on_error(idx, name, exc)
+                    done += 1
+                    if progress is not None:
+                        progress(done, total, name)
+                    if exc is None:
+                        yield idx, future.result()
+        finally:
+            # A run that stops early leaves no work behind for the next one.
+            for future in pending:
+                future.cancel()
+            if pending:
+                wait(pending)
+
+    def close(self) -> None:
+        if self._state is not None:
+            self._state.close()
+        if self._pool is not None:
+            self._pool.shutdown()
+        shutil.rmtree(self._scratch_dir, ignore_errors=True)
+
+    def __enter__(self) -> "BatchRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def translate_files(
+    files: Iterable[Tuple[str, BatchPayload]],
+    source_lang: str,
+    target_lang: str,
+    selected_engine: str,
+    max_workers: int = 1,
+    memory_path: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    on_error: Optional[ErrorCallback] = None,
+    manifest_dir: Optional[str] = None,
+    skip_rules: Optional[SkipRules] = None,
+    budget_path: Optional[str] = None,
+    manifest_key: Optional[ManifestKey] = None,
+) -> Iterator[Tuple[int, ProcessingResult]]:
+    """Translate several workbooks across a process pool.
+
+    ``files`` yields ``(name, payload)`` where payload is the workbook bytes or a
+    path to it. Results are yielded as ``(input_index, result)`` in completion
+    order, and ``progress(done, total, name)`` fires after each file; ``total``
+    is ``None`` when ``files`` has no length. Workers share translations through
+    the SQLite translation memory at ``memory_path``; without one, a temporary
+    store lives for the duration of the batch so each string is still
+    translated roughly once across files. At most ``2 * max_workers`` inputs
+    are in flight, so lazy iterables are not read ahead of the pool.
+
+    A failing file raises, unless ``on_error(input_index, name, exc)`` is given,
+    in which case the file is reported there, counted as done and skipped.
+
+    With ``manifest_dir`` each workbook is translated incrementally against
+    ``<manifest_dir>/<key>.manifest.json`` from the previous run, which is
+    then replaced with the new manifest. The key is
+    ``manifest_key(input_index, name)``, or the name without one; it may
+    contain ``/`` to keep same-named workbooks from different folders apart.
+
+    ``skip_rules`` applies to every file; by default each worker reads them
+    from the environment (see :class:`~excel_translator.filters.SkipRules`).
+
+    In ``budget`` mode every worker counts Azure characters in the SQLite file
+    ``budget_path`` (default ``$EXCEL_TRANSLATOR_AZURE_BUDGET_PATH``, else a
+    temporary file for this batch), so the budget caps the whole run rather
+    than each worker.
+
+    Use a :class:`BatchRunner` directly to keep engines and workers across
+    several batches.
+    """
+    with BatchRunner(max_workers, memory_path, budget_path) as runner:
+        yield from runner.run(files, source_lang, target_lang, selected_engine, progress, on_error, manifest_dir, skip_rules, manifest_key)
+
+
+_GLOB_CHARS = set("*?[")
+LOG_FILE_NAME = "translation_logs.jsonl"
+
+
+def _safe_relative(path: PurePosixPath) -> Path:
+    """Keep only plain name components so archive member paths cannot escape the output root."""
+    return Path(*[part for part in path.parts if part not in ("", ".", "..", "/") and ":" not in part])
+
+
+def _expand_inputs(inputs: Iterable[str]) -> Iterator[Tuple[Path, Path]]:
+    """Expand directories and globs into ``(file, relative output dir)`` pairs, skipping Office lock files."""
+    for raw in inputs:
+        if _GLOB_CHARS & set(raw):
+            matches = sorted(Path(m) for m in glob.glob(raw, recursive=True))
+            entries = [(m, Path()) for m in matches]
+        elif Path(raw).is_dir():
+            root = Path(raw)
+            entries = [(m, m.parent.relative_to(root)) for m in sorted(root.rglob("*")) if m.is_file()]
+        else:
+            entries = [(Path(raw), Path())]
+        for path, rel_dir in entries:
+            if not path.name.startswith("~$"):
+                yield path, rel_dir
+
+
+def _zip_workbooks(zf: zipfile.ZipFile) -> Iterator[zipfile.ZipInfo]:
+    for member in zf.infolist():
+        if not member.is_dir() and member.filename.lower().endswith(".xlsx"):
+            yield member
+
+
+def count_inputs(inputs: Iterable[str]) -> int:
+    """Number of workbooks :func:`iter_inputs` would produce, read from ZIP directories without inflating members."""
+    count = 0
+    for path, _rel_dir in _expand_inputs(inputs):
+        lower = path.name.lower()
+        if lower.endswith(".xlsx"):
+            count += 1
+        elif lower.endswith(".zip"):
+            with zipfile.ZipFile(path) as zf:
+                count += sum(1 for _ in _zip_workbooks(zf))
+    return count
+
+
+def iter_inputs(
+    inputs: Iterable[str],
+    scratch_dir: str,
+    sources: Dict[int, Tuple[Path, Optional[Path]]],
+    skip: Container[int] = (),
+) -> Iterator[Tuple[str, str]]:
+    """Expand directories, globs and ZIPs into ``(name, path)`` pairs, one workbook at a time.
+
+    ``sources`` is filled with ``index -> (relative output dir, temp file to delete)``
+    as each pair is produced. ZIP members are extracted to ``scratch_dir`` only
+    when the pool asks for them. Workbooks whose index is in ``skip`` keep
+    their number but are neither extracted nor yielded.
+    """
+    idx = 0
+    for path, rel_dir in _expand_inputs(inputs):
+        lower = path.name.lower()
+        if lower.endswith(".xlsx"):
+            if idx not in skip:
+                sources[idx] = (rel_dir, None)
+                yield path.name, str(path)
+            idx += 1
+        elif lower.endswith(".zip"):
+            with zipfile.ZipFile(path) as zf:
+                for member in _zip_workbooks(zf):
+                    if idx in skip:
+                        idx += 1
+                        continue
+                    fd, temp_path = tempfile.mkstemp(suffix=".xlsx", dir=scratch_dir)
+                    with os.fdopen(fd, "wb") as dst, zf.open(member) as src:
+                        shutil.copyfileobj(src, dst)
+                    member_path = PurePosixPath(member.filename)
+                    sources[idx] = (rel_dir / path.stem / _safe_relative(member_path.parent), Path(temp_path))
+                    yield member_path.name, temp_path
+                    idx += 1
+
+
+class OutputSink:
+    """Writes translated workbooks and a JSONL log into a directory or a ZIP on disk as they arrive."""
+
+    def __init__(self, output: str):
+        self.is_zip = output.lower().endswith(".zip")
+        self.used: set[str] = set()
+        if self.is_zip:
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            self.zip = zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED)
+            self.log_file = tempfile.TemporaryFile("w+", encoding="utf-8")
+        else:
+            self.root = Path(output)
+            self.root.mkdir(parents=True, exist_ok=True)
+            self.log_file = open(self.root / LOG_FILE_NAME, "w", encoding="utf-8")
+
+    def _unique(self, rel_path: str) -> str:
+        path = PurePosixPath(rel_path)
+        candidate, i = rel_path, 1
+        while candidate in self.used:
+            candidate = str(path.with_name(f"{path.stem}_{i}{path.suffix}"))
+            i += 1
+        self.used.add(candidate)
+        return candidate
+
+    def write(self, rel_dir: Path, result: ProcessingResult) -> str:
+        rel_path = self._unique((rel_dir / result.output_filename).as_posix())
+        if self.is_zip:
+            self.zip.writestr(rel_path, result.output_bytes)
+        else:
+            target = self.root / rel_path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(result.output_bytes)
+        result.logs.write_jsonl(self.log_file)
+        return rel_path
+
+    def close(self) -> None:
+        if self.is_zip:
+            self.log_file.seek(0)
+            with self.zip.open(LOG_FILE_NAME, "w") as dst:
+                for line in self.log_file:
+                    dst.write(line.encode("utf-8"))
+            self.zip.close()
+        self.log_file.close()
+
+
+def translate_directory(
+    inputs: Iterable[str],
+    output: str,
+    source_lang: str,
+    target_lang: str,
+    selected_engine: str = "azure",
+    max_workers: int = 1,
+    memory_path: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    manifest_dir: Optional[str] = None,
+    skip_rules: Optional[SkipRules] = None,
+) -> Dict[str, object]:
+    """Translate every workbook found in ``inputs`` and stream the results to ``output``.
+
+    ``inputs`` may mix ``.xlsx`` files, directories (searched recursively, with
+    the sub-directory layout kept in the output), glob patterns and ``.zip``
+    archives. ``output`` is a directory, or a ``.zip`` file when it ends in
+    ``.zip``; either way each workbook is written as soon as it is translated
+    and per-item logs go to ``translation_logs.jsonl`` alongside them. Files
+    that fail are reported in the returned summary instead of aborting the run.
+    ``manifest_dir`` and ``skip_rules`` behave as in :func:`translate_files`;
+    manifests are keyed by the input workbook's path relative to the directory it
+    was found in (``sub/a.xlsx`` for ``in/sub/a.xlsx`` given ``in``), not by its
+    translated output name.
+    """
+    sources: Dict[int, Tuple[Path, Optional[Path]]] = {}
+    failures: Dict[str, str] = {}
+    written: list[str] = []
+    stats: Dict[str, int] = {}
+
+    def _on_error(idx: int, name: str, exc: BaseException) -> None:
+        failures[name] = str(exc)
+        _release(idx)
+
+    def _release(idx: int) -> None:
+        _rel_dir, temp_path = sources.pop(idx, (None, None))
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+
+    scratch_dir = tempfile.mkdtemp(prefix="excel-translator-inputs-")
+    sink = OutputSink(output)
+    try:
+        for idx, result in translate_files(
+            iter_inputs(inputs, scratch_dir, sources),
+            source_lang,
+            target_lang,
+            selected_engine,
+            max_workers=max_workers,
+            memory_path=memory_path,
+            progress=progress,
+            on_error=_on_error,
+            manifest_dir=manifest_dir,
+            skip_rules=skip_rules,
+            # iter_inputs registers the input in ``sources`` just before yielding it.
+            manifest_key=lambda idx, name: (sources[idx][0] / name).as_posix(),
+        ):
+            written.append(sink.write(sources[idx][0], result))
+            for key, value in result.stats.items():
+                stats[key] = stats.get(key, 0) + value
+            _release(idx)
+    finally:
+        sink.close()
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {"written": written, "failed": failures, "stats": stats}
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .concurrency import map_ordered
+from .metrics import StageTimer
+from .segmentation import Segmenter, join_pieces
+from .translation_memory import TranslationMemory
+from .translators import RoutedTranslator
+
+# Azure Translator v3 accepts at most 1000 elements and 50,000 characters
+# (summed over all elements) per /translate request.
+AZURE_MAX_ELEMENTS = 1000
+AZURE_MAX_CHARS = 50_000
+
+
+@dataclass
+class TextSlot:
+    """One translatable string and where it lives in the package."""
+
+    part: str
+    key: int
+    sheet_name: str
+    object_id: str
+    text: str
+
+
+@dataclass
+class TranslationOutcome:
+    text: str
+    engine: str
+    error: Optional[str] = None
+    # Routing decision of the batch this text was sent in (budget mode only).
+    route: Optional[str] = None
+
+
+def iter_chunks(texts: Sequence[str], max_items: int = AZURE_MAX_ELEMENTS, max_chars: int = AZURE_MAX_CHARS) -> Iterator[List[int]]:
+    """Yield index lists whose texts fit within the element and character caps.
+
+    A single text longer than ``max_chars`` is emitted as its own chunk.
+    """
+    chunk: List[int] = []
+    chunk_chars = 0
+    for idx, text in enumerate(texts):
+        size = len(text)
+        if chunk and (len(chunk) >= max_items or chunk_chars + size > max_chars):
+            yield chunk
+            chunk, chunk_chars = [], 0
+        chunk.append(idx)
+        chunk_chars += size
+    if chunk:
+        yield chunk
+
+
+TranslationMemo = Dict[Tuple[str, str, str], TranslationOutcome]
+
+
+def translate_texts(
+    translator: RoutedTranslator,
+    texts: Sequence[str],
+    source_lang: str,
+    target_lang: str,
+    max_items: int = AZURE_MAX_ELEMENTS,
+    max_chars: int = AZURE_MAX_CHARS,
+    memo: Optional[TranslationMemo] = None,
+    stats: Optional[Dict[str, int]] = None,
+    memory: Optional[TranslationMemory] = None,
+    timer: Optional[StageTimer] = None,
+    segmenter: Optional[Segmenter] = None,
+) -> List[TranslationOutcome]:
+    """Translate ``texts`` in engine-sized chunks, returning one outcome per input in order.
+
+    Identical texts are sent once and fanned back out to every position. ``memo``
+    carries successful translations across calls so a whole run translates each
+    ``(text, source_lang, target_lang)`` only once; ``stats`` receives
+    ``dedup_hits``/``dedup_misses`` counts. Unique texts are then looked up in the
+    persistent ``memory`` (engine reported as ``cache:<engine>``) before anything
+    is sent to the network. A failed chunk marks each of its texts as an error and
+    leaves them untranslated.
+
+    With a ``timer`` every engine call is recorded as an ``engine_call`` span
+    (strings, characters and the engine that answered); ``stats`` also gets
+    ``engine_strings``/``engine_chars`` for what was actually sent.
+
+    With a ``segmenter`` long texts are split into paragraphs and sentences
+    that go through all of the above as texts of their own, and are joined
+    back with the original whitespace. A segmented text fails if any of its
+    segments fails; its engine lists the distinct segment engines joined with
+    ``+``. ``stats`` then gets ``segmented_texts``/``segments``.
+
+    When the translator routes batches (``translator.policy`` is set, budget
+    mode) the texts are sent shortest first so every batch holds strings of
+    similar length, and each outcome carries the decision as ``route``.
+    """
+    if segmenter is None or not segmenter.enabled:
+        return _translate_whole(translator, texts, source_lang, target_lang, max_items, max_chars, memo, stats, memory, timer)
+    plans = [segmenter.split(text) for text in texts]
+    flat = [value for pieces in plans for value, translatable in pieces if translatable]
+    outcomes = iter(_translate_whole(translator, flat, source_lang, target_lang, max_items, max_chars, memo, stats, memory, timer))
+    results: List[TranslationOutcome] = []
+    for text, pieces in zip(texts, plans):
+        segments = [next(outcomes) for _value, translatable in pieces if translatable]
+        if len(pieces) == 1:
+            results.append(segments[0])
+            continue
+        if stats is not None:
+            stats["segmented_texts"] = stats.get("segmented_texts", 0) + 1
+            stats["segments"] = stats.get("segments", 0) + len(segments)
+        error = next((outcome.error for outcome in segments if outcome.error), None)
+        if error is not None:
+            results.append(TranslationOutcome(text=text, engine="none", error=error))
+            continue
+        engine = "+".join(dict.fromkeys(outcome.engine for outcome in segments))
+        route = "+".join(dict.fromkeys(outcome.route for outcome in segments if outcome.route)) or None
+        results.append(TranslationOutcome(text=join_pieces(pieces, [outcome.text for outcome in segments]), engine=engine, route=route))
+    return results
+
+
+def _translate_whole(
+    translator: RoutedTranslator,
+    texts: Sequence[str],
+    source_lang: str,
+    target_lang: str,
+    max_items: int,
+    max_chars: int,
+    memo: Optional[TranslationMemo],
+    stats: Optional[Dict[str, int]],
+    memory: Optional[TranslationMemory],
+    timer: Optional[StageTimer],
+) -> List[TranslationOutcome]:
+    timer = StageTimer() if timer is None else timer
+    memo = {} if memo is None else memo
+    resolved: Dict[str, TranslationOutcome] = {}
+    pending: List[str] = []
+    hits = 0
+
+    for text in texts:
+        if text in resolved:
+            hits += 1
+            continue
+        cached = memo.get((text, source_lang, target_lang))
+        if cached is not None:
+            resolved[text] = cached
+            hits += 1
+            continue
+        # Placeholder so repeats within this call count as hits; replaced below.
+        resolved[text] = TranslationOutcome(text=text, engine="none")
+        pending.append(text)
+
+    dedup_misses = len(pending)
+    engine_models: Dict[str, str] = {}
+    if memory is not None:
+        engine_models = {engine.engine_name: getattr(engine, "model", "") for engine in translator.route_engines()}
+        cached_hits = memory.lookup(pending, source_lang, target_lang, list(engine_models.items()))
+        for text, (value, engine) in cached_hits.items():
+            outcome = TranslationOutcome(text=value, engine=f"cache:{engine}")
+            resolved[text] = outcome
+            memo[(text, source_lang, target_lang)] = outcome
+        pending = [text for text in pending if text not in cached_hits]
+        if stats is not None:
+            stats["cache_hits"] = stats.get("cache_hits", 0) + len(cached_hits)
+            stats["cache_misses"] = stats.get("cache_misses", 0) + len(pending)
+
+    routed = getattr(translator, "policy", None) is not None
+    if routed:
+        # Length-homogeneous batches let the policy send short strings and long prose to different engines.
+        pending.sort(key=len)
+    chunks = [[pending[i] for i in chunk] for chunk in iter_chunks(pending, max_items, max_chars)]
+
+    def _dispatch(batch: List[str]) -> Tuple[Optional[List[str]], str, Optional[str], Optional[str]]:
+        with timer.span("engine_call", parent="translate", strings=len(batch), chars=sum(len(text) for text in batch)) as span:
+            decision = translator.route_batch(batch) if routed else None
+            route = decision.label if decision is not None else None
+            if route is not None:
+                span.attributes["route"] = route
+            try:
+                if decision is None:
+                    translated, engine = translator.translate_batch_with_engine(batch, source_lang, target_lang)
+                else:
+                    translated, engine = translator.translate_batch_with_engine(batch, source_lang, target_lang, decision=decision)
+                if len(translated) != len(batch):
+                    raise RuntimeError(f"Engine returned {len(translated)} translations for {len(batch)} texts")
+            except Exception as exc:
+                span.attributes["engine"] = "none"
+                span.error = str(exc)
+                return None, "none", str(exc), route
+            span.attributes["engine"] = engine
+            return translated, engine, None, route
+
+    # Chunks run concurrently; results are merged in chunk order so output stays deterministic.
+    results = map_ordered(_dispatch, chunks, getattr(translator, "max_in_flight", 1))
+    for batch, (translated, engine, error, route) in zip(chunks, results):
+        if translated is None:
+            for text in batch:
+                resolved[text] = TranslationOutcome(text=text, engine="none", error=error, route=route)
+            continue
+        for text, value in zip(batch, translated):
+            outcome = TranslationOutcome(text=value, engine=engine, route=route)
+            resolved[text] = outcome
+            memo[(text, source_lang, target_lang)] = outcome
+        if memory is not None:
+            memory.store(zip(batch, translated), source_lang, target_lang, engine, engine_models.get(engine, ""))
+
+    if stats is not None:
+        stats["engine_strings"] = stats.get("engine_strings", 0) + len(pending)
+        stats["engine_chars"] = stats.get("engine_chars", 0) + sum(len(text) for text in pending)
+        stats["dedup_hits"] = stats.get("dedup_hits", 0) + hits
+        stats["dedup_misses"] = stats.get("dedup_misses", 0) + dedup_misses
+
+    return [resolved[text] for text in texts]
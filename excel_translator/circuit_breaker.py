@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, List
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class BreakerTransition:
+    name: str
+    from_state: str
+    to_state: str
+    reason: str
+    timestamp: float
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker over a sliding window of failures.
+
+    ``failure_threshold`` failures within ``window_seconds`` open the circuit;
+    while open every call is refused until ``reset_timeout`` has passed, then a
+    single probe is let through (half-open). A successful probe closes the
+    circuit, a failed one re-opens it. State changes are appended to
+    ``transitions``, which keeps the last ``max_transitions`` of them because
+    a breaker lives as long as its router; ``transition_count`` counts all of
+    them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        window_seconds: float = 60.0,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_transitions: int = 256,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window_seconds = window_seconds
+        self.reset_timeout = reset_timeout
+        self.transitions: Deque[BreakerTransition] = deque(maxlen=max_transitions)
+        self.transition_count = 0
+        self._clock = clock
+        self._state = CLOSED
+        self._failures: Deque[float] = deque()
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _transition(self, to_state: str, reason: str) -> None:
+        self.transitions.append(BreakerTransition(self.name, self._state, to_state, reason, time.time()))
+        self.transition_count += 1
+        self._state = to_state
+
+    def transitions_since(self, count: int) -> List[BreakerTransition]:
+        """Transitions made after :attr:`transition_count` was ``count``, as far as they are still kept."""
+        with self._lock:
+            new = min(self.transition_count - count, len(self.transitions))
+            return list(self.transitions)[len(self.transitions) - new :]
+
+    def available(self) -> bool:
+        """Whether :meth:`allow_request` would let a call through now, without claiming the probe."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return self._clock() - self._opened_at >= self.reset_timeout
+            return not self._probe_in_flight
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._transition(HALF_OPEN, f"probing after {self.reset_timeout:g}s open")
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._transition(CLOSED, "probe succeeded")
+
+    def reset(self, reason: str) -> None:
+        """Close the circuit now, e.g. after an out-of-band health check succeeded."""
+        with self._lock:
+            self._failures.clear()
+            self._probe_in_flight = False
+            if self._state != CLOSED:
+                self._transition(CLOSED, reason)
+
+    def record_failure(self, error: str = "") -> None:
+        with self._lock:
+            now = self._clock()
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                self._opened_at = now
+                self._transition(OPEN, f"probe failed: {error}")
+                return
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window_seconds:
+                self._failures.popleft()
+            if self._state == CLOSED and len(self._failures) >= self.failure_threshold:
+                self._opened_at = now
+                self._failures.clear()
+                self._transition(OPEN, f"{self.failure_threshold} failures within {self.window_seconds:g}s: {error}")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from typing import List, Optional
+
+from .batch import default_jobs, translate_directory
+from .filters import SkipRules
+from .jobs import JobStore
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="excel_translator", description="Translate .xlsx workbooks without the Streamlit UI.")
+    parser.add_argument("inputs", nargs="*", help=".xlsx files, directories, glob patterns or .zip archives")
+    parser.add_argument("-o", "--output", help="Output directory, or a .zip file to write into")
+    parser.add_argument("--source", default="en", help="Source language code (default: en)")
+    parser.add_argument("--target", help="Target language code, e.g. fr or zh-Hans")
+    parser.add_argument(
+        "--engine",
+        choices=["azure", "local", "budget"],
+        default="azure",
+        help="azure falls back to local on failure; budget routes each batch by length, latency, errors and the Azure character budget",
+    )
+    parser.add_argument("--jobs", type=int, default=default_jobs(), help="Workbooks translated in parallel")
+    parser.add_argument(
+        "--memory",
+        default=os.getenv("TRANSLATION_MEMORY_PATH"),
+        help="SQLite translation memory shared across runs (default: $TRANSLATION_MEMORY_PATH)",
+    )
+    parser.add_argument(
+        "--manifest-dir",
+        help="Incremental mode: reuse translations recorded here by the previous run and write updated manifests",
+    )
+    parser.add_argument(
+        "--skip",
+        default=os.getenv("EXCEL_TRANSLATOR_SKIP", "default"),
+        help="Comma list of string kinds passed through untranslated: number, date, email, url, code, punctuation, "
+        "language (needs langid), default or none (default: $EXCEL_TRANSLATOR_SKIP or 'default')",
+    )
+    parser.add_argument(
+        "--skip-pattern",
+        action="append",
+        default=[],
+        help="Extra regex; strings matching it entirely are passed through (repeatable)",
+    )
+    parser.add_argument(
+        "--job",
+        help="Run as a resumable job with this id: finished workbooks are checkpointed, and re-running the same "
+        "command after an interruption picks up where it stopped (inputs and languages come from the stored job)",
+    )
+    parser.add_argument("--job-dir", default=None, help="Where jobs are kept (default: $EXCEL_TRANSLATOR_JOB_DIR or .excel_translator_jobs)")
+    parser.add_argument("--status", nargs="?", const="", metavar="JOB", help="Print the status of one job, or of every job, and exit")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.status is not None:
+        store = JobStore(args.job_dir)
+        try:
+            report = store.status(args.status).as_dict() if args.status else [job.as_dict() for job in store.list()]
+        except KeyError as exc:
+            parser.error(str(exc.args[0]))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+    if not args.output:
+        parser.error("the following arguments are required: -o/--output")
+    resuming = args.job is not None and JobStore(args.job_dir).exists(args.job)
+    if not resuming and (not args.inputs or not args.target):
+        parser.error("inputs and --target are required unless resuming an existing --job")
+    try:
+        skip_rules = SkipRules.parse(args.skip, tuple(args.skip_pattern))
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    def _progress(done: int, total: Optional[int], name: str) -> None:
+        if not args.quiet:
+            print(f"[{done}] {name}", file=sys.stderr, flush=True)
+
+    if args.job is not None:
+        store = JobStore(args.job_dir)
+        if not resuming:
+            store.create(args.inputs, args.source, args.target, args.engine, job_id=args.job)
+        status = store.run(
+            args.job,
+            max_workers=args.jobs,
+            memory_path=args.memory,
+            progress=_progress,
+            skip_rules=skip_rules,
+            manifest_dir=args.manifest_dir,
+        )
+        written = store.export(args.job, args.output)
+        print(json.dumps({**status.as_dict(), "written": written}, ensure_ascii=False, indent=2))
+        return 1 if status.failed else 0
+
+    summary = translate_directory(
+        args.inputs,
+        args.output,
+        source_lang=args.source,
+        target_lang=args.target,
+        selected_engine=args.engine,
+        max_workers=args.jobs,
+        memory_path=args.memory,
+        progress=_progress,
+        manifest_dir=args.manifest_dir,
+        skip_rules=skip_rules,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary["failed"] else 0
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``.
+
+    Used to keep Azure traffic under its characters-per-minute quota. ``pause``
+    blocks every caller until a deadline, which is how 429 ``Retry-After``
+    responses are honoured across all in-flight workers.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def acquire(self, amount: float) -> None:
+        # Requests larger than the bucket are let through once it is full rather than blocking forever.
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                wait = max(self._paused_until - now, (amount - self._tokens) / self.rate_per_second)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def retry_after_seconds(header: Optional[str], default: float) -> float:
+    """Parse a ``Retry-After`` header given either as delta-seconds or an HTTP date."""
+    if not header:
+        return default
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+def map_ordered(func: Callable[[T], R], items: Sequence[T], max_workers: int) -> List[R]:
+    """Apply ``func`` to ``items`` with at most ``max_workers`` in flight, returning results in input order.
+
+    The first exception raised by ``func`` propagates once all submitted work finishes.
+    """
+    if max_workers <= 1 or len(items) <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(func, items))
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
+
+from .circuit_breaker import CLOSED, CircuitBreaker
+from .metrics import Counters
+
+if TYPE_CHECKING:
+    from .translators import Translator
+
+# Engine instances behind RoutedTranslator. Each routing role ("azure", the
+# primary, and "local", the fallback) is an EnginePool of one or more
+# instances, for example two Azure regions or several Ollama hosts. A pool
+# implements the Translator protocol itself: every batch goes to one instance
+# picked by the balancing strategy and fails over to the next on error.
+# Instances behind a pool of more than one have their own circuit breaker, so
+# a dead host is skipped until it answers a health check or a probe request.
+#
+# The layout comes from $EXCEL_TRANSLATOR_ENGINES_FILE (a JSON file) or
+# $EXCEL_TRANSLATOR_ENGINES (the same JSON inline):
+#
+#   {"balance": "least_in_flight", "health_interval": 30,
+#    "azure": [{"name": "weu", "region": "westeurope", "key_env": "AZURE_KEY_WEU", "weight": 2}, ...],
+#    "local": [{"name": "gpu1", "endpoint": "http://gpu1:11434/api/generate"}, ...]}
+#
+# Instance keys other than name, type and weight go to the engine type's
+# factory; anything left out falls back to the single-instance environment
+# variables (AZURE_TRANSLATOR_*, OLLAMA_*). Without a configuration each role
+# has exactly one instance built from those variables.
+
+ENGINES_ENV = "EXCEL_TRANSLATOR_ENGINES"
+ENGINES_FILE_ENV = "EXCEL_TRANSLATOR_ENGINES_FILE"
+
+LEAST_IN_FLIGHT = "least_in_flight"
+WEIGHTED = "weighted"
+BALANCE_STRATEGIES = (LEAST_IN_FLIGHT, WEIGHTED)
+
+ROLES = ("azure", "local")
+DEFAULT_TYPES = {"azure": "azure", "local": "ollama"}
+
+# factory(options, pool_size) -> Translator
+EngineFactory = Callable[[Dict[str, Any], int], "Translator"]
+ENGINE_TYPES: Dict[str, EngineFactory] = {}
+
+
+def register_engine_type(name: str, factory: EngineFactory) -> None:
+    """Make ``name`` usable as an instance ``type`` in the engine configuration."""
+    ENGINE_TYPES[name] = factory
+
+
+def load_engine_config() -> Dict[str, Any]:
+    """The engine layout from ``$EXCEL_TRANSLATOR_ENGINES_FILE`` or ``$EXCEL_TRANSLATOR_ENGINES``; ``{}`` when neither is set."""
+    path = os.getenv(ENGINES_FILE_ENV)
+    inline = os.getenv(ENGINES_ENV)
+    if path:
+        config = json.loads(Path(path).read_text(encoding="utf-8"))
+    elif inline:
+        config = json.loads(inline)
+    else:
+        return {}
+    if not isinstance(config, dict):
+        raise ValueError("Engine configuration must be a JSON object")
+    unknown = set(config) - set(ROLES) - {"balance", "health_interval"}
+    if unknown:
+        raise ValueError(f"Unknown engine configuration keys: {', '.join(sorted(unknown))}")
+    return config
+
+
+@dataclass
+class PoolMember:
+    name: str
+    translator: "Translator"
+    weight: int = 1
+    breaker: Optional[CircuitBreaker] = None
+    in_flight: int = 0
+    current_weight: int = 0
+
+    @property
+    def configured(self) -> bool:
+        return getattr(self.translator, "configured", True)
+
+
+class EnginePool:
+    """Several instances of one engine behind the :class:`~excel_translator.translators.Translator` protocol.
+
+    ``balance`` is ``least_in_flight`` (the instance with the fewest batches
+    in flight per unit of weight, ties taken in turn) or ``weighted`` (smooth
+    weighted round-robin). A failed batch is retried on the next instance;
+    the pool raises only when every instance failed or was skipped. Instances
+    whose circuit is open are pinged (when they have a ``ping`` method) at
+    most every ``health_interval`` seconds and put back as soon as one
+    answers.
+    """
+
+    def __init__(
+        self,
+        members: List[PoolMember],
+        balance: str = LEAST_IN_FLIGHT,
+        health_interval: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not members:
+            raise ValueError("An engine pool needs at least one instance")
+        if balance not in BALANCE_STRATEGIES:
+            raise ValueError(f"Unknown balance strategy {balance!r}; expected one of {', '.join(BALANCE_STRATEGIES)}")
+        self.members = members
+        self.engine_name = members[0].translator.engine_name
+        self.balance = balance
+        self.health_interval = health_interval
+        self.counters = Counters()
+        self._clock = clock
+        self._checked_at = clock()
+        self._turn = 0
+        self._lock = threading.Lock()
+        self._health_lock = threading.Lock()
+
+    @property
+    def model(self) -> str:
+        return ",".join(dict.fromkeys(getattr(member.translator, "model", "") for member in self.members))
+
+    @property
+    def configured(self) -> bool:
+        return any(member.configured for member in self.members)
+
+    def _order(self) -> List[PoolMember]:
+        """Configured instances in the order this batch should try them."""
+        with self._lock:
+            members = [member for member in self.members if member.configured]
+            if len(members) <= 1:
+                return members
+            if self.balance == WEIGHTED:
+                total = sum(member.weight for member in members)
+                for member in members:
+                    member.current_weight += member.weight
+                first = max(members, key=lambda member: member.current_weight)
+                first.current_weight -= total
+                return [first] + sorted((member for member in members if member is not first), key=lambda member: -member.weight)
+            self._turn += 1
+            count = len(members)
+            ranked = sorted(enumerate(members), key=lambda item: (item[1].in_flight / item[1].weight, (item[0] - self._turn) % count))
+            return [member for _idx, member in ranked]
+
+    def translate_batch(self, texts: Iterable[str], source_lang: str, target_lang: str) -> List[str]:
+        text_list = list(texts)
+        self._maybe_check_health()
+        last_error: Optional[Exception] = None
+        for member in self._order():
+            if member.breaker is not None and not member.breaker.allow_request():
+                self.counters.add("instance_skips")
+                continue
+            with self._lock:
+                member.in_flight += 1
+            try:
+                translated = member.translator.translate_batch(text_list, source_lang, target_lang)
+            except Exception as exc:
+                last_error = exc
+                self.counters.add("instance_failures")
+                if member.breaker is not None:
+                    member.breaker.record_failure(str(exc))
+                continue
+            finally:
+                with self._lock:
+                    member.in_flight -= 1
+            if member.breaker is not None:
+                member.breaker.record_success()
+            self.counters.add(f"instance_{member.name}_batches")
+            return translated
+        if last_error is None:
+            raise RuntimeError(f"No {self.engine_name} instance is available")
+        if len(self.members) == 1:
+            raise last_error
+        raise RuntimeError(f"All {self.engine_name} instances failed, last error: {last_error}")
+
+    def check_health(self) -> None:
+        """Ping every instance whose circuit is not closed and close it again if the ping succeeds."""
+        for member in self.members:
+            ping = getattr(member.translator, "ping", None)
+            if member.breaker is None or ping is None or member.breaker.state == CLOSED:
+                continue
+            try:
+                ping()
+            except Exception:
+                self.counters.add("health_check_failures")
+                continue
+            member.breaker.reset("health check passed")
+
+    def _maybe_check_health(self) -> None:
+        if self.health_interval <= 0 or self._clock() - self._checked_at < self.health_interval:
+            return
+        # One caller runs the checks; the others carry on with the instances they have.
+        if not self._health_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked_at = self._clock()
+            self.check_health()
+        finally:
+            self._health_lock.release()
+
+    def breakers(self) -> List[CircuitBreaker]:
+        return [member.breaker for member in self.members if member.breaker is not None]
+
+    def engine_stats(self) -> Dict[str, int]:
+        totals = self.counters.snapshot()
+        for member in self.members:
+            counters = getattr(member.translator, "counters", None)
+            for key, value in (counters.snapshot() if counters is not None else {}).items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def connection_stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for member in self.members:
+            session = getattr(member.translator, "session", None)
+            for key, value in (session.stats() if session is not None else {}).items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def close(self) -> None:
+        for member in self.members:
+            session = getattr(member.translator, "session", None)
+            if session is not None:
+                session.close()
+
+
+def build_pool(
+    role: str,
+    instances: List[Dict[str, Any]],
+    pool_size: int,
+    balance: str = LEAST_IN_FLIGHT,
+    health_interval: float = 30.0,
+    breaker: Optional[Callable[[str], CircuitBreaker]] = None,
+) -> EnginePool:
+    """An :class:`EnginePool` for ``role`` from its instance entries.
+
+    ``breaker(name)`` creates the per-instance circuit breakers; a pool of a
+    single instance gets none, as there is nothing to fail over to.
+    """
+    members: List[PoolMember] = []
+    for idx, entry in enumerate(instances or [{}]):
+        options = dict(entry)
+        name = str(options.pop("name", f"{role}-{idx + 1}"))
+        engine_type = options.pop("type", DEFAULT_TYPES[role])
+        weight = int(options.pop("weight", 1))
+        if engine_type not in ENGINE_TYPES:
+            raise ValueError(f"Unknown engine type {engine_type!r} for {role} instance {name!r}")
+        if weight < 1:
+            raise ValueError(f"Weight of {role} instance {name!r} must be at least 1")
+        try:
+            translator = ENGINE_TYPES[engine_type](options, pool_size)
+        except TypeError as exc:
+            raise ValueError(f"Invalid options for {role} instance {name!r}: {exc}") from exc
+        members.append(PoolMember(name=name, translator=translator, weight=weight))
+    if len(members) > 1 and breaker is not None:
+        for member in members:
+            member.breaker = breaker(f"{role}:{member.name}")
+    return EnginePool(members, balance=balance, health_interval=health_interval)
+
+
+def build_pools(pool_size: int, breaker: Optional[Callable[[str], CircuitBreaker]] = None, config: Optional[Dict[str, Any]] = None) -> Dict[str, EnginePool]:
+    """One pool per routing role, from ``config`` or :func:`load_engine_config`."""
+    config = load_engine_config() if config is None else config
+    balance = config.get("balance", LEAST_IN_FLIGHT)
+    health_interval = float(config.get("health_interval", 30))
+    return {role: build_pool(role, config.get(role, []), pool_size, balance, health_interval, breaker) for role in ROLES}
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+try:  # optional: pip install langid
+    import langid
+except ImportError:  # pragma: no cover - depends on the environment
+    langid = None
+
+# Strings that come out of an engine unchanged (or worse, "translated") are
+# caught before dispatch and passed through as is. Each rule is one anchored
+# regex so classifying a string costs a handful of C-level matches.
+
+_RULES: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    (
+        "date",
+        re.compile(
+            r"\s*(?:\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?"
+            r"|\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AaPp][Mm])?)\s*"
+        ),
+    ),
+    # After dates, so 31.03.2024 is reported as a date rather than a number.
+    ("number", re.compile(r"[\s(+\-−$€£¥]*\d[\d\s.,'’]*(?:[eE][+-]?\d+)?[\s%‰$€£¥)]*")),
+    ("email", re.compile(r"\s*[\w.+-]+@[\w-]+(?:\.[\w-]+)+\s*")),
+    ("url", re.compile(r"\s*(?:(?:https?|ftp)://|www\.)\S+\s*", re.IGNORECASE)),
+    # Upper-case identifiers with at least one digit: SKU-12345, INV/2024/001, AB12X.
+    ("code", re.compile(r"\s*(?=[A-Z0-9_\-./#]*\d)[A-Z0-9][A-Z0-9_\-./#]*\s*")),
+    ("punctuation", re.compile(r"[\W_]+")),
+)
+CATEGORIES = tuple(name for name, _ in _RULES) + ("language", "custom")
+DEFAULT_CATEGORIES = frozenset(name for name, _ in _RULES)
+
+
+@dataclass(frozen=True)
+class SkipRules:
+    """Which kinds of strings bypass the engines.
+
+    ``categories`` names the enabled built-in rules; ``language`` (off by
+    default, needs ``langid``) also passes through strings already detected as
+    the target language once they are at least ``min_language_chars`` long.
+    ``patterns`` are extra regexes, matched against the whole string, reported
+    as ``custom``.
+    """
+
+    categories: FrozenSet[str] = DEFAULT_CATEGORIES
+    patterns: Tuple[str, ...] = ()
+    min_language_chars: int = 20
+
+    @classmethod
+    def parse(cls, spec: str, patterns: Tuple[str, ...] = ()) -> "SkipRules":
+        """Build rules from a comma list such as ``default,language`` or ``number,url``; ``none`` disables all."""
+        categories: set[str] = set()
+        for name in (part.strip() for part in spec.split(",")):
+            if not name or name == "none":
+                continue
+            if name == "default":
+                categories |= DEFAULT_CATEGORIES
+            elif name in CATEGORIES and name != "custom":
+                categories.add(name)
+            else:
+                raise ValueError(f"Unknown skip category: {name}")
+        return cls(categories=frozenset(categories), patterns=tuple(patterns))
+
+    @classmethod
+    def from_env(cls) -> "SkipRules":
+        patterns = os.getenv("EXCEL_TRANSLATOR_SKIP_PATTERNS")
+        return cls.parse(os.getenv("EXCEL_TRANSLATOR_SKIP", "default"), tuple(patterns.split("\n")) if patterns else ())
+
+    def classify(self, text: str, target_lang: str) -> Optional[str]:
+        """Return the category that makes ``text`` a passthrough, or ``None`` when it should be translated."""
+        for name, pattern in _RULES:
+            if name in self.categories and pattern.fullmatch(text):
+                return name
+        for pattern in self.patterns:
+            if re.fullmatch(pattern, text):
+                return "custom"
+        if "language" in self.categories and langid is not None and len(text) >= self.min_language_chars:
+            detected, _score = langid.classify(text)
+            if detected == target_lang.split("-")[0].lower():
+                return "language"
+        return None
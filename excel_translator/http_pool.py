@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class _CountingAdapter(HTTPAdapter):
+    """An adapter that reports each urllib3 pool to ``on_dispose`` before the pool is evicted or closed."""
+
+    def __init__(self, on_dispose: Callable[[Any], None], **kwargs: Any):
+        self._on_dispose = on_dispose
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        pools = self.poolmanager.pools
+        dispose = pools.dispose_func
+
+        def _dispose(pool: Any) -> None:
+            self._on_dispose(pool)
+            if dispose is not None:
+                dispose(pool)
+
+        pools.dispose_func = _dispose
+
+
+class PooledSession:
+    """Keep-alive ``requests`` session with a bounded connection pool, created on first use.
+
+    One instance is owned by each engine so TCP/TLS connections are reused
+    across batches, workbooks and worker threads until :meth:`close`.
+    """
+
+    def __init__(self, pool_size: int = 10):
+        self.pool_size = pool_size
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+        # urllib3 forgets a pool's counters when it evicts or closes the pool, so
+        # the session keeps running totals, folding in each pool's counts when
+        # stats() reads them and when the pool is disposed of.
+        self._count_lock = threading.Lock()
+        self._opened = 0
+        self._requests = 0
+        self._seen: "weakref.WeakKeyDictionary[Any, Tuple[int, int]]" = weakref.WeakKeyDictionary()
+
+    def _get(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = _CountingAdapter(self._count, pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    def post(self, url: str, **kwargs: Any) -> requests.Response:
+        return self._get().post(url, **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        return self._get().get(url, **kwargs)
+
+    def _count(self, pool: Any) -> None:
+        opened, issued = pool.num_connections, pool.num_requests
+        with self._count_lock:
+            seen_opened, seen_issued = self._seen.get(pool, (0, 0))
+            self._opened += max(opened - seen_opened, 0)
+            self._requests += max(issued - seen_issued, 0)
+            self._seen[pool] = (opened, issued)
+
+    def stats(self) -> Dict[str, int]:
+        """Connections opened vs. reused since the session was created; the counts never go down."""
+        live = []
+        with self._lock:
+            session = self._session
+        if session is not None:
+            for adapter in {id(a): a for a in session.adapters.values()}.values():
+                pools = adapter.poolmanager.pools
+                live.extend(pool for pool in (pools.get(key) for key in list(pools.keys())) if pool is not None)
+        for pool in live:
+            self._count(pool)
+        with self._count_lock:
+            return {"connections_opened": self._opened, "connections_reused": max(self._requests - self._opened, 0), "requests": self._requests}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            with self._count_lock:
+                self._opened = self._requests = 0
+                self._seen.clear()
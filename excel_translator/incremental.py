@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import io
+import json
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from .batching import TextSlot, TranslationOutcome
+from .translation_memory import text_hash
+
+MANIFEST_VERSION = 1
+
+
+def part_fingerprint(info: zipfile.ZipInfo) -> str:
+    """Content fingerprint of a package part from its stored CRC-32 and size, without inflating it."""
+    return f"{info.CRC:08x}:{info.file_size}"
+
+
+@dataclass
+class TranslationManifest:
+    """What a previous run translated, keyed by part and ``object_id``.
+
+    ``strings[part][object_id]`` is ``[source_text_hash, translation, engine]``;
+    ``parts[part]`` is the source part's :func:`part_fingerprint`.
+    """
+
+    source_lang: str
+    target_lang: str
+    parts: Dict[str, str] = field(default_factory=dict)
+    strings: Dict[str, Dict[str, List[str]]] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MANIFEST_VERSION,
+            "source_lang": self.source_lang,
+            "target_lang": self.target_lang,
+            "parts": self.parts,
+            "strings": self.strings,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TranslationManifest":
+        if data.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version: {data.get('version')}")
+        return cls(source_lang=data["source_lang"], target_lang=data["target_lang"], parts=data["parts"], strings=data["strings"])
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> "TranslationManifest":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def build_manifest(
+    source_lang: str,
+    target_lang: str,
+    part_fingerprints: Dict[str, str],
+    slots: Sequence[TextSlot],
+    outcomes: Sequence[TranslationOutcome],
+) -> TranslationManifest:
+    """Record the successful translations of a run.
+
+    Failed strings are left out so they are retried next time, and skip-filter
+    passthroughs because classifying them again is cheaper than storing them.
+    """
+    manifest = TranslationManifest(source_lang=source_lang, target_lang=target_lang, parts=dict(part_fingerprints))
+    for slot, outcome in zip(slots, outcomes):
+        if outcome.error or outcome.engine.startswith("skip:"):
+            continue
+        manifest.strings.setdefault(slot.part, {})[slot.object_id] = [text_hash(slot.text), outcome.text, outcome.engine]
+    return manifest
+
+
+def reuse_from_manifest(
+    slots: Sequence[TextSlot],
+    part_fingerprints: Dict[str, str],
+    manifest: TranslationManifest,
+    stats: Dict[str, int],
+) -> Dict[int, TranslationOutcome]:
+    """Return ``{slot_index: outcome}`` for slots whose source text is unchanged since ``manifest``.
+
+    A slot is reused when the same part and ``object_id`` held the same text
+    hash last time. Reused outcomes report their engine as
+    ``incremental:<engine>``. ``stats`` receives the part diff counts and
+    ``strings_reused``; the caller counts ``strings_changed`` once the skip
+    rules have set aside the strings that are never recorded.
+    """
+    reused: Dict[int, TranslationOutcome] = {}
+    for idx, slot in enumerate(slots):
+        previous = manifest.strings.get(slot.part, {}).get(slot.object_id)
+        if previous is not None and previous[0] == text_hash(slot.text):
+            engine = previous[2].split(":", 1)[-1]
+            reused[idx] = TranslationOutcome(text=previous[1], engine=f"incremental:{engine}")
+
+    unchanged_parts = sum(1 for part, fingerprint in part_fingerprints.items() if manifest.parts.get(part) == fingerprint)
+    stats["parts_unchanged"] = stats.get("parts_unchanged", 0) + unchanged_parts
+    stats["parts_changed"] = stats.get("parts_changed", 0) + len(part_fingerprints) - unchanged_parts
+    stats["strings_reused"] = stats.get("strings_reused", 0) + len(reused)
+    return reused
+
+
+def manifest_from_workbooks(source_bytes: bytes, translated_bytes: bytes, source_lang: str, target_lang: str) -> TranslationManifest:
+    """Rebuild a manifest from a previous source workbook and the translated output produced from it.
+
+    Translation preserves package structure, so strings are paired by part and
+    position; positions whose translated text cannot be found are skipped, and
+    so are those left as the source text (failed or skip-filtered last time),
+    so the next run translates them.
+    """
+    from .processor import collect_slots
+
+    with zipfile.ZipFile(io.BytesIO(source_bytes), "r") as zin:
+        source_slots = collect_slots(zin, {})
+        fingerprints = {info.filename: part_fingerprint(info) for info in zin.infolist()}
+    with zipfile.ZipFile(io.BytesIO(translated_bytes), "r") as zin:
+        translated: Dict[Tuple[str, int], str] = {(slot.part, slot.key): slot.text for slot in collect_slots(zin, {})}
+
+    slots: List[TextSlot] = []
+    outcomes: List[TranslationOutcome] = []
+    for slot in source_slots:
+        value = translated.get((slot.part, slot.key))
+        if value is not None and value != slot.text:
+            slots.append(slot)
+            outcomes.append(TranslationOutcome(text=value, engine="previous"))
+    return build_manifest(source_lang, target_lang, fingerprints, slots, outcomes)
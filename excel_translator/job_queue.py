@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Deque, Dict, List, Optional
+
+from .batch import BatchRunner
+from .filters import SkipRules
+from .jobs import COMPLETED, FAILED, PAUSED, JobStore
+
+# Runs JobStore jobs on background threads so the UI script never blocks on a
+# translation. Jobs are taken in slices of a few workbooks: after each slice a
+# job goes to the back of its owner's queue, and owners are served round-robin,
+# so one user's large batch cannot starve everyone else. Each engine mode has
+# its own concurrency limit (a local Ollama box usually handles one job at a
+# time, Azure several). A job keeps one BatchRunner (engines, breakers, worker
+# processes) from its first slice until it finishes, so only the worker thread
+# is handed over between slices. Everything lives in memory; progress that must survive
+# a restart is already on disk in the JobStore, and unfinished jobs can simply
+# be submitted again.
+
+QUEUED = "queued"
+RUNNING = "running"
+CANCELLED = "cancelled"
+ERROR = "error"
+
+
+@dataclass
+class QueuedJob:
+    job_id: str
+    owner: str
+    engine: str
+    max_workers: int = 1
+    state: str = QUEUED
+    done: int = 0
+    total: int = 0
+    current: str = ""
+    error: Optional[str] = None
+    submitted: float = 0.0
+    slices: int = 0
+    cancel_requested: bool = False
+
+    @property
+    def finished(self) -> bool:
+        return self.state in (COMPLETED, FAILED, CANCELLED, ERROR)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+class JobQueue:
+    """Background runner for :class:`~excel_translator.jobs.JobStore` jobs.
+
+    ``workers`` threads take jobs fairly across owners; ``engine_limits`` caps
+    how many jobs of each engine mode run at once; ``slice_files`` is how many
+    workbooks a job processes before yielding its worker. Defaults come from
+    ``EXCEL_TRANSLATOR_QUEUE_WORKERS``, ``EXCEL_TRANSLATOR_QUEUE_AZURE_LIMIT``,
+    ``EXCEL_TRANSLATOR_QUEUE_LOCAL_LIMIT``, ``EXCEL_TRANSLATOR_QUEUE_BUDGET_LIMIT`` and
+    ``EXCEL_TRANSLATOR_QUEUE_SLICE``.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: Optional[int] = None,
+        engine_limits: Optional[Dict[str, int]] = None,
+        slice_files: Optional[int] = None,
+        memory_path: Optional[str] = None,
+        skip_rules: Optional[SkipRules] = None,
+    ):
+        self.store = store
+        self.workers = workers or _env_int("EXCEL_TRANSLATOR_QUEUE_WORKERS", 2)
+        self.engine_limits = engine_limits or {
+            "azure": _env_int("EXCEL_TRANSLATOR_QUEUE_AZURE_LIMIT", self.workers),
+            "local": _env_int("EXCEL_TRANSLATOR_QUEUE_LOCAL_LIMIT", 1),
+            # Budget jobs send part of their strings to the local engine too.
+            "budget": _env_int("EXCEL_TRANSLATOR_QUEUE_BUDGET_LIMIT", _env_int("EXCEL_TRANSLATOR_QUEUE_LOCAL_LIMIT", 1)),
+        }
+        self.slice_files = slice_files or _env_int("EXCEL_TRANSLATOR_QUEUE_SLICE", 5)
+        self.memory_path = memory_path
+        self.skip_rules = skip_rules
+        self._jobs: Dict[str, QueuedJob] = {}
+        self._waiting: Dict[str, Deque[str]] = {}
+        self._owners: Deque[str] = deque()
+        self._running: Dict[str, int] = {}
+        self._runners: Dict[str, BatchRunner] = {}
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._threads = [threading.Thread(target=self._work, name=f"job-queue-{i}", daemon=True) for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job_id: str, owner: str, max_workers: int = 1) -> QueuedJob:
+        """Queue ``job_id`` for ``owner``; submitting a job that is already queued or running is a no-op."""
+        status = self.store.status(job_id)
+        with self._cond:
+            existing = self._jobs.get(job_id)
+            if existing is not None and not existing.finished:
+                return replace(existing)
+            job = QueuedJob(
+                job_id=job_id,
+                owner=owner,
+                engine=status.engine,
+                max_workers=max_workers,
+                done=status.completed,
+                total=status.total,
+                submitted=time.time(),
+            )
+            self._jobs[job_id] = job
+            self._enqueue(job)
+            self._cond.notify_all()
+            return replace(job)
+
+    def _enqueue(self, job: QueuedJob) -> None:
+        if job.owner not in self._waiting:
+            self._waiting[job.owner] = deque()
+            self._owners.append(job.owner)
+        self._waiting[job.owner].append(job.job_id)
+
+    def _pick(self) -> Optional[QueuedJob]:
+        """Next job in owner round-robin whose engine has a free slot, or ``None``."""
+        for _ in range(len(self._owners)):
+            owner = self._owners[0]
+            self._owners.rotate(-1)
+            waiting = self._waiting[owner]
+            for job_id in waiting:
+                job = self._jobs[job_id]
+                if self._running.get(job.engine, 0) < self.engine_limits.get(job.engine, self.workers):
+                    waiting.remove(job_id)
+                    if not waiting:
+                        del self._waiting[owner]
+                        self._owners.remove(owner)
+                    return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping and (job := self._pick()) is None:
+                    self._cond.wait()
+                if job is None:
+                    return
+                self._running[job.engine] = self._running.get(job.engine, 0) + 1
+                job.state = RUNNING
+                job.slices += 1
+
+            def _progress(done: int, total: Optional[int], name: str, job: QueuedJob = job) -> None:
+                with self._cond:
+                    job.done, job.total, job.current = done, total or job.total, name
+
+            error = None
+            state = ERROR
+            try:
+                # Only this thread touches the job while it runs, so the runner needs no lock of its own.
+                runner = self._runners.get(job.job_id)
+                if runner is None:
+                    runner = self._runners[job.job_id] = self.store.runner(job.job_id, job.max_workers, self.memory_path)
+                state = self.store.run(
+                    job.job_id,
+                    progress=_progress,
+                    skip_rules=self.skip_rules,
+                    max_files=self.slice_files,
+                    # Earlier failures are retried once per submission, not on every slice.
+                    skip_failed_since=job.submitted,
+                    runner=runner,
+                ).state
+            except Exception as exc:
+                error = str(exc)
+
+            finished_runner = None
+            with self._cond:
+                self._running[job.engine] -= 1
+                job.error = error
+                if state == PAUSED and not job.cancel_requested:
+                    job.state = QUEUED
+                    self._enqueue(job)
+                elif state == PAUSED:
+                    job.state = CANCELLED
+                else:
+                    job.state = state
+                if job.finished:
+                    finished_runner = self._runners.pop(job.job_id, None)
+                self._cond.notify_all()
+            if finished_runner is not None:
+                finished_runner.close()
+
+    def get(self, job_id: str) -> Optional[QueuedJob]:
+        """A snapshot of the job's queue state, safe to read without locking."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return replace(job) if job is not None else None
+
+    def jobs(self, owner: Optional[str] = None) -> List[QueuedJob]:
+        with self._cond:
+            return [replace(job) for job in self._jobs.values() if owner is None or job.owner == owner]
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job, or stop a running one after its current slice. Checkpoints are kept."""
+        runner = None
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return False
+            job.cancel_requested = True
+            waiting = self._waiting.get(job.owner)
+            if waiting is not None and job_id in waiting:
+                waiting.remove(job_id)
+                if not waiting:
+                    del self._waiting[job.owner]
+                    self._owners.remove(job.owner)
+                job.state = CANCELLED
+                runner = self._runners.pop(job_id, None)
+        if runner is not None:
+            runner.close()
+        return True
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop taking jobs; running slices finish first when ``wait`` is true."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+            with self._cond:
+                runners, self._runners = list(self._runners.values()), {}
+            for runner in runners:
+                runner.close()
@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import shutil
+import tempfile
+import time
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import LOG_FILE_NAME, BatchRunner, ProgressCallback, count_inputs, iter_inputs
+from .filters import SkipRules
+from .logging_utils import TranslationLog
+from .metrics import Span
+from .processor import ProcessingResult
+from .routing import AZURE_BUDGET_PATH_ENV
+
+# A job directory holds everything needed to pick a batch up again after the
+# process dies:
+#
+#   <root>/<job_id>/job.json           inputs, languages, engine, state
+#   <root>/<job_id>/inputs/            uploads copied in by the UI
+#   <root>/<job_id>/memory.sqlite      the job's translation memory
+#   <root>/<job_id>/azure_budget.sqlite Azure characters spent in budget mode
+#   <root>/<job_id>/outputs/<path>     translated workbooks
+#   <root>/<job_id>/logs/<index>.jsonl per-file logs
+#   <root>/<job_id>/done/<index>.json  checkpoint, written last
+#   <root>/<job_id>/failed/<index>.json
+#
+# A workbook counts as done once its checkpoint exists; outputs and logs are
+# renamed into place before that, so a crash never leaves a checkpoint pointing
+# at a partial file. String translations are stored in the job's translation
+# memory batch by batch, so a workbook interrupted halfway re-uses what was
+# already translated when the job is resumed.
+
+JOB_DIR_ENV = "EXCEL_TRANSLATOR_JOB_DIR"
+
+CREATED = "created"
+RUNNING = "running"
+PAUSED = "paused"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def default_job_dir() -> str:
+    return os.getenv(JOB_DIR_ENV, ".excel_translator_jobs")
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@dataclass
+class JobCheckpoint:
+    """One finished workbook: where its output is, plus the stats and metrics of its run."""
+
+    index: int
+    name: str
+    output_path: str
+    stats: Dict[str, int] = field(default_factory=dict)
+    stages: Dict[str, dict] = field(default_factory=dict)
+    spans: List[dict] = field(default_factory=list)
+
+    def to_result(self) -> ProcessingResult:
+        """A :class:`ProcessingResult` carrying only the instrumentation, for the metrics exporters."""
+        return ProcessingResult(
+            output_filename=Path(self.output_path).name,
+            output_bytes=b"",
+            logs=TranslationLog(),
+            stats=dict(self.stats),
+            stages=dict(self.stages),
+            spans=[Span(**span) for span in self.spans],
+        )
+
+
+@dataclass
+class JobStatus:
+    job_id: str
+    state: str
+    source_lang: str
+    target_lang: str
+    engine: str
+    total: int
+    completed: int
+    failed: Dict[str, str] = field(default_factory=dict)
+    created: float = 0.0
+    updated: float = 0.0
+
+    @property
+    def pending(self) -> int:
+        return max(0, self.total - self.completed - len(self.failed))
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "pending": self.pending}
+
+
+class JobStore:
+    """Checkpointed batch jobs under one root directory (default ``$EXCEL_TRANSLATOR_JOB_DIR``).
+
+    :meth:`create` records a job, :meth:`run` translates whatever is not
+    checkpointed yet and can be called again after a crash to resume.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or default_job_dir())
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, job_id: str) -> Path:
+        return self.root / job_id
+
+    def inputs_dir(self, job_id: str) -> Path:
+        return self.path(job_id) / "inputs"
+
+    def new_id(self) -> str:
+        return time.strftime("%Y%m%d-%H%M%S") + "-" + secrets.token_hex(3)
+
+    def exists(self, job_id: str) -> bool:
+        return (self.path(job_id) / "job.json").exists()
+
+    def create(
+        self,
+        inputs: Iterable[str],
+        source_lang: str,
+        target_lang: str,
+        selected_engine: str = "azure",
+        job_id: Optional[str] = None,
+    ) -> str:
+        """Record a new job over ``inputs`` (as accepted by :func:`~excel_translator.batch.iter_inputs`).
+
+        Inputs are referenced, not copied: they must still be there when the
+        job is resumed. The UI copies uploads into :meth:`inputs_dir` first.
+        """
+        job_id = job_id or self.new_id()
+        if self.exists(job_id):
+            raise ValueError(f"Job already exists: {job_id}")
+        inputs = [os.path.abspath(raw) if not set("*?[") & set(raw) else raw for raw in inputs]
+        job_dir = self.path(job_id)
+        for sub in ("outputs", "logs", "done", "failed"):
+            (job_dir / sub).mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        _write_json(
+            job_dir / "job.json",
+            {
+                "job_id": job_id,
+                "inputs": inputs,
+                "source_lang": source_lang,
+                "target_lang": target_lang,
+                "engine": selected_engine,
+                "total": count_inputs(inputs),
+                "state": CREATED,
+                "created": now,
+                "updated": now,
+            },
+        )
+        return job_id
+
+    def _meta(self, job_id: str) -> dict:
+        if not self.exists(job_id):
+            raise KeyError(f"No such job: {job_id}")
+        return _read_json(self.path(job_id) / "job.json")
+
+    def _set_state(self, job_id: str, state: str) -> None:
+        meta = self._meta(job_id)
+        meta.update(state=state, updated=time.time())
+        _write_json(self.path(job_id) / "job.json", meta)
+
+    def checkpoints(self, job_id: str) -> List[JobCheckpoint]:
+        """Finished workbooks in input order."""
+        done_dir = self.path(job_id) / "done"
+        found = [JobCheckpoint(**_read_json(path)) for path in done_dir.glob("*.json")]
+        return sorted(found, key=lambda checkpoint: checkpoint.index)
+
+    def failures(self, job_id: str) -> Dict[int, Tuple[str, str]]:
+        """``index -> (name, error)`` for workbooks that failed in the last run."""
+        found = {}
+        for path in (self.path(job_id) / "failed").glob("*.json"):
+            data = _read_json(path)
+            found[int(path.stem)] = (data["name"], data["error"])
+        return found
+
+    def _failed_by_name(self, job_id: str) -> Dict[str, str]:
+        failures = self.failures(job_id)
+        names = [name for name, _error in failures.values()]
+        # Workbooks from different folders or archives can share a name; keep each one visible.
+        return {
+            (name if names.count(name) == 1 else f"{name} [{index}]"): error
+            for index, (name, error) in sorted(failures.items())
+        }
+
+    def status(self, job_id: str) -> JobStatus:
+        meta = self._meta(job_id)
+        return JobStatus(
+            job_id=job_id,
+            state=meta["state"],
+            source_lang=meta["source_lang"],
+            target_lang=meta["target_lang"],
+            engine=meta["engine"],
+            total=meta["total"],
+            completed=len(list((self.path(job_id) / "done").glob("*.json"))),
+            failed=self._failed_by_name(job_id),
+            created=meta["created"],
+            updated=meta["updated"],
+        )
+
+    def list(self) -> List[JobStatus]:
+        """Every job in the store, newest first."""
+        jobs = [self.status(path.parent.name) for path in self.root.glob("*/job.json")]
+        return sorted(jobs, key=lambda job: job.created, reverse=True)
+
+    def output_file(self, job_id: str, checkpoint: JobCheckpoint) -> Path:
+        return self.path(job_id) / "outputs" / checkpoint.output_path
+
+    def logs(self, job_id: str) -> TranslationLog:
+        """Logs of every finished workbook, in input order."""
+        log = TranslationLog()
+        for checkpoint in self.checkpoints(job_id):
+            with open(self.path(job_id) / "logs" / f"{checkpoint.index}.jsonl", "r", encoding="utf-8") as f:
+                log.extend(TranslationLog.read_jsonl(f))
+        return log
+
+    def _checkpoint(self, job_id: str, index: int, name: str, rel_dir: Path, result: ProcessingResult, used: set[str]) -> None:
+        job_dir = self.path(job_id)
+        rel_path = (rel_dir / result.output_filename).as_posix()
+        if rel_path in used:
+            stem, suffix = os.path.splitext(rel_path)
+            rel_path = f"{stem}_{index}{suffix}"
+        used.add(rel_path)
+
+        target = job_dir / "outputs" / rel_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(result.output_bytes)
+        os.replace(tmp, target)
+
+        log_path = job_dir / "logs" / f"{index}.jsonl"
+        tmp = log_path.with_name(log_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            result.logs.write_jsonl(f)
+        os.replace(tmp, log_path)
+
+        checkpoint = JobCheckpoint(
+            index=index,
+            name=name,
+            output_path=rel_path,
+            stats=result.stats,
+            stages=result.stages,
+            spans=[asdict(span) for span in result.spans],
+        )
+        _write_json(job_dir / "done" / f"{index}.json", asdict(checkpoint))
+        (job_dir / "failed" / f"{index}.json").unlink(missing_ok=True)
+
+    def run(
+        self,
+        job_id: str,
+        max_workers: int = 1,
+        memory_path: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None,
+        skip_rules: Optional[SkipRules] = None,
+        max_files: Optional[int] = None,
+        skip_failed_since: Optional[float] = None,
+        runner: Optional[BatchRunner] = None,
+        manifest_dir: Optional[str] = None,
+    ) -> JobStatus:
+        """Translate every workbook of the job that has no checkpoint yet.
+
+        Safe to call again after an interruption: finished workbooks are skipped
+        without being extracted, and strings already in the job's translation
+        memory (or ``memory_path``, when given) are not sent to an engine again.
+        Workbooks that failed before are retried, except those that failed at
+        or after ``skip_failed_since`` (a ``time.time()`` value). ``progress``
+        counts finished workbooks from earlier runs too.
+
+        With ``max_files`` at most that many workbooks are started; if work is
+        left afterwards the job is ``paused`` rather than finished, which lets
+        a scheduler interleave slices of several jobs. Such a scheduler should
+        pass the same ``runner`` (see :meth:`runner`) to every slice, so
+        engine connections, circuit breakers and worker processes carry over;
+        ``max_workers`` and ``memory_path`` are then the runner's. Without one
+        a runner is started and closed for this call.
+
+        ``manifest_dir`` translates each workbook incrementally as in
+        :func:`~excel_translator.batch.translate_directory`.
+        """
+        meta = self._meta(job_id)
+        job_dir = self.path(job_id)
+        # Failures recorded from here on are not retried by this run (or, with skip_failed_since, this submission).
+        failed_cutoff = time.time() if skip_failed_since is None else skip_failed_since
+        finished = self.checkpoints(job_id)
+        done = {checkpoint.index for checkpoint in finished}
+        skip = set(done)
+        if skip_failed_since is not None:
+            skip |= self._failed_since(job_id, skip_failed_since)
+        used = {checkpoint.output_path for checkpoint in finished}
+        self._set_state(job_id, RUNNING)
+
+        sources: Dict[int, Tuple[Path, Optional[Path]]] = {}
+        names: Dict[int, str] = {}
+        order: List[int] = []
+
+        def _pending() -> Iterator[Tuple[str, str]]:
+            for name, path in iter_inputs(meta["inputs"], scratch_dir, sources, skip=skip):
+                if max_files is not None and len(order) >= max_files:
+                    return
+                # iter_inputs registers the input in ``sources`` just before yielding it.
+                index = next(reversed(sources))
+                order.append(index)
+                names[index] = name
+                yield name, path
+
+        def _release(index: int) -> None:
+            _rel_dir, temp_path = sources.pop(index, (None, None))
+            if temp_path is not None:
+                temp_path.unlink(missing_ok=True)
+
+        def _on_error(position: int, name: str, exc: BaseException) -> None:
+            index = order[position]
+            _write_json(job_dir / "failed" / f"{index}.json", {"name": name, "error": str(exc), "time": time.time()})
+            _release(index)
+
+        def _on_progress(count: int, _total: Optional[int], name: str) -> None:
+            if progress is not None:
+                progress(len(done) + count, meta["total"], name)
+
+        owns_runner = runner is None
+        if runner is None:
+            runner = self.runner(job_id, max_workers, memory_path)
+        scratch_dir = tempfile.mkdtemp(prefix="scratch-", dir=job_dir)
+        try:
+            for position, result in runner.run(
+                _pending(),
+                meta["source_lang"],
+                meta["target_lang"],
+                meta["engine"],
+                progress=_on_progress,
+                on_error=_on_error,
+                manifest_dir=manifest_dir,
+                skip_rules=skip_rules,
+                manifest_key=lambda position, name: (sources[order[position]][0] / name).as_posix(),
+            ):
+                index = order[position]
+                self._checkpoint(job_id, index, names[index], sources[index][0], result, used)
+                _release(index)
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+            if owns_runner:
+                runner.close()
+        # Only reached when the run finishes; an interrupted job stays "running" on disk and can be resumed.
+        # Work is left while some workbook has neither a checkpoint nor a failure this submission will not retry;
+        # ``status.pending`` would leave out older failures that are still due for a retry.
+        status = self.status(job_id)
+        if status.total - status.completed - len(self._failed_since(job_id, failed_cutoff)) > 0:
+            self._set_state(job_id, PAUSED)
+        else:
+            self._set_state(job_id, FAILED if status.failed else COMPLETED)
+        return self.status(job_id)
+
+    def _failed_since(self, job_id: str, since: float) -> set[int]:
+        """Indices of workbooks whose failure was recorded at or after ``since``."""
+        found = set()
+        for path in (self.path(job_id) / "failed").glob("*.json"):
+            if _read_json(path).get("time", 0.0) >= since:
+                found.add(int(path.stem))
+        return found
+
+    def runner(self, job_id: str, max_workers: int = 1, memory_path: Optional[str] = None) -> BatchRunner:
+        """A :class:`~excel_translator.batch.BatchRunner` for ``job_id``; the caller closes it.
+
+        It uses the job's translation memory unless ``memory_path`` is given,
+        and in budget mode one Azure character count per job (kept across
+        slices and resumes) unless ``$EXCEL_TRANSLATOR_AZURE_BUDGET_PATH`` is set.
+        """
+        job_dir = self.path(job_id)
+        return BatchRunner(
+            max_workers,
+            memory_path=memory_path or str(job_dir / "memory.sqlite"),
+            budget_path=os.getenv(AZURE_BUDGET_PATH_ENV) or str(job_dir / "azure_budget.sqlite"),
+        )
+
+    def export(self, job_id: str, output: str) -> List[str]:
+        """Copy finished workbooks and their logs to a directory, or a ``.zip`` when ``output`` ends in ``.zip``."""
+        job_dir = self.path(job_id)
+        checkpoints = self.checkpoints(job_id)
+        if output.lower().endswith(".zip"):
+            Path(output).parent.mkdir(parents=True, exist_ok=True)
+            with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for checkpoint in checkpoints:
+                    zf.write(self.output_file(job_id, checkpoint), checkpoint.output_path)
+                with zf.open(LOG_FILE_NAME, "w") as dst:
+                    for checkpoint in checkpoints:
+                        with open(job_dir / "logs" / f"{checkpoint.index}.jsonl", "rb") as src:
+                            shutil.copyfileobj(src, dst)
+        else:
+            root = Path(output)
+            root.mkdir(parents=True, exist_ok=True)
+            with open(root / LOG_FILE_NAME, "wb") as dst:
+                for checkpoint in checkpoints:
+                    target = root / checkpoint.output_path
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copyfile(self.output_file(job_id, checkpoint), target)
+                    with open(job_dir / "logs" / f"{checkpoint.index}.jsonl", "rb") as src:
+                        shutil.copyfileobj(src, dst)
+        return [checkpoint.output_path for checkpoint in checkpoints]
+
+    def delete(self, job_id: str) -> None:
+        shutil.rmtree(self.path(job_id), ignore_errors=True)
@@ -1,8 +1,20 @@
 from __future__ import annotations
 
 import dataclasses
-from datetime import datetime
-from typing import Optional
+import json
+import time
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Union, overload
+
+
+def _iso_timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def _parse_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value.rstrip("Z")).replace(tzinfo=timezone.utc).timestamp()
 
 
 @dataclasses.dataclass
@@ -15,8 +27,161 @@ class TranslationLogEntry:
     engine: str
     status: str
     error: Optional[str] = None
-    timestamp: str = dataclasses.field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
+    timestamp: str = dataclasses.field(default_factory=lambda: _iso_timestamp(time.time()))
+    route: Optional[str] = None
 
 
 def log_to_dict(entry: TranslationLogEntry) -> dict:
     return dataclasses.asdict(entry)
+
+
+class TranslationLog(Sequence):
+    """Append-only, column-oriented log of :class:`TranslationLogEntry` rows.
+
+    File, sheet, engine and status names are interned into one small table and
+    stored as integer codes; timestamps are floats; errors and routing
+    decisions are kept sparsely.
+    Text columns hold references to the strings the pipeline already has, so
+    a row costs a few machine words instead of a dataclass with an ISO string.
+    Indexing and iteration materialize :class:`TranslationLogEntry` objects on
+    demand, so code written against a list of entries keeps working.
+    """
+
+    def __init__(self, entries: Iterable[TranslationLogEntry] = ()):
+        self._names: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self._file = array("I")
+        self._sheet = array("I")
+        self._engine = array("I")
+        self._status = array("I")
+        self._timestamp = array("d")
+        self._object_id: List[str] = []
+        self._original: List[str] = []
+        self._translated: List[str] = []
+        self._errors: Dict[int, str] = {}
+        self._routes: Dict[int, str] = {}
+        for entry in entries:
+            self.append(entry)
+
+    def _intern(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._names)
+            self._names.append(value)
+        return code
+
+    def add(
+        self,
+        file_name: str,
+        sheet_name: str,
+        object_id: str,
+        original_text: str,
+        translated_text: str,
+        engine: str,
+        status: str,
+        error: Optional[str] = None,
+        timestamp: Optional[float] = None,
+        route: Optional[str] = None,
+    ) -> None:
+        """Append one row; ``timestamp`` is seconds since the epoch and defaults to now.
+
+        ``route`` is the routing decision (``<engine>:<reason>``) in budget mode.
+        """
+        if error is not None:
+            self._errors[len(self._object_id)] = error
+        if route is not None:
+            self._routes[len(self._object_id)] = route
+        self._file.append(self._intern(file_name))
+        self._sheet.append(self._intern(sheet_name))
+        self._engine.append(self._intern(engine))
+        self._status.append(self._intern(status))
+        self._timestamp.append(time.time() if timestamp is None else timestamp)
+        self._object_id.append(object_id)
+        self._original.append(original_text)
+        self._translated.append(translated_text)
+
+    def append(self, entry: TranslationLogEntry) -> None:
+        self.add(
+            entry.file_name,
+            entry.sheet_name,
+            entry.object_id,
+            entry.original_text,
+            entry.translated_text,
+            entry.engine,
+            entry.status,
+            entry.error,
+            _parse_timestamp(entry.timestamp),
+            entry.route,
+        )
+
+    def extend(self, other: Iterable[TranslationLogEntry]) -> None:
+        if not isinstance(other, TranslationLog):
+            for entry in other:
+                self.append(entry)
+            return
+        offset = len(self)
+        remap = [self._intern(name) for name in other._names]
+        for column, source in ((self._file, other._file), (self._sheet, other._sheet), (self._engine, other._engine), (self._status, other._status)):
+            column.extend(remap[code] for code in source)
+        self._timestamp.extend(other._timestamp)
+        self._object_id.extend(other._object_id)
+        self._original.extend(other._original)
+        self._translated.extend(other._translated)
+        self._errors.update((offset + idx, error) for idx, error in other._errors.items())
+        self._routes.update((offset + idx, route) for idx, route in other._routes.items())
+
+    def __len__(self) -> int:
+        return len(self._object_id)
+
+    def row(self, index: int) -> dict:
+        """Row ``index`` as the same dict :func:`log_to_dict` produces."""
+        names = self._names
+        return {
+            "file_name": names[self._file[index]],
+            "sheet_name": names[self._sheet[index]],
+            "object_id": self._object_id[index],
+            "original_text": self._original[index],
+            "translated_text": self._translated[index],
+            "engine": names[self._engine[index]],
+            "status": names[self._status[index]],
+            "error": self._errors.get(index),
+            "timestamp": _iso_timestamp(self._timestamp[index]),
+            "route": self._routes.get(index),
+        }
+
+    @overload
+    def __getitem__(self, index: int) -> TranslationLogEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[TranslationLogEntry]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TranslationLogEntry, List[TranslationLogEntry]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("log index out of range")
+        return TranslationLogEntry(**self.row(index))
+
+    def iter_dicts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[dict]:
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self.row(index)
+
+    def page(self, offset: int, limit: int) -> List[dict]:
+        """Rows ``offset`` to ``offset + limit`` as dicts, for paginated display."""
+        return list(self.iter_dicts(offset, offset + limit))
+
+    @classmethod
+    def read_jsonl(cls, fp: TextIO) -> "TranslationLog":
+        """Load rows written by :meth:`write_jsonl`."""
+        log = cls()
+        for line in fp:
+            if line.strip():
+                log.append(TranslationLogEntry(**json.loads(line)))
+        return log
+
+    def write_jsonl(self, fp: TextIO) -> None:
+        """Stream every row to ``fp`` as one JSON object per line."""
+        for row in self.iter_dicts():
+            fp.write(json.dumps(row, ensure_ascii=False) + "\n")
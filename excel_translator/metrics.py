@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+if TYPE_CHECKING:
+    from .processor import ProcessingResult
+
+# Per-stage wall time and peak resident memory for one workbook, plus a span
+# per stage and per engine call. The peak reported for a stage is the process
+# peak observed when the stage ended. Resetting the kernel's RSS high-water
+# mark affects the whole process, so it is only done on request, by a
+# single-threaded benchmark: after measure_stage_peaks() the mark is reset at
+# the start of every stage on Linux, and each stage reports its own peak.
+
+SERVICE_NAME = "excel_translator"
+
+_stage_peaks = False
+
+
+def measure_stage_peaks(enabled: bool = True) -> None:
+    """Reset the process RSS high-water mark at the start of every stage (Linux only)."""
+    global _stage_peaks
+    _stage_peaks = enabled
+
+
+def _reset_peak_rss() -> None:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_bytes() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB on Linux.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Counters:
+    """Thread-safe running totals, read as deltas around a unit of work via :meth:`snapshot`."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._values)
+
+
+@dataclass
+class StageMetrics:
+    seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    calls: int = 0
+
+
+@dataclass
+class Span:
+    """One timed operation. ``parent`` names the stage it ran inside, if any."""
+
+    name: str
+    start: float
+    duration: float = 0.0
+    parent: Optional[str] = None
+    attributes: Dict[str, object] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class StageTimer:
+    """Accumulates :class:`StageMetrics` per named stage and records :class:`Span` objects.
+
+    Re-entering a stage adds to its totals and records another span.
+    :meth:`span` is safe to call from worker threads.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageMetrics] = {}
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[str] = None, **attributes: object) -> Iterator[Span]:
+        span = Span(name=name, start=time.time(), parent=parent, attributes=dict(attributes))
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = str(exc)
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            with self._lock:
+                self.spans.append(span)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if _stage_peaks:
+            _reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            with self.span(name):
+                yield
+        finally:
+            metrics = self.stages.setdefault(name, StageMetrics())
+            metrics.seconds += time.perf_counter() - start
+            metrics.peak_rss_bytes = max(metrics.peak_rss_bytes, peak_rss_bytes())
+            metrics.calls += 1
+
+    def as_dict(self) -> Dict[str, dict]:
+        return {name: asdict(metrics) for name, metrics in self.stages.items()}
+
+
+def _metric_name(key: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", key)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text(results: Iterable["ProcessingResult"]) -> str:
+    """Render stages, engine calls and counters of ``results`` in the Prometheus text exposition format.
+
+    Every sample is labelled with the output file name.
+    """
+    families: Dict[str, tuple[str, List[str]]] = {}
+
+    def sample(metric: str, kind: str, labels: Dict[str, str], value: float) -> None:
+        rendered = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+        families.setdefault(metric, (kind, []))[1].append(f"{metric}{{{rendered}}} {value:g}")
+
+    for result in results:
+        file_label = {"file": result.output_filename}
+        for stage, metrics in result.stages.items():
+            labels = {**file_label, "stage": stage}
+            sample(f"{SERVICE_NAME}_stage_seconds", "gauge", labels, metrics["seconds"])
+            sample(f"{SERVICE_NAME}_stage_peak_rss_bytes", "gauge", labels, metrics["peak_rss_bytes"])
+        engine_calls: Dict[str, List[float]] = {}
+        for span in result.spans:
+            if span.name == "engine_call":
+                engine_calls.setdefault(str(span.attributes.get("engine", "none")), []).append(span.duration)
+        for engine, durations in engine_calls.items():
+            labels = {**file_label, "engine": engine}
+            sample(f"{SERVICE_NAME}_engine_call_seconds_sum", "counter", labels, sum(durations))
+            sample(f"{SERVICE_NAME}_engine_call_seconds_count", "counter", labels, len(durations))
+        for key, value in sorted(result.stats.items()):
+            sample(f"{SERVICE_NAME}_{_metric_name(key)}_total", "counter", file_label, value)
+
+    lines: List[str] = []
+    for metric, (kind, samples) in families.items():
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def _otel_value(value: object) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otel_attributes(attributes: Dict[str, object]) -> List[dict]:
+    return [{"key": key, "value": _otel_value(value)} for key, value in attributes.items()]
+
+
+def otel_json(results: Iterable["ProcessingResult"]) -> dict:
+    """Export ``results`` as OTLP/JSON-shaped ``resourceSpans`` and ``resourceMetrics``.
+
+    Each workbook is one trace: a root ``process_excel_file`` span with the
+    stages as children and engine calls under the stage that issued them.
+    """
+    otel_resource = {"attributes": _otel_attributes({"service.name": SERVICE_NAME})}
+    scope = {"name": SERVICE_NAME}
+    spans: List[dict] = []
+    data_points: Dict[str, List[dict]] = {}
+
+    for trace_number, result in enumerate(results, start=1):
+        trace_id = f"{trace_number:032x}"
+        own = sorted(result.spans, key=lambda span: span.start)
+        if not own:
+            continue
+        root_start = own[0].start
+        root_end = max(span.start + span.duration for span in own)
+        root_id = f"{trace_number:08x}{0:08x}"
+        spans.append(
+            {
+                "traceId": trace_id,
+                "spanId": root_id,
+                "name": "process_excel_file",
+                "startTimeUnixNano": str(int(root_start * 1e9)),
+                "endTimeUnixNano": str(int(root_end * 1e9)),
+                "attributes": _otel_attributes({"file": result.output_filename}),
+                "status": {"code": 1},
+            }
+        )
+        stage_ids: Dict[str, str] = {}
+        for number, span in enumerate(own, start=1):
+            span_id = f"{trace_number:08x}{number:08x}"
+            if span.parent is None:
+                stage_ids[span.name] = span_id
+            spans.append(
+                {
+                    "traceId": trace_id,
+                    "spanId": span_id,
+                    "parentSpanId": stage_ids.get(span.parent, root_id) if span.parent else root_id,
+                    "name": span.name,
+                    "startTimeUnixNano": str(int(span.start * 1e9)),
+                    "endTimeUnixNano": str(int((span.start + span.duration) * 1e9)),
+                    "attributes": _otel_attributes(span.attributes),
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                }
+            )
+        for key, value in result.stats.items():
+            data_points.setdefault(key, []).append(
+                {"asInt": str(value), "timeUnixNano": str(int(root_end * 1e9)), "attributes": _otel_attributes({"file": result.output_filename})}
+            )
+
+    metrics = [
+        {"name": f"{SERVICE_NAME}.{key}", "sum": {"dataPoints": points, "aggregationTemporality": 2, "isMonotonic": True}}
+        for key, points in data_points.items()
+    ]
+    return {
+        "resourceSpans": [{"resource": otel_resource, "scopeSpans": [{"scope": scope, "spans": spans}]}],
+        "resourceMetrics": [{"resource": otel_resource, "scopeMetrics": [{"scope": scope, "metrics": metrics}]}],
+    }
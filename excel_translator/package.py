@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import copy
+import struct
+import tempfile
+import zipfile
+import zlib
+from typing import BinaryIO
+
+# Helpers for rewriting an .xlsx package in a single pass: untouched members
+# are copied as their original compressed bytes instead of being inflated and
+# deflated again.
+#
+# Writing compressed bytes directly relies on private ZipFile attributes
+# (_lock, _writing, _writecheck, start_dir, ...). If a Python version drops
+# or renames one, the AttributeError surfaces before anything is written to
+# the output, and the member is inflated and written through the public API
+# instead: slower, but the archive stays valid.
+
+_COPY_BLOCK = 1 << 20
+# Pre-compressed members bigger than this go to a temp file instead of memory.
+DEFLATE_SPOOL_BYTES = 8 << 20
+_ZIP64_EXTRA_ID = 0x0001
+
+
+def _strip_zip64_extra(extra: bytes) -> bytes:
+    """Drop the ZIP64 extra field; ``ZipInfo.FileHeader`` appends a fresh one when needed."""
+    kept = b""
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, size = struct.unpack("<HH", extra[pos : pos + 4])
+        if header_id != _ZIP64_EXTRA_ID:
+            kept += extra[pos : pos + 4 + size]
+        pos += 4 + size
+    return kept
+
+
+def _open_raw(zin: zipfile.ZipFile, info: zipfile.ZipInfo) -> BinaryIO:
+    """Position ``zin``'s file at the start of ``info``'s compressed data."""
+    fp = zin.fp
+    fp.seek(info.header_offset)
+    header = fp.read(zipfile.sizeFileHeader)
+    if len(header) != zipfile.sizeFileHeader or header[:4] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f"Bad local file header for {info.filename}")
+    fields = struct.unpack(zipfile.structFileHeader, header)
+    fp.seek(fields[zipfile._FH_FILENAME_LENGTH] + fields[zipfile._FH_EXTRA_FIELD_LENGTH], 1)
+    return fp
+
+
+def _write_raw(zout: zipfile.ZipFile, out_info: zipfile.ZipInfo, src: BinaryIO, zip64: bool) -> None:
+    """Append ``out_info``'s local header and ``out_info.compress_size`` bytes from ``src`` to ``zout``; caller holds ``zout._lock``.
+
+    Every private attribute is read before the first byte is written, so an
+    ``AttributeError`` leaves ``zout`` untouched.
+    """
+    if zout._writing:
+        raise ValueError("Can't write to the ZIP file while another write handle is open")
+    if zout._seekable:
+        zout.fp.seek(zout.start_dir)
+    out_info.header_offset = zout.fp.tell()
+    zout._writecheck(out_info)
+    zout._didModify = True
+    zout.fp.write(out_info.FileHeader(zip64))
+
+    remaining = out_info.compress_size
+    while remaining:
+        block = src.read(min(_COPY_BLOCK, remaining))
+        if not block:
+            raise zipfile.BadZipFile(f"Truncated data for {out_info.filename}")
+        zout.fp.write(block)
+        remaining -= len(block)
+
+    zout.start_dir = zout.fp.tell()
+    zout.filelist.append(out_info)
+    zout.NameToInfo[out_info.filename] = out_info
+
+
+def copy_member_raw(zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+    """Copy ``info`` from ``zin`` into ``zout`` verbatim, reusing its compressed bytes and metadata."""
+    if info.flag_bits & 0x1:
+        raise ValueError(f"Cannot raw-copy encrypted member {info.filename}")
+
+    out_info = copy.copy(info)
+    # Sizes and CRC are known up front, so the local header carries them and no data descriptor is needed.
+    out_info.flag_bits &= ~0x08
+    zip64 = info.file_size > zipfile.ZIP64_LIMIT or info.compress_size > zipfile.ZIP64_LIMIT
+    out_info.extra = _strip_zip64_extra(info.extra)
+
+    try:
+        with zin._lock, zout._lock:
+            _write_raw(zout, out_info, _open_raw(zin, info), zip64)
+    except AttributeError:
+        zout.writestr(out_info, zin.read(info))
+
+
+class DeflatedMember:
+    """A package member compressed ahead of time, so it can be produced on any thread.
+
+    Write the uncompressed bytes with :meth:`write`, then hand the member to
+    :meth:`write_to` on the thread that owns the output archive. Compressed
+    bytes stay in memory up to ``spool_bytes`` and spill to a temp file beyond.
+    """
+
+    def __init__(self, info: zipfile.ZipInfo, level: int = zlib.Z_DEFAULT_COMPRESSION, spool_bytes: int = DEFLATE_SPOOL_BYTES):
+        self.info = rewritten_info(info)
+        self.info.file_size = 0
+        self.info.compress_size = 0
+        self.info.CRC = 0
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        self._data = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+
+    def write(self, data: bytes) -> int:
+        self.info.CRC = zlib.crc32(data, self.info.CRC)
+        self.info.file_size += len(data)
+        self._data.write(self._compressor.compress(data))
+        return len(data)
+
+    def finish(self) -> "DeflatedMember":
+        self._data.write(self._compressor.flush())
+        self.info.compress_size = self._data.tell()
+        self._data.seek(0)
+        return self
+
+    def write_to(self, zout: zipfile.ZipFile) -> None:
+        zip64 = self.info.file_size > zipfile.ZIP64_LIMIT or self.info.compress_size > zipfile.ZIP64_LIMIT
+        try:
+            with zout._lock:
+                _write_raw(zout, self.info, self._data, zip64)
+        except AttributeError:
+            self._data.seek(0)
+            zout.writestr(self.info, zlib.decompress(self._data.read(), -15))
+        finally:
+            self._data.close()
+
+
+def rewritten_info(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """A fresh deflated entry with ``info``'s name, timestamp and attributes for a changed member."""
+    out_info = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    out_info.compress_type = zipfile.ZIP_DEFLATED
+    out_info.external_attr = info.external_attr
+    out_info.create_system = info.create_system
+    out_info.file_size = info.file_size
+    return out_info
@@ -1,28 +1,53 @@
 from __future__ import annotations
 
 import io
+import os
 import re
-import xml.etree.ElementTree as ET
 import zipfile
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
-
-from .drawing_xml import translate_drawings_and_charts
-from .logging_utils import TranslationLogEntry
+from typing import Dict, List, Optional
+
+from .batching import TextSlot, TranslationMemo, TranslationOutcome, translate_texts
+from .concurrency import map_ordered
+from .drawing_xml import apply_xml_translations, extract_xml_texts, is_drawing_or_chart_part
+from .filters import SkipRules
+from .incremental import TranslationManifest, build_manifest, part_fingerprint, reuse_from_manifest
+from .logging_utils import TranslationLog
+from .metrics import Span, StageTimer
+from .package import DeflatedMember, copy_member_raw
+from .rich_text import join_runs, split_runs
+from .segmentation import Segmenter
+from .translation_memory import TranslationMemory
 from .translators import RoutedTranslator
+from .worksheet_stream import iter_shared_string_refs, iter_string_cells, rewrite_string_cells
+from .xml_backend import Element, get_backend
 
 INVALID_SHEET_CHARS = r"[\\/*?:\[\]]"
 S_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
 R_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
 PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+WORKBOOK_PATH = "xl/workbook.xml"
+WORKBOOK_RELS_PATH = "xl/_rels/workbook.xml.rels"
+SHARED_STRINGS_PATH = "xl/sharedStrings.xml"
+
+
+def default_part_workers() -> int:
+    return int(os.getenv("EXCEL_TRANSLATOR_PART_WORKERS", str(min(4, os.cpu_count() or 1))))
 
 
 @dataclass
 class ProcessingResult:
     output_filename: str
     output_bytes: bytes
-    logs: List[TranslationLogEntry]
+    logs: TranslationLog
+    stats: Dict[str, int] = field(default_factory=dict)
+    manifest: Optional[TranslationManifest] = None
+    # Wall time and peak RSS per pipeline stage, and a span per stage and engine call; see metrics.StageTimer.
+    stages: Dict[str, dict] = field(default_factory=dict)
+    spans: List[Span] = field(default_factory=list)
 
 
 def _safe_sheet_title(name: str, existing: set[str]) -> str:
@@ -69,62 +94,25 @@ def _translate_text(translator: RoutedTranslator, text: str, source_lang: str, t
     return translator.translate_with_engine(text, source_lang, target_lang)
 
 
-def _translate_workbook_sheet_names(
-    workbook_xml: bytes,
-    file_name: str,
-    translator: RoutedTranslator,
-    source_lang: str,
-    target_lang: str,
-    logs: List[TranslationLogEntry],
-) -> tuple[bytes, dict[str, str]]:
-    root = ET.fromstring(workbook_xml)
-    existing_titles: set[str] = set()
-    rid_to_sheet: dict[str, str] = {}
-
-    for sheet in root.findall(f".//{S_NS}sheet"):
-        original_title = sheet.attrib.get("name", "")
-        rid = sheet.attrib.get(f"{R_NS}id", "")
-        try:
-            translated, engine = _translate_text(translator, original_title, source_lang, target_lang)
-            safe = _safe_sheet_title(translated, existing_titles)
-            sheet.set("name", safe)
-            if rid:
-                rid_to_sheet[rid] = safe
-            existing_titles.add(safe)
-            logs.append(
-                TranslationLogEntry(
-                    file_name=file_name,
-                    sheet_name=safe,
-                    object_id="sheet_title",
-                    original_text=original_title,
-                    translated_text=safe,
-                    engine=engine,
-                    status="ok",
-                )
-            )
-        except Exception as exc:
-            safe = original_title
-            if rid:
-                rid_to_sheet[rid] = safe
-            existing_titles.add(safe)
-            logs.append(
-                TranslationLogEntry(
-                    file_name=file_name,
-                    sheet_name=safe,
-                    object_id="sheet_title",
-                    original_text=original_title,
-                    translated_text=original_title,
-                    engine="none",
-                    status="error",
-                    error=str(exc),
-                )
-            )
+def _extract_sheet_names(workbook_xml: bytes) -> List[tuple[int, str, str]]:
+    """Return ``(position, relationship id, title)`` for every ``<sheet>`` in the workbook."""
+    root = get_backend().fromstring(workbook_xml)
+    return [
+        (idx, sheet.attrib.get(f"{R_NS}id", ""), sheet.attrib.get("name", ""))
+        for idx, sheet in enumerate(root.findall(f".//{S_NS}sheet"))
+    ]
 
-    return ET.tostring(root, encoding="utf-8", xml_declaration=True), rid_to_sheet
+
+def _rewrite_sheet_names(workbook_xml: bytes, titles: dict[int, str]) -> bytes:
+    root = get_backend().fromstring(workbook_xml)
+    for idx, sheet in enumerate(root.findall(f".//{S_NS}sheet")):
+        if idx in titles:
+            sheet.set("name", titles[idx])
+    return get_backend().tostring(root)
 
 
 def _workbook_relationships_map(workbook_rels_xml: bytes) -> dict[str, str]:
-    root = ET.fromstring(workbook_rels_xml)
+    root = get_backend().fromstring(workbook_rels_xml)
     mapping: dict[str, str] = {}
     for rel in root.findall(f".//{PKG_REL_NS}Relationship"):
         rid = rel.attrib.get("Id")
@@ -134,116 +122,257 @@ def _workbook_relationships_map(workbook_rels_xml: bytes) -> dict[str, str]:
     return mapping
 
 
-def _translate_shared_strings(
-    xml_bytes: bytes,
-    file_name: str,
-    translator: RoutedTranslator,
-    source_lang: str,
-    target_lang: str,
-    logs: List[TranslationLogEntry],
-) -> bytes:
-    root = ET.fromstring(xml_bytes)
-    for idx, node in enumerate(root.iter(f"{S_NS}t")):
-        original = node.text
-        if not original or not original.strip():
+def _visible_sheet_rids(workbook_xml: bytes) -> set[str]:
+    """Relationship ids of the sheets that are not ``hidden`` or ``veryHidden``."""
+    root = get_backend().fromstring(workbook_xml)
+    return {
+        sheet.attrib.get(f"{R_NS}id", "")
+        for sheet in root.findall(f".//{S_NS}sheet")
+        if sheet.attrib.get("state", "visible") == "visible"
+    }
+
+
+def _shared_string_runs(si: Element) -> List[Element]:
+    """The ``<t>`` nodes that make up a shared string: its plain text or its rich-text runs, never phonetic ``<rPh>`` runs."""
+    plain = si.find(f"{S_NS}t")
+    if plain is not None:
+        return [plain]
+    return [t for r in si.findall(f"{S_NS}r") for t in r.findall(f"{S_NS}t")]
+
+
+def _extract_shared_strings(xml_bytes: bytes, referenced: Optional[set[int]] = None, stats: Optional[Dict[str, int]] = None) -> List[tuple[int, str, str]]:
+    """Return one ``(si index, object id, text)`` entry per translatable ``<si>``.
+
+    Rich-text items are joined into one text with run markers (see
+    :mod:`.rich_text`). With ``referenced``, items no visible cell points at
+    are skipped and counted in ``stats`` as ``shared_strings_orphaned``.
+    """
+    extracted: List[tuple[int, str, str]] = []
+    orphaned = 0
+    for idx, si in enumerate(get_backend().iterparse(xml_bytes, f"{S_NS}si")):
+        runs = [node.text or "" for node in _shared_string_runs(si)]
+        if not runs or not "".join(runs).strip():
             continue
-        try:
-            translated, engine = _translate_text(translator, original, source_lang, target_lang)
-            node.text = translated
-            logs.append(
-                TranslationLogEntry(
-                    file_name=file_name,
-                    sheet_name="<shared-strings>",
-                    object_id=f"sharedString:{idx}",
-                    original_text=original,
-                    translated_text=translated,
-                    engine=engine,
-                    status="ok",
-                )
-            )
-        except Exception as exc:
-            logs.append(
-                TranslationLogEntry(
-                    file_name=file_name,
-                    sheet_name="<shared-strings>",
-                    object_id=f"sharedString:{idx}",
-                    original_text=original,
-                    translated_text=original,
-                    engine="none",
-                    status="error",
-                    error=str(exc),
-                )
-            )
-    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
-
-
-def _translate_sheet_cells(
-    xml_bytes: bytes,
-    sheet_name: str,
-    file_name: str,
-    translator: RoutedTranslator,
-    source_lang: str,
-    target_lang: str,
-    logs: List[TranslationLogEntry],
-) -> bytes:
-    root = ET.fromstring(xml_bytes)
-
-    for cell in root.iter(f"{S_NS}c"):
-        coord = cell.attrib.get("r", "?")
-        if cell.find(f"{S_NS}f") is not None:
+        if referenced is not None and idx not in referenced:
+            orphaned += 1
             continue
+        extracted.append((idx, f"sharedString:{idx}", join_runs(runs)))
+    if stats is not None and referenced is not None:
+        stats["shared_strings_orphaned"] = stats.get("shared_strings_orphaned", 0) + orphaned
+    return extracted
 
-        inline_t = cell.find(f"{S_NS}is/{S_NS}t")
-        if inline_t is not None and inline_t.text and inline_t.text.strip():
-            original = inline_t.text
-            try:
-                translated, engine = _translate_text(translator, original, source_lang, target_lang)
-                inline_t.text = translated
-                logs.append(TranslationLogEntry(file_name=file_name, sheet_name=sheet_name, object_id=f"cell:{coord}", original_text=original, translated_text=translated, engine=engine, status="ok"))
-            except Exception as exc:
-                logs.append(TranslationLogEntry(file_name=file_name, sheet_name=sheet_name, object_id=f"cell:{coord}", original_text=original, translated_text=original, engine="none", status="error", error=str(exc)))
-            continue
-
-        if cell.attrib.get("t") == "str":
-            value_node = cell.find(f"{S_NS}v")
-            if value_node is not None and value_node.text and value_node.text.strip():
-                original = value_node.text
-                try:
-                    translated, engine = _translate_text(translator, original, source_lang, target_lang)
-                    value_node.text = translated
-                    logs.append(TranslationLogEntry(file_name=file_name, sheet_name=sheet_name, object_id=f"cell:{coord}", original_text=original, translated_text=translated, engine=engine, status="ok"))
-                except Exception as exc:
-                    logs.append(TranslationLogEntry(file_name=file_name, sheet_name=sheet_name, object_id=f"cell:{coord}", original_text=original, translated_text=original, engine="none", status="error", error=str(exc)))
-
-    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
 
+def _rewrite_shared_strings(xml_bytes: bytes, replacements: dict[int, str]) -> bytes:
+    root = get_backend().fromstring(xml_bytes)
+    for idx, si in enumerate(root.findall(f"{S_NS}si")):
+        if idx not in replacements:
+            continue
+        nodes = _shared_string_runs(si)
+        for node, text in zip(nodes, split_runs(replacements[idx], [node.text or "" for node in nodes])):
+            node.text = text
+            if text != text.strip():
+                node.set(XML_SPACE, "preserve")
+    return get_backend().tostring(root)
+
+
+def _extract_comments(xml_bytes: bytes) -> List[tuple[int, str, str]]:
+    extracted: List[tuple[int, str, str]] = []
+    key = 0
+    for comment in get_backend().iterparse(xml_bytes, f"{S_NS}comment"):
+        ref = comment.attrib.get("ref", "?")
+        for idx, node in enumerate(comment.iter(f"{S_NS}t")):
+            if node.text and node.text.strip():
+                extracted.append((key, f"comment:{ref}:{idx}", node.text))
+            key += 1
+    return extracted
 
-def _translate_comments(
-    xml_bytes: bytes,
-    sheet_name: str,
-    file_name: str,
-    translator: RoutedTranslator,
-    source_lang: str,
-    target_lang: str,
-    logs: List[TranslationLogEntry],
-) -> bytes:
-    root = ET.fromstring(xml_bytes)
 
+def _rewrite_comments(xml_bytes: bytes, replacements: dict[int, str]) -> bytes:
+    root = get_backend().fromstring(xml_bytes)
+    key = 0
     for comment in root.findall(f".//{S_NS}comment"):
-        ref = comment.attrib.get("ref", "?")
-        text_nodes = list(comment.iter(f"{S_NS}t"))
-        for idx, node in enumerate(text_nodes):
-            original = node.text
-            if not original or not original.strip():
-                continue
-            try:
-                translated, engine = _translate_text(translator, original, source_lang, target_lang)
-                node.text = translated
-                logs.append(TranslationLogEntry(file_name=file_name, sheet_name=sheet_name, object_id=f"comment:{ref}:{idx}", original_text=original, translated_text=translated, engine=engine, status="ok"))
-            except Exception as exc:
-                logs.append(TranslationLogEntry(file_name=file_name, sheet_name=sheet_name, object_id=f"comment:{ref}:{idx}", original_text=original, translated_text=original, engine="none", status="error", error=str(exc)))
+        for node in comment.iter(f"{S_NS}t"):
+            if key in replacements:
+                node.text = replacements[key]
+            key += 1
+    return get_backend().tostring(root)
+
+
+def _is_comments_part(path: str) -> bool:
+    return path.startswith("xl/comments") and path.endswith(".xml")
+
+
+def _is_worksheet_part(path: str) -> bool:
+    return path.startswith("xl/worksheets/")
+
+
+def collect_slots(
+    zin: zipfile.ZipFile,
+    loaded: dict[str, bytes],
+    stats: Optional[Dict[str, int]] = None,
+    timer: Optional[StageTimer] = None,
+    max_workers: int = 1,
+) -> List[TextSlot]:
+    """Phase 1: walk every part and collect each translatable string with its location.
+
+    Non-worksheet XML parts that hold text are read into ``loaded``; worksheets
+    are streamed straight from the archive. Shared strings are only collected
+    when a ``t="s"`` cell of a visible sheet references them. ``timer`` receives
+    the ``sheet_names``, ``worksheets``, ``shared_strings``, ``comments`` and
+    ``drawings`` stages.
+
+    Within each stage the parts are read and parsed on up to ``max_workers``
+    threads; results are merged in part order, so the slots are the same for
+    any worker count.
+    """
+    timer = StageTimer() if timer is None else timer
+    names = [info.filename for info in zin.infolist()]
+    name_set = set(names)
+    slots: List[TextSlot] = []
+    sheets: List[tuple[int, str, str]] = []
+    rid_to_target: dict[str, str] = {}
+    visible_rids: set[str] = set()
+
+    with timer.stage("sheet_names"):
+        if WORKBOOK_PATH in name_set:
+            loaded[WORKBOOK_PATH] = zin.read(WORKBOOK_PATH)
+            sheets = _extract_sheet_names(loaded[WORKBOOK_PATH])
+            visible_rids = _visible_sheet_rids(loaded[WORKBOOK_PATH])
+            slots.extend(
+                TextSlot(part=WORKBOOK_PATH, key=idx, sheet_name=title, object_id=f"sheet_title:{idx}", text=title)
+                for idx, _rid, title in sheets
+            )
 
-    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+        if WORKBOOK_RELS_PATH in name_set:
+            rid_to_target = _workbook_relationships_map(zin.read(WORKBOOK_RELS_PATH))
+
+    # Without a resolvable sheet list every shared string is kept rather than guessing at references.
+    referenced: Optional[set[int]] = None
+    sheet_parts = [
+        (rid, target, title)
+        for _idx, rid, title in sheets
+        if (target := rid_to_target.get(rid)) and target in name_set and _is_worksheet_part(target)
+    ]
+
+    def _sheet_slots(sheet: tuple[str, str, str]) -> List[TextSlot]:
+        _rid, target, title = sheet
+        with zin.open(target) as stream:
+            return [
+                TextSlot(part=target, key=key, sheet_name=title, object_id=f"cell:{coord}", text=text)
+                for key, coord, text in iter_string_cells(stream)
+            ]
+
+    def _shared_refs(target: str) -> set[int]:
+        with zin.open(target) as stream:
+            return set(iter_shared_string_refs(stream))
+
+    with timer.stage("worksheets"):
+        for found in map_ordered(_sheet_slots, sheet_parts, max_workers):
+            slots.extend(found)
+
+        if SHARED_STRINGS_PATH in name_set and sheets and rid_to_target:
+            referenced = set()
+            for refs in map_ordered(_shared_refs, [target for rid, target, _title in sheet_parts if rid in visible_rids], max_workers):
+                referenced.update(refs)
+
+    def _read_part(path: str) -> tuple[str, bytes]:
+        return path, zin.read(path)
+
+    def _comment_slots(path: str) -> List[TextSlot]:
+        return [
+            TextSlot(part=path, key=key, sheet_name="<comments>", object_id=object_id, text=text)
+            for key, object_id, text in _extract_comments(loaded[path])
+        ]
+
+    def _drawing_slots(path: str) -> List[TextSlot]:
+        return [
+            TextSlot(part=path, key=idx, sheet_name="<xml-layer>", object_id=f"{path}:{idx}", text=text)
+            for idx, text in extract_xml_texts(loaded[path])
+        ]
+
+    # Shared strings and comments keep their archive order in the slot list.
+    text_parts: Dict[str, List[TextSlot]] = {path: [] for path in names if path == SHARED_STRINGS_PATH or _is_comments_part(path)}
+    if SHARED_STRINGS_PATH in text_parts:
+        with timer.stage("shared_strings"):
+            loaded[SHARED_STRINGS_PATH] = zin.read(SHARED_STRINGS_PATH)
+            text_parts[SHARED_STRINGS_PATH] = [
+                TextSlot(part=SHARED_STRINGS_PATH, key=key, sheet_name="<shared-strings>", object_id=object_id, text=text)
+                for key, object_id, text in _extract_shared_strings(loaded[SHARED_STRINGS_PATH], referenced, stats)
+            ]
+    comment_paths = [path for path in text_parts if path != SHARED_STRINGS_PATH]
+    if comment_paths:
+        with timer.stage("comments"):
+            loaded.update(map_ordered(_read_part, comment_paths, max_workers))
+            text_parts.update(zip(comment_paths, map_ordered(_comment_slots, comment_paths, max_workers)))
+    for found in text_parts.values():
+        slots.extend(found)
+
+    with timer.stage("drawings"):
+        drawing_paths = [path for path in names if is_drawing_or_chart_part(path)]
+        loaded.update(map_ordered(_read_part, drawing_paths, max_workers))
+        for found in map_ordered(_drawing_slots, drawing_paths, max_workers):
+            slots.extend(found)
+
+    return slots
+
+
+def _rewrite_part(path: str, payload: bytes, replacements: dict[int, str]) -> bytes:
+    if path == WORKBOOK_PATH:
+        return _rewrite_sheet_names(payload, replacements)
+    if path == SHARED_STRINGS_PATH:
+        return _rewrite_shared_strings(payload, replacements)
+    if _is_comments_part(path):
+        return _rewrite_comments(payload, replacements)
+    return apply_xml_translations(payload, replacements, path)
+
+
+def _write_package(
+    zin: zipfile.ZipFile,
+    zout: zipfile.ZipFile,
+    loaded: dict[str, bytes],
+    replacements: dict[str, dict[int, str]],
+    max_workers: int = 1,
+) -> None:
+    """Write every member once: changed parts are re-deflated, everything else is copied raw.
+
+    Changed parts are rewritten and compressed on up to ``max_workers``
+    threads; the archive itself is written on this thread in the original
+    member order, so the output is byte-identical for any worker count.
+    """
+    changed = [info for info in zin.infolist() if replacements.get(info.filename)]
+
+    def _rewrite(info: zipfile.ZipInfo) -> DeflatedMember:
+        member = DeflatedMember(info)
+        part_replacements = replacements[info.filename]
+        if _is_worksheet_part(info.filename):
+            with zin.open(info) as src:
+                rewrite_string_cells(src, member, part_replacements)
+        else:
+            member.write(_rewrite_part(info.filename, loaded[info.filename], part_replacements))
+        return member.finish()
+
+    rewritten = dict(zip((info.filename for info in changed), map_ordered(_rewrite, changed, max_workers)))
+    for info in zin.infolist():
+        member = rewritten.get(info.filename)
+        if member is None:
+            copy_member_raw(zin, zout, info)
+        else:
+            member.write_to(zout)
+
+
+def _log_outcome(
+    logs: TranslationLog,
+    file_name: str,
+    sheet_name: str,
+    slot: TextSlot,
+    outcome: TranslationOutcome,
+    translated_text: str | None = None,
+) -> None:
+    if outcome.error:
+        logs.add(file_name, sheet_name, slot.object_id, slot.text, slot.text, "none", "error", outcome.error, route=outcome.route)
+        return
+    translated = outcome.text if translated_text is None else translated_text
+    logs.add(file_name, sheet_name, slot.object_id, slot.text, translated, outcome.engine, "ok", route=outcome.route)
 
 
 def process_excel_file(
@@ -252,81 +381,191 @@ def process_excel_file(
     source_lang: str,
     target_lang: str,
     selected_engine: str,
+    memo: Optional[TranslationMemo] = None,
+    memory: Optional[TranslationMemory] = None,
+    previous: Optional[TranslationManifest] = None,
+    record_manifest: bool = False,
+    translator: Optional[RoutedTranslator] = None,
+    skip_rules: Optional[SkipRules] = None,
+    part_workers: Optional[int] = None,
+    segmenter: Optional[Segmenter] = None,
 ) -> ProcessingResult:
-    translator = RoutedTranslator(selected_engine=selected_engine)
-    logs: List[TranslationLogEntry] = []
-
-    with zipfile.ZipFile(io.BytesIO(file_bytes), "r") as zin:
-        parts = {info.filename: zin.read(info.filename) for info in zin.infolist()}
-
-    workbook_path = "xl/workbook.xml"
-    workbook_rels_path = "xl/_rels/workbook.xml.rels"
-
-    rid_to_sheet_name: dict[str, str] = {}
-    rid_to_target: dict[str, str] = {}
-
-    if workbook_path in parts:
-        parts[workbook_path], rid_to_sheet_name = _translate_workbook_sheet_names(
-            parts[workbook_path],
-            file_name,
+    """Translate one workbook.
+
+    Pass the same ``memo`` dict to every call in a batch to translate each unique
+    string once per run rather than once per file. ``memory`` is an optional
+    persistent translation memory consulted before any engine call.
+
+    ``previous`` enables incremental mode: strings whose part, ``object_id`` and
+    text hash match the manifest of an earlier run are reused and only new or
+    changed strings reach the engines. With ``record_manifest`` (implied by
+    ``previous``) the result carries a manifest for the next run.
+
+    Pass a shared ``translator`` to reuse its pooled HTTP connections across
+    files; it is then left open for the caller to close. Otherwise a router for
+    ``selected_engine`` is created and closed here.
+
+    ``skip_rules`` decides which strings (numbers, dates, codes, ...) are
+    passed through without an engine call; defaults to
+    :meth:`SkipRules.from_env`. Skipped strings are logged with engine
+    ``skip:<category>`` and counted in ``stats`` as ``skipped_<category>``.
+
+    ``part_workers`` threads extract and rewrite parts (worksheets, comments,
+    drawings, charts) side by side; defaults to ``$EXCEL_TRANSLATOR_PART_WORKERS``
+    or ``min(4, cpu_count)``. The output does not depend on it.
+
+    ``segmenter`` splits long texts (comments, notes, text boxes) into
+    paragraphs and sentences that are translated and cached one by one;
+    defaults to :meth:`Segmenter.from_env`.
+    """
+    owns_translator = translator is None
+    if translator is None:
+        translator = RoutedTranslator(selected_engine=selected_engine)
+    try:
+        return _process_with_translator(
             translator,
+            file_name,
+            file_bytes,
             source_lang,
             target_lang,
-            logs,
+            memo,
+            memory,
+            previous,
+            record_manifest,
+            skip_rules if skip_rules is not None else SkipRules.from_env(),
+            part_workers if part_workers is not None else default_part_workers(),
+            segmenter if segmenter is not None else Segmenter.from_env(),
         )
+    finally:
+        if owns_translator:
+            translator.close()
+
 
-    if workbook_rels_path in parts:
-        rid_to_target = _workbook_relationships_map(parts[workbook_rels_path])
-
-    for rid, sheet_name in rid_to_sheet_name.items():
-        target = rid_to_target.get(rid)
-        if target and target in parts and target.startswith("xl/worksheets/"):
-            parts[target] = _translate_sheet_cells(parts[target], sheet_name, file_name, translator, source_lang, target_lang, logs)
-
-    for path, payload in list(parts.items()):
-        if path == "xl/sharedStrings.xml":
-            parts[path] = _translate_shared_strings(payload, file_name, translator, source_lang, target_lang, logs)
-        elif path.startswith("xl/comments") and path.endswith(".xml"):
-            parts[path] = _translate_comments(payload, "<comments>", file_name, translator, source_lang, target_lang, logs)
-
-    def translate_func(text: str, object_id: str) -> tuple[str, str]:
-        translated, engine = translator.translate_with_engine(text, source_lang, target_lang)
-        logs.append(
-            TranslationLogEntry(
-                file_name=file_name,
-                sheet_name="<xml-layer>",
-                object_id=object_id,
-                original_text=text,
-                translated_text=translated,
-                engine=engine,
-                status="ok",
+def _process_with_translator(
+    translator: RoutedTranslator,
+    file_name: str,
+    file_bytes: bytes,
+    source_lang: str,
+    target_lang: str,
+    memo: Optional[TranslationMemo],
+    memory: Optional[TranslationMemory],
+    previous: Optional[TranslationManifest],
+    record_manifest: bool,
+    skip_rules: SkipRules,
+    part_workers: int,
+    segmenter: Segmenter,
+) -> ProcessingResult:
+    logs = TranslationLog()
+    stats: Dict[str, int] = {}
+    timer = StageTimer()
+    connections_before = translator.connection_stats()
+    engine_before = translator.engine_stats()
+    breakers = translator.breakers()
+    transitions_before = [breaker.transition_count for breaker in breakers]
+
+    with timer.stage("unzip"):
+        zin = zipfile.ZipFile(io.BytesIO(file_bytes), "r")
+        fingerprints = {info.filename: part_fingerprint(info) for info in zin.infolist()}
+    with zin:
+        # Small XML parts are read once and kept for the rewrite; worksheets and
+        # every other member stay in the archive until they are written out.
+        loaded: dict[str, bytes] = {}
+        slots = collect_slots(zin, loaded, stats, timer, part_workers)
+        stats["strings"] = len(slots)
+        stats["characters"] = sum(len(slot.text) for slot in slots)
+
+        # Phase 2: translate everything through the batch path.
+        with timer.stage("translate"):
+            reused: Dict[int, TranslationOutcome] = {}
+            incremental = previous is not None and (previous.source_lang, previous.target_lang) == (source_lang, target_lang)
+            if incremental:
+                reused = reuse_from_manifest(slots, fingerprints, previous, stats)
+            pending: List[int] = []
+            for idx, slot in enumerate(slots):
+                if idx in reused:
+                    continue
+                category = skip_rules.classify(slot.text, target_lang)
+                if category is None:
+                    pending.append(idx)
+                else:
+                    reused[idx] = TranslationOutcome(text=slot.text, engine=f"skip:{category}")
+                    stats[f"skipped_{category}"] = stats.get(f"skipped_{category}", 0) + 1
+            if incremental:
+                # Skip-filter passthroughs are not in the manifest, so only strings sent for translation changed.
+                stats["strings_changed"] = len(pending)
+            translated = translate_texts(
+                translator,
+                [slots[idx].text for idx in pending],
+                source_lang,
+                target_lang,
+                memo=memo,
+                stats=stats,
+                memory=memory,
+                timer=timer,
+                segmenter=segmenter,
             )
+            outcomes = [reused[idx] if idx in reused else None for idx in range(len(slots))]
+            for idx, outcome in zip(pending, translated):
+                outcomes[idx] = outcome
+
+        # Phase 3: write translations back part by part and record per-location logs.
+        with timer.stage("rezip"):
+            replacements: dict[str, dict[int, str]] = {}
+            title_map: dict[str, str] = {}
+            existing_titles: set[str] = set()
+
+            for slot, outcome in zip(slots, outcomes):
+                if slot.part == WORKBOOK_PATH:
+                    safe = slot.text if outcome.error else _safe_sheet_title(outcome.text, existing_titles)
+                    existing_titles.add(safe)
+                    title_map[slot.text] = safe
+                    replacements.setdefault(slot.part, {})[slot.key] = safe
+                    _log_outcome(logs, file_name, safe, slot, outcome, translated_text=safe)
+                    continue
+
+                if not outcome.error and outcome.text != slot.text:
+                    replacements.setdefault(slot.part, {})[slot.key] = outcome.text
+                sheet_name = title_map.get(slot.sheet_name, slot.sheet_name) if _is_worksheet_part(slot.part) else slot.sheet_name
+                _log_outcome(logs, file_name, sheet_name, slot, outcome)
+
+            buf = io.BytesIO()
+            with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zout:
+                _write_package(zin, zout, loaded, replacements, part_workers)
+
+    with timer.stage("filename"):
+        output_filename = _translated_output_filename(file_name, translator, source_lang, target_lang)
+    transitions = [transition for breaker, before in zip(breakers, transitions_before) for transition in breaker.transitions_since(before)]
+    for transition in transitions:
+        stats[f"circuit_{transition.name}_{transition.to_state}"] = stats.get(f"circuit_{transition.name}_{transition.to_state}", 0) + 1
+        logs.add(
+            file_name,
+            "<engine>",
+            f"circuit:{transition.name}",
+            transition.from_state,
+            transition.to_state,
+            transition.name,
+            f"circuit_{transition.to_state}",
+            transition.reason,
+            transition.timestamp,
         )
-        return translated, engine
-
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zout:
-        for name, payload in parts.items():
-            zout.writestr(name, payload)
-
-    final_bytes, xml_logs = translate_drawings_and_charts(buf.getvalue(), translate_func)
-    for item in xml_logs:
-        if item.error:
-            logs.append(
-                TranslationLogEntry(
-                    file_name=file_name,
-                    sheet_name="<xml-layer>",
-                    object_id=item.object_id,
-                    original_text=item.original_text,
-                    translated_text=item.translated_text,
-                    engine="none",
-                    status="error",
-                    error=item.error,
-                )
-            )
+    connections_after = translator.connection_stats()
+    for key in ("connections_opened", "connections_reused", "requests"):
+        # Clamped: a session closed by another thread starts counting from zero again.
+        stats[f"http_{key}"] = max(connections_after.get(key, 0) - connections_before.get(key, 0), 0)
+    for key, value in translator.engine_stats().items():
+        if value - engine_before.get(key, 0):
+            stats[key] = value - engine_before.get(key, 0)
+
+    manifest = None
+    if record_manifest or previous is not None:
+        manifest = build_manifest(source_lang, target_lang, fingerprints, slots, outcomes)
 
     return ProcessingResult(
-        output_filename=_translated_output_filename(file_name, translator, source_lang, target_lang),
-        output_bytes=final_bytes,
+        output_filename=output_filename,
+        output_bytes=buf.getvalue(),
         logs=logs,
+        stats=stats,
+        manifest=manifest,
+        stages=timer.as_dict(),
+        spans=timer.spans,
     )
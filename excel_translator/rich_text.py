@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import re
+from typing import List
+
+# Rich-text strings are translated as one unit so the engine sees the whole
+# sentence; run boundaries travel through the engine as numbered markers and
+# are restored from them, or proportionally when the engine mangles them.
+
+_MARKER = re.compile(r"\s?⟦(\d+)⟧\s?")
+_SNAP_WINDOW = 12
+
+
+def join_runs(runs: List[str]) -> str:
+    """Join run texts with ``⟦n⟧`` markers between them (``n`` counts from 1)."""
+    joined = runs[0]
+    for idx, run in enumerate(runs[1:], start=1):
+        joined += f"⟦{idx}⟧{run}"
+    return joined
+
+
+def _marker_split(translated: str, count: int) -> List[str] | None:
+    pieces = re.split(r"⟦(\d+)⟧", translated)
+    if len(pieces) != 2 * count - 1:
+        return None
+    if [int(n) for n in pieces[1::2]] != list(range(1, count)):
+        return None
+    return pieces[0::2]
+
+
+def _snap(text: str, cut: int, low: int) -> int:
+    """Move ``cut`` to the nearest whitespace within a small window, never before ``low``."""
+    for offset in range(_SNAP_WINDOW + 1):
+        for pos in (cut - offset, cut + offset):
+            if low <= pos <= len(text) and (pos == len(text) or text[pos].isspace()):
+                return pos
+    return max(cut, low)
+
+
+def _proportional_split(translated: str, originals: List[str]) -> List[str]:
+    text = _MARKER.sub(" ", translated).strip()
+    total = sum(len(run) for run in originals) or 1
+    pieces: List[str] = []
+    start = 0
+    consumed = 0
+    for run in originals[:-1]:
+        consumed += len(run)
+        cut = _snap(text, round(len(text) * consumed / total), start)
+        pieces.append(text[start:cut])
+        start = cut
+    pieces.append(text[start:])
+    return pieces
+
+
+def split_runs(translated: str, originals: List[str]) -> List[str]:
+    """Split a translation of :func:`join_runs` output back into ``len(originals)`` run texts.
+
+    Markers are used when all of them survived in order; otherwise the text is
+    cut in proportion to the original run lengths, snapped to word boundaries.
+    """
+    if len(originals) == 1:
+        return [translated]
+    pieces = _marker_split(translated, len(originals))
+    if pieces is None:
+        pieces = _proportional_split(translated, originals)
+    return pieces
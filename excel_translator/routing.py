@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+# The "budget" engine mode decides per batch whether Azure or the local
+# engine answers, instead of always trying Azure first. Batches of very short
+# strings (single words, headers) go to the local engine, which costs nothing
+# per character; long prose goes to Azure, which is much faster than a CPU
+# model; in between the engine with the lower observed latency wins. An engine
+# whose recent error rate is too high is avoided, and once Azure has been sent
+# the configured number of characters everything goes to the local engine.
+# Latency and errors are exponentially weighted moving averages of what the
+# router has seen, so the policy follows a host getting slower or flaky.
+#
+# The Azure character count is shared by everything routing against one
+# budget: a SQLite file for a batch run or job (all worker processes and
+# slices), or $EXCEL_TRANSLATOR_AZURE_BUDGET_PATH to share one budget across
+# runs and jobs.
+
+AZURE = "azure"
+LOCAL = "local"
+AZURE_BUDGET_PATH_ENV = "EXCEL_TRANSLATOR_AZURE_BUDGET_PATH"
+
+
+class CharBudget:
+    """Characters sent to Azure by this process, capped at ``limit`` (0 for no cap)."""
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self._spent = 0
+        self._lock = threading.Lock()
+
+    @property
+    def spent(self) -> int:
+        with self._lock:
+            return self._spent
+
+    def reserve(self, chars: int) -> bool:
+        """Count ``chars`` against the budget, or return ``False`` if they do not fit."""
+        with self._lock:
+            if self.limit and self._spent + chars > self.limit:
+                return False
+            self._spent += chars
+            return True
+
+    def refund(self, chars: int) -> None:
+        with self._lock:
+            self._spent = max(self._spent - chars, 0)
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteCharBudget(CharBudget):
+    """A :class:`CharBudget` whose count lives in a SQLite file, shared by every process that opens it."""
+
+    def __init__(self, path: str, limit: int = 0):
+        super().__init__(limit)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS azure_budget (id INTEGER PRIMARY KEY CHECK (id = 0), spent INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO azure_budget (id, spent) VALUES (0, 0)")
+
+    @property
+    def spent(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT spent FROM azure_budget WHERE id = 0").fetchone()[0]
+
+    def reserve(self, chars: int) -> bool:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so the check and the update are atomic across processes.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                spent = self._conn.execute("SELECT spent FROM azure_budget WHERE id = 0").fetchone()[0]
+                if self.limit and spent + chars > self.limit:
+                    return False
+                self._conn.execute("UPDATE azure_budget SET spent = ? WHERE id = 0", (spent + chars,))
+                return True
+            finally:
+                self._conn.execute("COMMIT")
+
+    def refund(self, chars: int) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE azure_budget SET spent = MAX(spent - ?, 0) WHERE id = 0", (chars,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """Which engine a batch is sent to first, and why."""
+
+    engine: str
+    reason: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.engine}:{self.reason}"
+
+
+@dataclass
+class EngineObservation:
+    """EWMA of seconds per character and of the failure rate of one engine."""
+
+    seconds_per_char: float = 0.0
+    error_rate: float = 0.0
+    samples: int = 0
+
+    def update(self, chars: int, seconds: float, ok: bool, alpha: float) -> None:
+        if ok:
+            rate = seconds / max(chars, 1)
+            self.seconds_per_char = rate if self.samples == 0 else alpha * rate + (1 - alpha) * self.seconds_per_char
+        self.error_rate = float(not ok) if self.samples == 0 else alpha * float(not ok) + (1 - alpha) * self.error_rate
+        self.samples += 1
+
+
+class RoutingPolicy:
+    """Length-, latency-, error- and budget-aware choice between Azure and the local engine.
+
+    Batches whose mean string length is at most ``short_chars`` go local and
+    those of at least ``long_chars`` go to Azure. In between, once both
+    engines have ``min_samples`` observations, the one predicting the lower
+    latency wins; before that Azure does. An engine whose error rate is above
+    ``max_error_rate`` is avoided. ``azure_char_budget`` (0 for none) caps the
+    characters sent to Azure; they are counted in ``budget_path`` when given,
+    so several routers and processes draw on one budget, and otherwise over
+    the policy's lifetime. Defaults come from
+    ``EXCEL_TRANSLATOR_ROUTE_SHORT_CHARS``, ``EXCEL_TRANSLATOR_ROUTE_LONG_CHARS``,
+    ``EXCEL_TRANSLATOR_ROUTE_MAX_ERROR_RATE`` and
+    ``EXCEL_TRANSLATOR_AZURE_CHAR_BUDGET``; ``budget_path`` defaults to
+    ``EXCEL_TRANSLATOR_AZURE_BUDGET_PATH`` in :meth:`from_env`.
+    """
+
+    def __init__(
+        self,
+        short_chars: int = 20,
+        long_chars: int = 200,
+        azure_char_budget: int = 0,
+        max_error_rate: float = 0.5,
+        alpha: float = 0.2,
+        min_samples: int = 3,
+        budget_path: Optional[str] = None,
+    ):
+        self.short_chars = short_chars
+        self.long_chars = long_chars
+        self.max_error_rate = max_error_rate
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.budget = SqliteCharBudget(budget_path, azure_char_budget) if budget_path else CharBudget(azure_char_budget)
+        self.observations: Dict[str, EngineObservation] = {AZURE: EngineObservation(), LOCAL: EngineObservation()}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, budget_path: Optional[str] = None) -> "RoutingPolicy":
+        return cls(
+            short_chars=int(os.getenv("EXCEL_TRANSLATOR_ROUTE_SHORT_CHARS", "20")),
+            long_chars=int(os.getenv("EXCEL_TRANSLATOR_ROUTE_LONG_CHARS", "200")),
+            azure_char_budget=int(os.getenv("EXCEL_TRANSLATOR_AZURE_CHAR_BUDGET", "0")),
+            max_error_rate=float(os.getenv("EXCEL_TRANSLATOR_ROUTE_MAX_ERROR_RATE", "0.5")),
+            budget_path=budget_path or os.getenv(AZURE_BUDGET_PATH_ENV),
+        )
+
+    @property
+    def azure_chars(self) -> int:
+        """Characters counted against the Azure budget so far."""
+        return self.budget.spent
+
+    def _failing(self, engine: str) -> bool:
+        observation = self.observations[engine]
+        return observation.samples >= self.min_samples and observation.error_rate > self.max_error_rate
+
+    def _choose(self, chars: int, mean: float, azure_available: bool) -> RouteDecision:
+        if not azure_available:
+            return RouteDecision(LOCAL, "azure_unavailable")
+        if self._failing(AZURE) and not self._failing(LOCAL):
+            return RouteDecision(LOCAL, "azure_errors")
+        if self._failing(LOCAL) and not self._failing(AZURE):
+            return RouteDecision(AZURE, "local_errors")
+        if mean <= self.short_chars:
+            return RouteDecision(LOCAL, "short_text")
+        if mean >= self.long_chars:
+            return RouteDecision(AZURE, "long_text")
+        azure, local = self.observations[AZURE], self.observations[LOCAL]
+        if azure.samples >= self.min_samples and local.samples >= self.min_samples and local.seconds_per_char < azure.seconds_per_char:
+            return RouteDecision(LOCAL, "latency")
+        return RouteDecision(AZURE, "latency" if azure.samples >= self.min_samples and local.samples >= self.min_samples else "default")
+
+    def decide(self, texts: Sequence[str], azure_available: bool = True) -> RouteDecision:
+        """Pick the engine for ``texts``; choosing Azure reserves their characters from the budget."""
+        chars = sum(len(text) for text in texts)
+        mean = chars / len(texts) if texts else 0.0
+        with self._lock:
+            decision = self._choose(chars, mean, azure_available)
+        if decision.engine == AZURE and not self.budget.reserve(chars):
+            return RouteDecision(LOCAL, "azure_budget")
+        return decision
+
+    def refund(self, chars: int) -> None:
+        """Give back characters reserved for an Azure call that failed."""
+        self.budget.refund(chars)
+
+    def close(self) -> None:
+        self.budget.close()
+
+    def observe(self, engine: str, chars: int, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.observations[engine].update(chars, seconds, ok, self.alpha)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# Long comments, text boxes and note cells are translated segment by segment:
+# paragraphs first, then sentences for paragraphs that are still long. Every
+# segment goes through the batch path on its own, so it gets its own memo and
+# translation-memory entry and a boilerplate paragraph shared by many notes is
+# translated once. The whitespace between segments (line breaks, blank lines,
+# indentation, the spaces after a full stop) is never sent to an engine and is
+# put back verbatim when the translation is reassembled.
+
+_PARAGRAPH_BREAK = re.compile(r"(\s*(?:\r\n|\r|\n)\s*)")
+_SENTENCE_BREAK = re.compile(r"((?<=[.!?。！？])[\"'”’»)\]]*\s+)")
+_EDGE_SPACE = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
+
+# A piece of a segmented text and whether it is sent for translation.
+Piece = Tuple[str, bool]
+
+
+def _split_keep(text: str, pattern: re.Pattern) -> List[str]:
+    """``text`` as alternating chunks and separators; the separators go to the end of the chunk before them."""
+    parts = pattern.split(text)
+    return [parts[i] + (parts[i + 1] if i + 1 < len(parts) else "") for i in range(0, len(parts), 2)]
+
+
+def _hard_split(text: str, max_chars: int) -> List[str]:
+    """Cut ``text`` into pieces of at most ``max_chars``, at the last space when there is one."""
+    pieces: List[str] = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars) + 1 or max_chars
+        pieces.append(text[:cut])
+        text = text[cut:]
+    pieces.append(text)
+    return pieces
+
+
+@dataclass(frozen=True)
+class Segmenter:
+    """How long texts are split before translation.
+
+    Texts longer than ``min_chars`` are split at line breaks; paragraphs longer
+    than ``max_chars`` are then split into sentences, which are regrouped into
+    segments of up to ``max_chars``, and a single sentence longer than that is
+    cut at spaces. ``min_chars`` of 0 turns segmentation off.
+    """
+
+    min_chars: int = 400
+    max_chars: int = 1000
+
+    @classmethod
+    def from_env(cls) -> "Segmenter":
+        return cls(
+            min_chars=int(os.getenv("EXCEL_TRANSLATOR_SEGMENT_MIN_CHARS", str(cls.min_chars))),
+            max_chars=int(os.getenv("EXCEL_TRANSLATOR_SEGMENT_MAX_CHARS", str(cls.max_chars))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_chars > 0
+
+    def split(self, text: str) -> List[Piece]:
+        """Pieces of ``text`` in order; ``"".join`` of the pieces gives ``text`` back.
+
+        Translatable pieces carry no leading or trailing whitespace; the
+        whitespace around them is returned as pieces of its own. A text that
+        is short or has nothing to split at comes back as a single
+        translatable piece.
+        """
+        if not self.enabled or len(text) <= self.min_chars:
+            return [(text, True)]
+        chunks: List[str] = []
+        for paragraph in _split_keep(text, _PARAGRAPH_BREAK):
+            if len(paragraph) <= self.max_chars:
+                chunks.append(paragraph)
+                continue
+            group = ""
+            for sentence in _split_keep(paragraph, _SENTENCE_BREAK):
+                if group and len(group) + len(sentence) > self.max_chars:
+                    chunks.append(group)
+                    group = ""
+                if len(sentence) > self.max_chars:
+                    chunks.extend(_hard_split(sentence, self.max_chars))
+                else:
+                    group += sentence
+            if group:
+                chunks.append(group)
+
+        pieces: List[Piece] = []
+        for chunk in chunks:
+            lead, body, trail = _EDGE_SPACE.match(chunk).groups()
+            for value, translatable in ((lead, False), (body, True), (trail, False)):
+                if not value:
+                    continue
+                if pieces and not translatable and not pieces[-1][1]:
+                    pieces[-1] = (pieces[-1][0] + value, False)
+                else:
+                    pieces.append((value, translatable))
+        if sum(translatable for _value, translatable in pieces) < 2:
+            return [(text, True)]
+        return pieces
+
+
+def join_pieces(pieces: List[Piece], translations: List[str]) -> str:
+    """Reassemble ``pieces`` with ``translations`` (one per translatable piece, in order) in place of their text."""
+    values = iter(translations)
+    return "".join(next(values) if translatable else value for value, translatable in pieces)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    text_hash TEXT NOT NULL,
+    source_lang TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    model TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (text_hash, source_lang, target_lang, engine, model)
+);
+CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used);
+"""
+
+
+def normalize_text(text: str) -> str:
+    return unicodedata.normalize("NFC", text)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """Persistent SQLite translation memory keyed by text hash, language pair, engine and model.
+
+    ``max_entries`` bounds the store by evicting least recently used rows;
+    ``max_age_seconds`` drops rows not used within that window. Both are
+    applied on open and by :meth:`evict`.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = 1_000_000, max_age_seconds: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.evict()
+
+    def lookup(
+        self,
+        texts: Sequence[str],
+        source_lang: str,
+        target_lang: str,
+        engines: Sequence[Tuple[str, str]],
+    ) -> Dict[str, Tuple[str, str]]:
+        """Return ``{text: (translation, engine)}`` for cached texts.
+
+        ``engines`` lists ``(engine, model)`` pairs in preference order; the first
+        engine holding an entry wins.
+        """
+        found: Dict[str, Tuple[str, str]] = {}
+        now = time.time()
+        with self._lock:
+            for text in texts:
+                digest = text_hash(text)
+                for engine, model in engines:
+                    row = self._conn.execute(
+                        "SELECT translation FROM translations WHERE text_hash=? AND source_lang=? AND target_lang=? AND engine=? AND model=?",
+                        (digest, source_lang, target_lang, engine, model),
+                    ).fetchone()
+                    if row is not None:
+                        found[text] = (row[0], engine)
+                        self._conn.execute(
+                            "UPDATE translations SET last_used=? WHERE text_hash=? AND source_lang=? AND target_lang=? AND engine=? AND model=?",
+                            (now, digest, source_lang, target_lang, engine, model),
+                        )
+                        break
+            self._conn.commit()
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+        return found
+
+    def store(
+        self,
+        pairs: Iterable[Tuple[str, str]],
+        source_lang: str,
+        target_lang: str,
+        engine: str,
+        model: str = "",
+    ) -> None:
+        """Store ``(text, translation)`` pairs produced by ``engine``/``model``."""
+        now = time.time()
+        rows = [(text_hash(text), source_lang, target_lang, engine, model, translation, now, now) for text, translation in pairs]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def invalidate(self, engine: Optional[str] = None, model: Optional[str] = None) -> int:
+        """Delete entries for ``engine`` (and optionally one ``model``); with no arguments, clear everything."""
+        clauses: List[str] = []
+        params: List[str] = []
+        if engine is not None:
+            clauses.append("engine=?")
+            params.append(engine)
+        if model is not None:
+            clauses.append("model=?")
+            params.append(model)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            deleted = self._conn.execute(f"DELETE FROM translations{where}", params).rowcount
+            self._conn.commit()
+        return deleted
+
+    def evict(self) -> int:
+        """Apply age and size limits, returning the number of rows removed."""
+        deleted = 0
+        with self._lock:
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                deleted += self._conn.execute("DELETE FROM translations WHERE last_used < ?", (cutoff,)).rowcount
+            if self.max_entries is not None:
+                deleted += self._conn.execute(
+                    "DELETE FROM translations WHERE rowid IN "
+                    "(SELECT rowid FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "TranslationMemory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
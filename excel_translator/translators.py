@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import json
 import os
 import time
-from dataclasses import dataclass
-from typing import Iterable, List, Protocol
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Protocol
 
-import requests
+from .circuit_breaker import CircuitBreaker
+from .concurrency import TokenBucket, map_ordered, retry_after_seconds
+from .engines import EnginePool, build_pools, register_engine_type
+from .http_pool import PooledSession
+from .metrics import Counters
+from .routing import AZURE, LOCAL, RouteDecision, RoutingPolicy
 
 
 class Translator(Protocol):
@@ -23,6 +29,18 @@ class AzureTranslator:
     timeout_seconds: int = 20
     retries: int = 2
     engine_name: str = "azure"
+    limiter: Optional[TokenBucket] = None
+    session: PooledSession = field(default_factory=PooledSession, repr=False)
+    counters: Counters = field(default_factory=Counters, repr=False)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.endpoint and self.key and self.region)
+
+    def ping(self) -> None:
+        """Raise unless the endpoint answers; the languages list needs no key and costs no quota."""
+        resp = self.session.get(f"{self.endpoint.rstrip('/')}/languages", params={"api-version": "3.0", "scope": "translation"}, timeout=5)
+        resp.raise_for_status()
 
     def translate_batch(self, texts: Iterable[str], source_lang: str, target_lang: str) -> List[str]:
         text_list = list(texts)
@@ -38,16 +56,32 @@ class AzureTranslator:
         }
         body = [{"text": t} for t in text_list]
 
+        chars = sum(len(t) for t in text_list)
         last_error = None
         for attempt in range(self.retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire(chars)
             try:
-                resp = requests.post(url, params=params, headers=headers, json=body, timeout=self.timeout_seconds)
+                resp = self.session.post(url, params=params, headers=headers, json=body, timeout=self.timeout_seconds)
+                if resp.status_code == 429:
+                    self.counters.add("azure_throttled")
+                    delay = retry_after_seconds(resp.headers.get("Retry-After"), default=1.5 * (attempt + 1))
+                    if self.limiter is not None:
+                        self.limiter.pause(delay)
+                    last_error = RuntimeError(f"Azure throttled the request (429), retry after {delay:.1f}s")
+                    if attempt < self.retries:
+                        self.counters.add("azure_retries")
+                        time.sleep(delay)
+                    continue
                 resp.raise_for_status()
                 data = resp.json()
+                if len(data) != len(text_list):
+                    raise RuntimeError(f"Azure returned {len(data)} results for {len(text_list)} texts")
                 return [item["translations"][0]["text"] for item in data]
             except Exception as exc:
                 last_error = exc
                 if attempt < self.retries:
+                    self.counters.add("azure_retries")
                     time.sleep(1.5 * (attempt + 1))
         raise RuntimeError(f"Azure translation failed after retries: {last_error}")
 
@@ -58,6 +92,11 @@ class OllamaGemmaTranslator:
     endpoint: str = "http://localhost:11434/api/generate"
     timeout_seconds: int = 60
     engine_name: str = "ollama_gemma"
+    max_in_flight: int = 1
+    batch_size: int = 1
+    context_tokens: int = 8192
+    session: PooledSession = field(default_factory=PooledSession, repr=False)
+    counters: Counters = field(default_factory=Counters, repr=False)
 
     def _prompt(self, text: str, source_lang: str, target_lang: str) -> str:
         return (
@@ -67,44 +106,273 @@ class OllamaGemmaTranslator:
             f"Input:\n{text}"
         )
 
+    def _batch_prompt(self, texts: List[str], source_lang: str, target_lang: str) -> str:
+        items = [{"id": i, "text": text} for i, text in enumerate(texts)]
+        return (
+            "You are a strict translation engine. Translate the \"text\" of every item exactly from "
+            f"{source_lang} to {target_lang}. Preserve punctuation, placeholders, spacing, and formatting. "
+            'Answer with JSON only, in the form {"translations": [{"id": <id>, "text": <translation>}, ...]}, '
+            "with exactly one entry per input id and nothing else.\n\n"
+            f"Input:\n{json.dumps({'items': items}, ensure_ascii=False)}"
+        )
+
+    def _generate(self, prompt: str, json_output: bool = False) -> str:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"temperature": 0, "num_ctx": self.context_tokens},
+        }
+        if json_output:
+            payload["format"] = "json"
+        resp = self.session.post(self.endpoint, json=payload, timeout=self.timeout_seconds)
+        resp.raise_for_status()
+        return resp.json().get("response", "")
+
+    def ping(self) -> None:
+        """Raise unless the Ollama server answers its model list."""
+        resp = self.session.get(self.endpoint.split("/api/", 1)[0] + "/api/tags", timeout=5)
+        resp.raise_for_status()
+
+    def _translate_one(self, text: str, source_lang: str, target_lang: str) -> str:
+        return self._generate(self._prompt(text, source_lang, target_lang)).strip() or text
+
+    def _estimated_tokens(self, text: str) -> int:
+        # Roughly three characters per token, counted twice: the text goes in and its translation comes out.
+        return 2 * (len(text) // 3 + 8)
+
+    def _pack(self, texts: List[str]) -> List[List[int]]:
+        """Group text indices into prompts that stay within ``batch_size`` items and the context window."""
+        budget = self.context_tokens - 256  # instructions and JSON framing
+        groups: List[List[int]] = []
+        current: List[int] = []
+        used = 0
+        for idx, text in enumerate(texts):
+            cost = self._estimated_tokens(text)
+            if current and (len(current) >= self.batch_size or used + cost > budget):
+                groups.append(current)
+                current, used = [], 0
+            current.append(idx)
+            used += cost
+        if current:
+            groups.append(current)
+        return groups
+
+    def _parse_batch(self, response: str, count: int) -> List[str]:
+        """Validate a batched answer: every id from the prompt exactly once, each with a string translation."""
+        try:
+            entries = json.loads(response)["translations"]
+            by_id = {int(entry["id"]): entry["text"] for entry in entries}
+        except (ValueError, KeyError, TypeError) as exc:
+            raise ValueError(f"Unparseable batched response: {exc}") from exc
+        if len(entries) != count or set(by_id) != set(range(count)):
+            raise ValueError(f"Batched response has {len(entries)} entries for {count} inputs")
+        if not all(isinstance(value, str) for value in by_id.values()):
+            raise ValueError("Batched response contains non-string translations")
+        return [by_id[i] for i in range(count)]
+
+    def _translate_group(self, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        if len(texts) == 1:
+            return [self._translate_one(texts[0], source_lang, target_lang)]
+        response = self._generate(self._batch_prompt(texts, source_lang, target_lang), json_output=True)
+        try:
+            return self._parse_batch(response, len(texts))
+        except ValueError:
+            # Small models drop or merge items on long lists; halve and retry until each half lines up.
+            self.counters.add("ollama_batch_splits")
+            mid = len(texts) // 2
+            return self._translate_group(texts[:mid], source_lang, target_lang) + self._translate_group(
+                texts[mid:], source_lang, target_lang
+            )
+
     def translate_batch(self, texts: Iterable[str], source_lang: str, target_lang: str) -> List[str]:
-        translated: List[str] = []
-        for text in texts:
-            payload = {
-                "model": self.model,
-                "prompt": self._prompt(text, source_lang, target_lang),
-                "stream": False,
-                "options": {"temperature": 0},
-            }
-            resp = requests.post(self.endpoint, json=payload, timeout=self.timeout_seconds)
-            resp.raise_for_status()
-            translated.append(resp.json().get("response", text).strip())
-        return translated
+        """Translate ``texts``; with ``batch_size > 1`` several strings share one JSON-structured prompt."""
+        text_list = list(texts)
+        if self.batch_size <= 1:
+            return map_ordered(lambda text: self._translate_one(text, source_lang, target_lang), text_list, self.max_in_flight)
+
+        groups = self._pack(text_list)
+        results = map_ordered(
+            lambda group: self._translate_group([text_list[i] for i in group], source_lang, target_lang),
+            groups,
+            self.max_in_flight,
+        )
+        return [text for group_result in results for text in group_result]
 
 
 class RoutedTranslator:
-    """Deterministic routing: azure->fallback local, or local only."""
+    """Routing: azure->fallback local, local only, or budget.
+
+    In ``budget`` mode a :class:`~excel_translator.routing.RoutingPolicy`
+    (``policy``) picks Azure or the local engine for each batch from string
+    length, observed latency and error rates and an Azure character budget;
+    a batch routed to Azure still falls back to the local engine on failure.
+    Routers given the same ``budget_path`` (a SQLite file) share one Azure
+    character count.
+
+    ``max_in_flight`` is how many batches callers may dispatch concurrently
+    (``AZURE_MAX_IN_FLIGHT``); the Ollama engine fans single strings out over
+    ``OLLAMA_MAX_IN_FLIGHT`` workers. ``AZURE_CHARS_PER_MINUTE`` enables a
+    token-bucket limiter on Azure traffic.
+
+    ``azure`` and ``local`` are :class:`~excel_translator.engines.EnginePool`
+    objects; by default each holds one instance configured from the variables
+    above, and ``EXCEL_TRANSLATOR_ENGINES_FILE`` / ``EXCEL_TRANSLATOR_ENGINES``
+    can put several instances (Azure regions, Ollama hosts) behind either
+    one, balanced and failed over per batch.
+
+    Azure calls go through a circuit breaker (``AZURE_BREAKER_FAILURES`` failures
+    within ``AZURE_BREAKER_WINDOW_SECONDS`` open it for
+    ``AZURE_BREAKER_RESET_SECONDS``), so an outage sends traffic straight to
+    the local engine instead of waiting out Azure retries on every batch.
+    Instances of a multi-instance pool get breakers with the same settings.
+
+    Each engine owns a keep-alive connection pool (``HTTP_POOL_SIZE``), so one
+    router should be shared across workbooks and closed when the batch ends;
+    it can be used as a context manager.
+    """
 
-    def __init__(self, selected_engine: str):
+    def __init__(self, selected_engine: str, budget_path: Optional[str] = None):
         self.selected_engine = selected_engine
+        self.max_in_flight = int(os.getenv("AZURE_MAX_IN_FLIGHT", "4"))
+        pool_size = int(os.getenv("HTTP_POOL_SIZE", "10"))
 
-        self.azure = AzureTranslator(
-            endpoint=os.getenv("AZURE_TRANSLATOR_ENDPOINT", ""),
-            key=os.getenv("AZURE_TRANSLATOR_KEY", ""),
-            region=os.getenv("AZURE_TRANSLATOR_REGION", ""),
-        )
-        self.local = OllamaGemmaTranslator(
-            model=os.getenv("OLLAMA_MODEL", "gemma:2b"),
-            endpoint=os.getenv("OLLAMA_ENDPOINT", "http://localhost:11434/api/generate"),
-        )
+        def _breaker(name: str) -> CircuitBreaker:
+            return CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv("AZURE_BREAKER_FAILURES", "3")),
+                window_seconds=float(os.getenv("AZURE_BREAKER_WINDOW_SECONDS", "60")),
+                reset_timeout=float(os.getenv("AZURE_BREAKER_RESET_SECONDS", "30")),
+            )
 
-    def translate_with_engine(self, text: str, source_lang: str, target_lang: str) -> tuple[str, str]:
+        pools = build_pools(pool_size, breaker=_breaker)
+        self.azure: EnginePool = pools["azure"]
+        self.local: EnginePool = pools["local"]
+        self.azure_breaker = _breaker("azure")
+        self.counters = Counters()
+        self.policy: Optional[RoutingPolicy] = RoutingPolicy.from_env(budget_path) if selected_engine == "budget" else None
+
+    def breakers(self) -> List[CircuitBreaker]:
+        """The Azure breaker followed by the per-instance breakers of both pools."""
+        return [self.azure_breaker] + self.azure.breakers() + self.local.breakers()
+
+    def engine_stats(self) -> Dict[str, int]:
+        """Running totals of retries, throttling, batch splits, fallbacks, failovers and circuit skips."""
+        totals = self.counters.snapshot()
+        for engine in (self.azure, self.local):
+            for key, value in engine.engine_stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def connection_stats(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for engine in (self.azure, self.local):
+            for key, value in engine.connection_stats().items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def close(self) -> None:
+        self.azure.close()
+        self.local.close()
+        if self.policy is not None:
+            self.policy.close()
+
+    def __enter__(self) -> "RoutedTranslator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def route_engines(self) -> List[Translator]:
+        """Engines this router may answer with, in preference order (budget mode uses both)."""
         if self.selected_engine == "local":
-            return self.local.translate_batch([text], source_lang, target_lang)[0], self.local.engine_name
+            return [self.local]
+        return [self.azure, self.local]
+
+    def route_batch(self, texts: List[str]) -> Optional[RouteDecision]:
+        """The budget policy's choice for ``texts``, or ``None`` outside budget mode."""
+        if self.policy is None:
+            return None
+        return self.policy.decide(texts, azure_available=self.azure.configured and self.azure_breaker.available())
 
+    def _call(self, role: str, engine: EnginePool, texts: List[str], source_lang: str, target_lang: str) -> List[str]:
+        if self.policy is None:
+            return engine.translate_batch(texts, source_lang, target_lang)
+        chars = sum(len(text) for text in texts)
+        start = time.perf_counter()
         try:
-            if not (self.azure.endpoint and self.azure.key and self.azure.region):
-                raise RuntimeError("Azure credentials are incomplete")
-            return self.azure.translate_batch([text], source_lang, target_lang)[0], self.azure.engine_name
+            translated = engine.translate_batch(texts, source_lang, target_lang)
         except Exception:
-            return self.local.translate_batch([text], source_lang, target_lang)[0], self.local.engine_name
+            self.policy.observe(role, chars, time.perf_counter() - start, ok=False)
+            raise
+        self.policy.observe(role, chars, time.perf_counter() - start, ok=True)
+        return translated
+
+    def translate_batch_with_engine(
+        self, texts: List[str], source_lang: str, target_lang: str, decision: Optional[RouteDecision] = None
+    ) -> tuple[List[str], str]:
+        """Translate ``texts`` and name the engine that answered.
+
+        In budget mode ``decision`` is the :meth:`route_batch` result for
+        ``texts``; it is taken here when the caller did not route the batch.
+        """
+        if self.selected_engine == "local":
+            return self.local.translate_batch(texts, source_lang, target_lang), self.local.engine_name
+        if self.policy is not None:
+            decision = decision or self.route_batch(texts)
+            self.counters.add(f"route_{decision.reason}")
+            if decision.engine == LOCAL:
+                return self._call(LOCAL, self.local, texts, source_lang, target_lang), self.local.engine_name
+
+        if self.azure.configured:
+            if self.azure_breaker.allow_request():
+                try:
+                    translated = self._call(AZURE, self.azure, texts, source_lang, target_lang)
+                except Exception as exc:
+                    self.azure_breaker.record_failure(str(exc))
+                else:
+                    self.azure_breaker.record_success()
+                    return translated, self.azure.engine_name
+            else:
+                self.counters.add("circuit_skips")
+        if self.policy is not None and decision is not None and decision.engine == AZURE:
+            # Characters reserved for Azure that it never translated go back into the budget.
+            self.policy.refund(sum(len(text) for text in texts))
+        self.counters.add("fallbacks")
+        return self._call(LOCAL, self.local, texts, source_lang, target_lang), self.local.engine_name
+
+    def translate_with_engine(self, text: str, source_lang: str, target_lang: str) -> tuple[str, str]:
+        translated, engine = self.translate_batch_with_engine([text], source_lang, target_lang)
+        return translated[0], engine
+
+
+def _azure_from_config(options: Dict[str, Any], pool_size: int) -> AzureTranslator:
+    options = dict(options)
+    key_env = options.pop("key_env", None)
+    key = os.getenv(key_env, "") if key_env else options.pop("key", os.getenv("AZURE_TRANSLATOR_KEY", ""))
+    chars_per_minute = int(options.pop("chars_per_minute", os.getenv("AZURE_CHARS_PER_MINUTE", "0")))
+    return AzureTranslator(
+        endpoint=options.pop("endpoint", os.getenv("AZURE_TRANSLATOR_ENDPOINT", "")),
+        key=key,
+        region=options.pop("region", os.getenv("AZURE_TRANSLATOR_REGION", "")),
+        limiter=TokenBucket(chars_per_minute) if chars_per_minute > 0 else None,
+        session=PooledSession(pool_size),
+        **options,
+    )
+
+
+def _ollama_from_config(options: Dict[str, Any], pool_size: int) -> OllamaGemmaTranslator:
+    options = dict(options)
+    return OllamaGemmaTranslator(
+        model=options.pop("model", os.getenv("OLLAMA_MODEL", "gemma:2b")),
+        endpoint=options.pop("endpoint", os.getenv("OLLAMA_ENDPOINT", "http://localhost:11434/api/generate")),
+        max_in_flight=int(options.pop("max_in_flight", os.getenv("OLLAMA_MAX_IN_FLIGHT", "1"))),
+        batch_size=int(options.pop("batch_size", os.getenv("OLLAMA_BATCH_SIZE", "20"))),
+        context_tokens=int(options.pop("context_tokens", os.getenv("OLLAMA_NUM_CTX", "8192"))),
+        session=PooledSession(pool_size),
+        **options,
+    )
+
+
+register_engine_type("azure", _azure_from_config)
+register_engine_type("ollama", _ollama_from_config)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Worksheet parts are rewritten as a byte stream: everything outside string
+# cells is copied through untouched, so formulas, namespace prefixes and
+# mc:Ignorable attributes survive byte-for-byte and memory stays bounded by
+# the chunk size rather than the sheet size.
+
+CHUNK_SIZE = 1 << 20
+
+_PREFIX = rb"(?:[A-Za-z_][\w.-]*:)?"
+# Only cells typed as inline or formula strings can hold translatable text, so
+# every other <c> element is copied through as part of the raw byte runs.
+_STRING_CELL_START = re.compile(rb"<(" + _PREFIX + rb")c\s[^>]*?\st\s*=\s*[\"'](inlineStr|str)[\"'][^>]*>")
+_SHARED_CELL = re.compile(
+    rb"<" + _PREFIX + rb"c\s[^>]*?\st\s*=\s*[\"']s[\"'][^>]*?(?<!/)>\s*<" + _PREFIX + rb"v(?:\s[^>]*)?>\s*(\d+)\s*</"
+)
+_CELL_OPEN = re.compile(rb"<" + _PREFIX + rb"c[\s>]")
+_REF_ATTR = re.compile(rb"""\sr\s*=\s*["']([^"']*)["']""")
+_FORMULA = re.compile(rb"<" + _PREFIX + rb"f[\s/>]")
+_INLINE_T = re.compile(rb"<" + _PREFIX + rb"is(?:\s[^>]*)?>\s*(<(" + _PREFIX + rb")t(?:\s[^>]*)?>)")
+_VALUE = re.compile(rb"(<(" + _PREFIX + rb")v(?:\s[^>]*)?>)")
+_ENTITY = re.compile(r"&(#x[0-9a-fA-F]+|#[0-9]+|lt|gt|amp|quot|apos);")
+_NAMED_ENTITIES = {"lt": "<", "gt": ">", "amp": "&", "quot": '"', "apos": "'"}
+
+
+@dataclass
+class _CellText:
+    start: int
+    end: int
+    text: str
+    is_inline: bool
+
+
+def _unescape(value: str) -> str:
+    def _replace(match: re.Match) -> str:
+        ref = match.group(1)
+        if ref.startswith("#x"):
+            return chr(int(ref[2:], 16))
+        if ref.startswith("#"):
+            return chr(int(ref[1:]))
+        return _NAMED_ENTITIES[ref]
+
+    return _ENTITY.sub(_replace, value)
+
+
+def _escape(value: str) -> bytes:
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").encode("utf-8")
+
+
+def _iter_segments(stream: BinaryIO, chunk_size: int) -> Iterator[Tuple[Optional[re.Match], bytes]]:
+    """Yield ``(start_tag, data)`` pieces that concatenate back to the original stream.
+
+    ``start_tag`` is the match of a string cell's start tag (relative to
+    ``data``) when ``data`` is one complete string cell, and ``None`` for raw bytes.
+    """
+    buffer = b""
+    eof = False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        pos = 0
+        while True:
+            match = _STRING_CELL_START.search(buffer, pos)
+            if match is None:
+                # Hold back a trailing unterminated tag: it may be a string cell split by the chunk boundary.
+                keep_from = len(buffer)
+                if not eof:
+                    last_open = buffer.rfind(b"<", pos)
+                    if last_open != -1 and buffer.find(b">", last_open) == -1:
+                        keep_from = last_open
+                if keep_from > pos:
+                    yield None, buffer[pos:keep_from]
+                pos = keep_from
+                break
+            if match.start() > pos:
+                yield None, buffer[pos : match.start()]
+            pos = match.start()
+
+            if match.group(0).endswith(b"/>"):
+                cell_end = match.end()
+            else:
+                close = b"</" + match.group(1) + b"c>"
+                close_at = buffer.find(close, match.end())
+                if close_at == -1:
+                    break
+                cell_end = close_at + len(close)
+            cell = buffer[pos:cell_end]
+            yield _STRING_CELL_START.match(cell), cell
+            pos = cell_end
+        buffer = buffer[pos:]
+    if buffer:
+        yield None, buffer
+
+
+def _cell_text(cell: bytes, start_tag: re.Match) -> Optional[_CellText]:
+    """Locate the translatable text of a string cell, skipping formulas and blank values."""
+    if start_tag.group(0).endswith(b"/>"):
+        return None
+    tag_end = start_tag.end()
+    if _FORMULA.search(cell, tag_end):
+        return None
+
+    if start_tag.group(2) == b"inlineStr":
+        pattern, local_name = _INLINE_T, b"t"
+    else:
+        pattern, local_name = _VALUE, b"v"
+    match = pattern.search(cell, tag_end)
+    if match is None or match.group(1).endswith(b"/>"):
+        return None
+    start = match.end(1)
+    end = cell.find(b"</" + match.group(2) + local_name + b">", start)
+    if end == -1:
+        return None
+    raw = cell[start:end]
+    if b"<" in raw:
+        # CDATA or nested markup: leave it alone rather than guess.
+        return None
+    text = _unescape(raw.decode("utf-8"))
+    if not text.strip():
+        return None
+    return _CellText(start=start, end=end, text=text, is_inline=local_name == b"t")
+
+
+def iter_string_cells(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[int, str, str]]:
+    """Yield ``(cell_index, coordinate, text)`` for each inline-string or ``t="str"`` cell without a formula.
+
+    ``cell_index`` is the ordinal of the cell among the sheet's string-typed
+    ``<c>`` elements and is the key :func:`rewrite_string_cells` expects.
+    """
+    index = 0
+    for start_tag, data in _iter_segments(stream, chunk_size):
+        if start_tag is None:
+            continue
+        found = _cell_text(data, start_tag)
+        if found is not None:
+            ref = _REF_ATTR.search(start_tag.group(0))
+            coord = ref.group(1).decode("utf-8") if ref is not None else "?"
+            yield index, coord, found.text
+        index += 1
+
+
+def rewrite_string_cells(stream: BinaryIO, out: BinaryIO, replacements: dict[int, str], chunk_size: int = CHUNK_SIZE) -> None:
+    """Copy a worksheet from ``stream`` to ``out``, replacing the text of the cells keyed in ``replacements``."""
+    index = 0
+    for start_tag, data in _iter_segments(stream, chunk_size):
+        if start_tag is not None:
+            if index in replacements:
+                found = _cell_text(data, start_tag)
+                if found is not None:
+                    value = replacements[index]
+                    open_tag = data[: found.start]
+                    if found.is_inline and value != value.strip() and b"xml:space" not in open_tag[open_tag.rfind(b"<") :]:
+                        open_tag = open_tag[:-1] + b' xml:space="preserve">'
+                    data = open_tag + _escape(value) + data[found.end :]
+            index += 1
+        out.write(data)
+
+
+def iter_shared_string_refs(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[int]:
+    """Yield the shared-string index of every ``t="s"`` cell in a worksheet, in document order."""
+    buffer = b""
+    eof = False
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        pos = 0
+        for match in _SHARED_CELL.finditer(buffer):
+            yield int(match.group(1))
+            pos = match.end()
+        # Keep the last cell that started after the final match (or a trailing partial
+        # tag): it may be cut by the chunk boundary.
+        tail_start = buffer.rfind(b"<", pos)
+        for match in _CELL_OPEN.finditer(buffer, pos):
+            tail_start = match.start()
+        if tail_start == -1:
+            tail_start = len(buffer)
+        buffer = buffer[tail_start:]
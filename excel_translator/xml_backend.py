@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import os
+import threading
+import xml.etree.ElementTree as ET
+from typing import Any, Iterator, Optional
+
+try:  # optional: pip install lxml
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover - depends on the environment
+    lxml_etree = None
+
+# Parsing and serializing of the package XML parts that are handled as trees
+# (workbook, sharedStrings, comments, drawings, charts). Both backends expose
+# the ElementTree API the processor uses (find/findall/iter/attrib/text/set).
+# lxml parses and serializes in C and writes the document back with its
+# original namespace prefixes and standalone flag; the stdlib backend renames
+# prefixes to ns0:, ns1:, ... which Excel accepts but which makes parts larger.
+# Worksheets never go through here; they are streamed by worksheet_stream.
+
+XML_BACKEND_ENV = "EXCEL_TRANSLATOR_XML_BACKEND"
+
+# How many completed elements lxml's iterparse keeps before detaching them.
+_PRUNE_EVERY = 4096
+
+# An element of whichever backend parsed it.
+Element = Any
+
+
+class StdlibBackend:
+    name = "stdlib"
+
+    def fromstring(self, data: bytes) -> Element:
+        return ET.fromstring(data)
+
+    def tostring(self, root: Element) -> bytes:
+        return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+    def iterparse(self, data: bytes, tag: str) -> Iterator[Element]:
+        """Yield each ``tag`` element once it is complete, clearing it afterwards to keep memory flat."""
+        for _event, elem in ET.iterparse(io.BytesIO(data), events=("end",)):
+            if elem.tag == tag:
+                yield elem
+                elem.clear()
+
+
+class LxmlBackend:
+    name = "lxml"
+
+    def __init__(self) -> None:
+        if lxml_etree is None:
+            raise ValueError("The lxml XML backend needs lxml (pip install lxml)")
+        # lxml parsers must not be shared between threads.
+        self._local = threading.local()
+
+    def _parser(self) -> "lxml_etree.XMLParser":
+        parser = getattr(self._local, "parser", None)
+        if parser is None:
+            parser = self._local.parser = lxml_etree.XMLParser(resolve_entities=False, no_network=True, huge_tree=True)
+        return parser
+
+    def fromstring(self, data: bytes) -> Element:
+        return lxml_etree.fromstring(data, self._parser())
+
+    def tostring(self, root: Element) -> bytes:
+        tree = root.getroottree()
+        return lxml_etree.tostring(tree, encoding="UTF-8", xml_declaration=True, standalone=tree.docinfo.standalone)
+
+    def iterparse(self, data: bytes, tag: str) -> Iterator[Element]:
+        """Yield each ``tag`` element once it is complete, clearing it and periodically dropping finished siblings."""
+        events = lxml_etree.iterparse(io.BytesIO(data), events=("end",), tag=tag, resolve_entities=False, huge_tree=True)
+        for count, (_event, elem) in enumerate(events, start=1):
+            yield elem
+            elem.clear(keep_tail=True)
+            # Detaching in blocks is much cheaper than unlinking every element as it completes.
+            if count % _PRUNE_EVERY == 0 and (parent := elem.getparent()) is not None:
+                del parent[: parent.index(elem)]
+
+
+_BACKENDS = {"stdlib": StdlibBackend, "lxml": LxmlBackend}
+_instances: dict[str, Any] = {}
+
+
+def get_backend(name: Optional[str] = None) -> Any:
+    """The backend called ``name``: ``lxml``, ``stdlib`` or ``auto`` (lxml when installed).
+
+    Defaults to ``$EXCEL_TRANSLATOR_XML_BACKEND``, then ``auto``. Asking for
+    ``lxml`` without lxml installed raises ``ValueError``.
+    """
+    name = (name or os.getenv(XML_BACKEND_ENV) or "auto").strip().lower()
+    if name == "auto":
+        name = "lxml" if lxml_etree is not None else "stdlib"
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown XML backend {name!r}; expected one of auto, {', '.join(_BACKENDS)}")
+    if name not in _instances:
+        _instances[name] = _BACKENDS[name]()
+    return _instances[name]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from generate_benchmark_workbook import add_spec_arguments, generate_workbook, spec_from_args  # noqa: E402
+from mock_translation_server import start_server  # noqa: E402
+
+from excel_translator.metrics import measure_stage_peaks, peak_rss_bytes  # noqa: E402
+from excel_translator.processor import process_excel_file  # noqa: E402
+
+
+def run(args: argparse.Namespace) -> dict:
+    server = start_server(latency_ms=args.latency_ms, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    base = f"http://127.0.0.1:{server.server_port}"
+    os.environ.update(
+        {
+            "AZURE_TRANSLATOR_ENDPOINT": base,
+            "AZURE_TRANSLATOR_KEY": "benchmark",
+            "AZURE_TRANSLATOR_REGION": "local",
+            "OLLAMA_ENDPOINT": f"{base}/api/generate",
+        }
+    )
+
+    measure_stage_peaks()
+    peak = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "benchmark.xlsx"
+            contents = generate_workbook(path, spec_from_args(args))
+            payload = path.read_bytes()
+
+        report = {"workbook": {"mib": round(len(payload) / 2**20, 2), **contents}, "engine": args.engine, "runs": []}
+        for _ in range(args.repeat):
+            server.reset()
+            start = time.perf_counter()
+            result = process_excel_file("benchmark.xlsx", payload, "en", "fr", args.engine)
+            wall = time.perf_counter() - start
+            strings = len(result.logs)
+            # Stages reset the high-water mark, so the process peak is the largest stage peak.
+            peak = max([peak, peak_rss_bytes()] + [stage["peak_rss_bytes"] for stage in result.stages.values()])
+            report["runs"].append(
+                {
+                    "wall_seconds": round(wall, 3),
+                    "strings": strings,
+                    "strings_per_second": round(strings / wall, 1) if wall else None,
+                    "server": server.snapshot(),
+                    "stages": {
+                        name: {"seconds": round(stage["seconds"], 3), "peak_rss_mib": round(stage["peak_rss_bytes"] / 2**20, 1)}
+                        for name, stage in result.stages.items()
+                    },
+                    "stats": result.stats,
+                }
+            )
+        report["peak_rss_mib"] = round(peak / 2**20, 1)
+        return report
+    finally:
+        measure_stage_peaks(False)
+        server.shutdown()
+        server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run process_excel_file on a synthetic workbook against a mock translation server.")
+    add_spec_arguments(parser)
+    parser.add_argument("--engine", choices=["azure", "local"], default="azure")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mock server delay per request")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs over the same workbook (each with a fresh in-memory dedup)")
+    parser.add_argument("--output", type=Path, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n", encoding="utf-8")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from excel_translator.worksheet_stream import iter_string_cells, rewrite_string_cells  # noqa: E402
+
+S_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+def _column_letter(idx: int) -> str:
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def write_sheet(path: Path, rows: int, cols: int, string_ratio: float, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    with open(path, "wb") as f:
+        f.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            b'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" mc:Ignorable="x14ac" '
+            b'xmlns:x14ac="http://schemas.microsoft.com/office/spreadsheetml/2009/9/ac"><sheetData>'
+        )
+        for r in range(1, rows + 1):
+            cells = []
+            for c in range(cols):
+                ref = f"{_column_letter(c)}{r}"
+                if rng.random() < string_ratio:
+                    cells.append(f'<c r="{ref}" t="inlineStr"><is><t>Label {rng.randint(0, 500)}</t></is></c>')
+                else:
+                    cells.append(f'<c r="{ref}"><v>{rng.random() * 1000:.4f}</v></c>')
+            f.write(f'<row r="{r}" x14ac:dyDescent="0.25">{"".join(cells)}</row>'.encode("utf-8"))
+        f.write(b"</sheetData></worksheet>")
+
+
+def _etree_rewrite(path: Path) -> int:
+    root = ET.fromstring(path.read_bytes())
+    count = 0
+    for cell in root.iter(f"{S_NS}c"):
+        node = cell.find(f"{S_NS}is/{S_NS}t")
+        if node is not None and node.text:
+            node.text = f"T[{node.text}]"
+            count += 1
+    ET.tostring(root, encoding="utf-8", xml_declaration=True)
+    return count
+
+
+def _stream_rewrite(path: Path) -> int:
+    with open(path, "rb") as f:
+        replacements = {idx: f"T[{text}]" for idx, _coord, text in iter_string_cells(f)}
+    with open(path, "rb") as f, open(os.devnull, "wb") as out:
+        rewrite_string_cells(f, out, replacements)
+    return len(replacements)
+
+
+def _measure(func: Callable[[Path], int], path: Path) -> dict:
+    start = time.perf_counter()
+    count = func(path)
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows allocation-heavy code considerably, so memory is measured on a separate run.
+    tracemalloc.start()
+    func(path)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 3), "peak_mib": round(peak / 2**20, 1), "strings": count}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare ElementTree and streaming worksheet rewrites.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--string-ratio", type=float, default=0.05)
+    parser.add_argument("--skip-etree", action="store_true", help="Only run the streaming rewriter (for very large sheets)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "sheet1.xml"
+        write_sheet(path, args.rows, args.cols, args.string_ratio)
+        report = {"sheet_mib": round(path.stat().st_size / 2**20, 1), "rows": args.rows, "cols": args.cols}
+        report["stream"] = _measure(_stream_rewrite, path)
+        if not args.skip_etree:
+            report["etree"] = _measure(_etree_rewrite, path)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from generate_benchmark_workbook import add_spec_arguments, generate_workbook, spec_from_args  # noqa: E402
+
+from excel_translator.xml_backend import get_backend, lxml_etree  # noqa: E402
+
+S_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+A_NS = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+
+# Which text nodes each part kind rewrites, as in the pipeline.
+TEXT_TAGS = {"worksheet": f"{S_NS}t", "sharedStrings": f"{S_NS}t", "chart": f"{A_NS}t"}
+ITEM_TAGS = {"worksheet": f"{S_NS}row", "sharedStrings": f"{S_NS}si", "chart": f"{A_NS}t"}
+
+
+def _round_trip(backend, payload: bytes, kind: str) -> bytes:
+    root = backend.fromstring(payload)
+    for node in root.iter(TEXT_TAGS[kind]):
+        if node.text:
+            node.text = f"T[{node.text}]"
+    return backend.tostring(root)
+
+
+def _scan(backend, payload: bytes, kind: str) -> int:
+    return sum(1 for _ in backend.iterparse(payload, ITEM_TAGS[kind]))
+
+
+def _best_of(func: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the lxml and stdlib XML backends on worksheet, sharedStrings and chart parts.")
+    add_spec_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per measurement; the best is reported")
+    parser.add_argument("--output", type=Path, help="Also write the JSON report here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "benchmark.xlsx"
+        generate_workbook(path, spec_from_args(args))
+        with zipfile.ZipFile(path) as zf:
+            names = zf.namelist()
+            parts = {"worksheet": zf.read("xl/worksheets/sheet1.xml")}
+            if "xl/sharedStrings.xml" in names:
+                parts["sharedStrings"] = zf.read("xl/sharedStrings.xml")
+            charts = [name for name in names if name.startswith("xl/charts/chart")]
+            if charts:
+                parts["chart"] = zf.read(charts[0])
+
+    backends = ["stdlib"] + (["lxml"] if lxml_etree is not None else [])
+    report: dict = {"backends": backends, "parts": {}}
+    for kind, payload in parts.items():
+        entry: dict = {"kib": round(len(payload) / 1024, 1)}
+        for name in backends:
+            backend = get_backend(name)
+            output = _round_trip(backend, payload, kind)
+            entry[name] = {
+                "round_trip_ms": round(_best_of(lambda: _round_trip(backend, payload, kind), args.repeat) * 1000, 2),
+                "iterparse_ms": round(_best_of(lambda: _scan(backend, payload, kind), args.repeat) * 1000, 2),
+                "output_kib": round(len(output) / 1024, 1),
+            }
+        report["parts"][kind] = entry
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import argparse
+import random
+import struct
+import zipfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+# Writes the package XML directly so the generator can produce sheets far
+# larger than openpyxl would hold in memory, and choose between shared and
+# inline strings the way different producers (Excel vs. exporters) do.
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+DRAWING_NS = "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing"
+A_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+C_NS = "http://schemas.openxmlformats.org/drawingml/2006/chart"
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+WORDS = (
+    "revenue cost margin forecast budget actual quarter region customer supplier invoice payment order "
+    "shipment warehouse product service contract review approved pending overdue total net gross annual "
+    "monthly weekly report summary variance target growth decline risk owner status comment balance"
+).split()
+
+
+@dataclass
+class WorkbookSpec:
+    sheets: int = 3
+    rows: int = 10_000
+    cols: int = 10
+    string_ratio: float = 0.3
+    code_ratio: float = 0.2
+    unique_strings: int = 5_000
+    shared_strings: bool = True
+    comments: int = 50
+    charts: bool = True
+    images: bool = True
+    image_kib: int = 256
+    seed: int = 7
+
+
+def _column_letter(idx: int) -> str:
+    letters = ""
+    idx += 1
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _phrase(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8))).capitalize()
+
+
+def _png(size_kib: int, rng: random.Random) -> bytes:
+    """A valid grey-noise PNG of roughly ``size_kib``; noise keeps it from compressing away."""
+    side = max(1, int((size_kib * 1024) ** 0.5))
+    raw = b"".join(b"\x00" + rng.randbytes(side) for _ in range(side))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", side, side, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+def _sheet_rels(idx: int, spec: WorkbookSpec) -> str:
+    rels = []
+    if spec.comments:
+        rels.append(f'<Relationship Id="rIdComments" Type="{REL_TYPE}/comments" Target="../comments{idx}.xml"/>')
+        rels.append(f'<Relationship Id="rIdVml" Type="{REL_TYPE}/vmlDrawing" Target="../drawings/vmlDrawing{idx}.vml"/>')
+    if spec.charts or spec.images:
+        rels.append(f'<Relationship Id="rIdDrawing" Type="{REL_TYPE}/drawing" Target="../drawings/drawing{idx}.xml"/>')
+    return f'<Relationships xmlns="{PKG_REL_NS}">{"".join(rels)}</Relationships>'
+
+
+def _comments(rows: List[int], rng: random.Random) -> str:
+    items = "".join(f'<comment ref="A{row}" authorId="0"><text><t>{_escape(_phrase(rng))}</t></text></comment>' for row in rows)
+    return f'<comments xmlns="{MAIN_NS}"><authors><author>bench</author></authors><commentList>{items}</commentList></comments>'
+
+
+def _vml(rows: List[int]) -> str:
+    shapes = "".join(
+        f'<v:shape id="_x0000_s{1024 + n}" type="#_x0000_t202" style="position:absolute;visibility:hidden" fillcolor="#ffffe1">'
+        f'<v:textbox/><x:ClientData ObjectType="Note"><x:MoveWithCells/><x:SizeWithCells/>'
+        f"<x:Anchor>1, 15, 0, 2, 3, 15, 3, 16</x:Anchor><x:AutoFill>False</x:AutoFill>"
+        f"<x:Row>{row - 1}</x:Row><x:Column>0</x:Column></x:ClientData></v:shape>"
+        for n, row in enumerate(rows)
+    )
+    return (
+        '<xml xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office" '
+        'xmlns:x="urn:schemas-microsoft-com:office:excel">'
+        '<v:shapetype id="_x0000_t202" coordsize="21600,21600" o:spt="202" path="m,l,21600r21600,l21600,xe">'
+        '<v:stroke joinstyle="miter"/><v:path gradientshapeok="t" o:connecttype="rect"/></v:shapetype>'
+        f"{shapes}</xml>"
+    )
+
+
+def _anchor(col: int, body: str) -> str:
+    return (
+        f"<xdr:twoCellAnchor><xdr:from><xdr:col>{col}</xdr:col><xdr:colOff>0</xdr:colOff><xdr:row>1</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:from>"
+        f"<xdr:to><xdr:col>{col + 6}</xdr:col><xdr:colOff>0</xdr:colOff><xdr:row>16</xdr:row><xdr:rowOff>0</xdr:rowOff></xdr:to>"
+        f"{body}<xdr:clientData/></xdr:twoCellAnchor>"
+    )
+
+
+def _drawing(spec: WorkbookSpec, rng: random.Random) -> str:
+    anchors = [
+        _anchor(
+            0,
+            '<xdr:sp macro="" textlink=""><xdr:nvSpPr><xdr:cNvPr id="2" name="Note"/><xdr:cNvSpPr txBox="1"/></xdr:nvSpPr>'
+            '<xdr:spPr><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr>'
+            f"<xdr:txBody><a:bodyPr/><a:p><a:r><a:t>{_escape(_phrase(rng))}</a:t></a:r></a:p></xdr:txBody></xdr:sp>",
+        )
+    ]
+    if spec.charts:
+        anchors.append(
+            _anchor(
+                8,
+                '<xdr:graphicFrame macro=""><xdr:nvGraphicFramePr><xdr:cNvPr id="3" name="Chart"/><xdr:cNvGraphicFramePr/></xdr:nvGraphicFramePr>'
+                '<xdr:xfrm><a:off x="0" y="0"/><a:ext cx="0" cy="0"/></xdr:xfrm>'
+                f'<a:graphic><a:graphicData uri="{C_NS}"><c:chart xmlns:c="{C_NS}" r:id="rIdChart"/></a:graphicData></a:graphic></xdr:graphicFrame>',
+            )
+        )
+    if spec.images:
+        anchors.append(
+            _anchor(
+                16,
+                '<xdr:pic><xdr:nvPicPr><xdr:cNvPr id="4" name="Picture"/><xdr:cNvPicPr/></xdr:nvPicPr>'
+                '<xdr:blipFill><a:blip r:embed="rIdImage"/><a:stretch><a:fillRect/></a:stretch></xdr:blipFill>'
+                '<xdr:spPr><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></xdr:spPr></xdr:pic>',
+            )
+        )
+    return f'<xdr:wsDr xmlns:xdr="{DRAWING_NS}" xmlns:a="{A_NS}" xmlns:r="{REL_NS}">{"".join(anchors)}</xdr:wsDr>'
+
+
+def _drawing_rels(idx: int, spec: WorkbookSpec) -> str:
+    rels = []
+    if spec.charts:
+        rels.append(f'<Relationship Id="rIdChart" Type="{REL_TYPE}/chart" Target="../charts/chart{idx}.xml"/>')
+    if spec.images:
+        rels.append(f'<Relationship Id="rIdImage" Type="{REL_TYPE}/image" Target="../media/image{idx}.png"/>')
+    return f'<Relationships xmlns="{PKG_REL_NS}">{"".join(rels)}</Relationships>'
+
+
+def _chart(sheet_title: str, rng: random.Random) -> str:
+    def rich(text: str) -> str:
+        return f'<c:tx><c:rich><a:bodyPr/><a:p><a:r><a:t>{_escape(text)}</a:t></a:r></a:p></c:rich></c:tx><c:overlay val="0"/>'
+
+    return (
+        f'<c:chartSpace xmlns:c="{C_NS}" xmlns:a="{A_NS}" xmlns:r="{REL_NS}"><c:chart><c:title>{rich(_phrase(rng))}</c:title>'
+        '<c:plotArea><c:layout/><c:barChart><c:barDir val="col"/><c:grouping val="clustered"/>'
+        f"<c:ser><c:idx val=\"0\"/><c:order val=\"0\"/><c:val><c:numRef><c:f>'{sheet_title}'!$B$1:$B$10</c:f></c:numRef></c:val></c:ser>"
+        '<c:axId val="1"/><c:axId val="2"/></c:barChart>'
+        f'<c:catAx><c:axId val="1"/><c:scaling><c:orientation val="minMax"/></c:scaling><c:axPos val="b"/><c:title>{rich(_phrase(rng))}</c:title><c:crossAx val="2"/></c:catAx>'
+        '<c:valAx><c:axId val="2"/><c:scaling><c:orientation val="minMax"/></c:scaling><c:axPos val="l"/><c:crossAx val="1"/></c:valAx>'
+        "</c:plotArea></c:chart></c:chartSpace>"
+    )
+
+
+_STYLES = (
+    f'<styleSheet xmlns="{MAIN_NS}"><fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'
+)
+
+
+def generate_workbook(path: Path, spec: WorkbookSpec) -> Dict[str, int]:
+    """Write a synthetic workbook to ``path`` and return counts of what it contains."""
+    rng = random.Random(spec.seed)
+    vocabulary = [_phrase(rng) for _ in range(spec.unique_strings)]
+    shared: Dict[str, int] = {}
+    shared_refs = 0
+    counts = {"sheets": spec.sheets, "string_cells": 0, "comments": 0, "charts": 0, "images": 0}
+    overrides: List[str] = []
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        titles = [f"Sheet {idx}" for idx in range(1, spec.sheets + 1)]
+        for idx, title in enumerate(titles, start=1):
+            with zf.open(f"xl/worksheets/sheet{idx}.xml", "w", force_zip64=True) as out:
+                out.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><sheetData>'.encode())
+                for row in range(1, spec.rows + 1):
+                    cells = []
+                    for col in range(spec.cols):
+                        ref = f"{_column_letter(col)}{row}"
+                        if rng.random() >= spec.string_ratio:
+                            cells.append(f'<c r="{ref}"><v>{rng.random() * 1000:.2f}</v></c>')
+                            continue
+                        counts["string_cells"] += 1
+                        text = f"SKU-{rng.randint(10000, 99999)}" if rng.random() < spec.code_ratio else rng.choice(vocabulary)
+                        if spec.shared_strings:
+                            shared_refs += 1
+                            cells.append(f'<c r="{ref}" t="s"><v>{shared.setdefault(text, len(shared))}</v></c>')
+                        else:
+                            cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{_escape(text)}</t></is></c>')
+                    out.write(f'<row r="{row}">{"".join(cells)}</row>'.encode())
+                tail = "</sheetData>"
+                if spec.charts or spec.images:
+                    tail += '<drawing r:id="rIdDrawing"/>'
+                if spec.comments:
+                    tail += '<legacyDrawing r:id="rIdVml"/>'
+                out.write(f"{tail}</worksheet>".encode())
+            overrides.append(f'<Override PartName="/xl/worksheets/sheet{idx}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+
+            if spec.comments or spec.charts or spec.images:
+                zf.writestr(f"xl/worksheets/_rels/sheet{idx}.xml.rels", _sheet_rels(idx, spec))
+            if spec.comments:
+                rows = sorted(rng.sample(range(1, spec.rows + 1), min(spec.comments, spec.rows)))
+                zf.writestr(f"xl/comments{idx}.xml", _comments(rows, rng))
+                zf.writestr(f"xl/drawings/vmlDrawing{idx}.vml", _vml(rows))
+                overrides.append(f'<Override PartName="/xl/comments{idx}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.comments+xml"/>')
+                counts["comments"] += len(rows)
+            if spec.charts or spec.images:
+                zf.writestr(f"xl/drawings/drawing{idx}.xml", _drawing(spec, rng))
+                zf.writestr(f"xl/drawings/_rels/drawing{idx}.xml.rels", _drawing_rels(idx, spec))
+                overrides.append(f'<Override PartName="/xl/drawings/drawing{idx}.xml" ContentType="application/vnd.openxmlformats-officedocument.drawing+xml"/>')
+            if spec.charts:
+                zf.writestr(f"xl/charts/chart{idx}.xml", _chart(title, rng))
+                overrides.append(f'<Override PartName="/xl/charts/chart{idx}.xml" ContentType="application/vnd.openxmlformats-officedocument.drawingml.chart+xml"/>')
+                counts["charts"] += 1
+            if spec.images:
+                zf.writestr(f"xl/media/image{idx}.png", _png(spec.image_kib, rng), compress_type=zipfile.ZIP_STORED)
+                counts["images"] += 1
+
+        workbook_rels = [
+            f'<Relationship Id="rId{idx}" Type="{REL_TYPE}/worksheet" Target="worksheets/sheet{idx}.xml"/>' for idx in range(1, spec.sheets + 1)
+        ]
+        workbook_rels.append(f'<Relationship Id="rIdStyles" Type="{REL_TYPE}/styles" Target="styles.xml"/>')
+        if spec.shared_strings:
+            items = "".join(f"<si><t>{_escape(text)}</t></si>" for text in shared)
+            zf.writestr("xl/sharedStrings.xml", f'<sst xmlns="{MAIN_NS}" count="{shared_refs}" uniqueCount="{len(shared)}">{items}</sst>')
+            workbook_rels.append(f'<Relationship Id="rIdShared" Type="{REL_TYPE}/sharedStrings" Target="sharedStrings.xml"/>')
+            overrides.append('<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>')
+
+        sheets = "".join(f'<sheet name="{title}" sheetId="{idx}" r:id="rId{idx}"/>' for idx, title in enumerate(titles, start=1))
+        zf.writestr("xl/workbook.xml", f'<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}"><sheets>{sheets}</sheets></workbook>')
+        zf.writestr("xl/_rels/workbook.xml.rels", f'<Relationships xmlns="{PKG_REL_NS}">{"".join(workbook_rels)}</Relationships>')
+        zf.writestr("xl/styles.xml", _STYLES)
+        zf.writestr(
+            "_rels/.rels",
+            f'<Relationships xmlns="{PKG_REL_NS}"><Relationship Id="rId1" Type="{REL_TYPE}/officeDocument" Target="xl/workbook.xml"/></Relationships>',
+        )
+        zf.writestr(
+            "[Content_Types].xml",
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Default Extension="vml" ContentType="application/vnd.openxmlformats-officedocument.vmlDrawing"/>'
+            '<Default Extension="png" ContentType="image/png"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{"".join(overrides)}</Types>',
+        )
+    return counts
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = WorkbookSpec()
+    parser.add_argument("--sheets", type=int, default=defaults.sheets)
+    parser.add_argument("--rows", type=int, default=defaults.rows, help="Rows per sheet")
+    parser.add_argument("--cols", type=int, default=defaults.cols)
+    parser.add_argument("--string-ratio", type=float, default=defaults.string_ratio, help="Share of cells holding text")
+    parser.add_argument("--code-ratio", type=float, default=defaults.code_ratio, help="Share of text cells that are SKU-like codes")
+    parser.add_argument("--unique-strings", type=int, default=defaults.unique_strings, help="Size of the phrase vocabulary")
+    parser.add_argument("--inline-strings", action="store_true", help="Write inline strings instead of a shared string table")
+    parser.add_argument("--comments", type=int, default=defaults.comments, help="Comments per sheet")
+    parser.add_argument("--no-charts", action="store_true")
+    parser.add_argument("--no-images", action="store_true")
+    parser.add_argument("--image-kib", type=int, default=defaults.image_kib)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def spec_from_args(args: argparse.Namespace) -> WorkbookSpec:
+    return WorkbookSpec(
+        sheets=args.sheets,
+        rows=args.rows,
+        cols=args.cols,
+        string_ratio=args.string_ratio,
+        code_ratio=args.code_ratio,
+        unique_strings=args.unique_strings,
+        shared_strings=not args.inline_strings,
+        comments=args.comments,
+        charts=not args.no_charts,
+        images=not args.no_images,
+        image_kib=args.image_kib,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a large synthetic .xlsx workbook for benchmarks.")
+    parser.add_argument("output", type=Path)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    counts = generate_workbook(args.output, spec_from_args(args))
+    print(f"Generated: {args.output} {counts}")
+
+
+if __name__ == "__main__":
+    main()
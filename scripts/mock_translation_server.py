@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Imitates Azure Translator (POST /translate) and Ollama (POST /api/generate)
+# closely enough for the engines in excel_translator.translators. Translations
+# are "<target>:<text>", so output is deterministic and easy to check.
+
+
+class MockTranslationServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0, seed: int = 7):
+        super().__init__(address, _Handler)
+        self.latency = latency_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.counters: Counter = Counter()
+        self.lock = threading.Lock()
+
+    def count(self, key: str, amount: int = 1) -> None:
+        with self.lock:
+            self.counters[key] += amount
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters.clear()
+
+    def _roll(self) -> float:
+        with self.lock:
+            return self.rng.random()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: MockTranslationServer
+
+    def _send(self, status: int, payload, headers: dict | None = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/stats":
+            self._send(200, self.server.snapshot())
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"null")
+        engine = "azure" if url.path.endswith("/translate") else "ollama"
+        self.server.count(f"{engine}_requests")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        roll = self.server._roll()
+        if roll < self.server.throttle_rate:
+            self.server.count(f"{engine}_throttled")
+            self._send(429, {"error": "throttled"}, {"Retry-After": "1"})
+            return
+        if roll < self.server.throttle_rate + self.server.error_rate:
+            self.server.count(f"{engine}_errors")
+            self._send(500, {"error": "injected failure"})
+            return
+
+        if engine == "azure":
+            target = parse_qs(url.query).get("to", ["xx"])[0]
+            # Azure treats the body keys case-insensitively; clients send "text" or "Text".
+            texts = [item.get("text", item.get("Text", "")) for item in payload]
+            self.server.count("azure_strings", len(texts))
+            self.server.count("azure_chars", sum(len(text) for text in texts))
+            self._send(200, [{"translations": [{"text": f"{target}:{text}", "to": target}]} for text in texts])
+            return
+
+        prompt = payload["prompt"]
+        source = prompt.split("Input:\n", 1)[-1]
+        if payload.get("format") == "json":
+            items = json.loads(source)["items"]
+            self.server.count("ollama_strings", len(items))
+            response = json.dumps({"translations": [{"id": item["id"], "text": f"xx:{item['text']}"} for item in items]}, ensure_ascii=False)
+        else:
+            self.server.count("ollama_strings")
+            response = f"xx:{source}"
+        self._send(200, {"model": payload.get("model"), "response": response, "done": True})
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options) -> MockTranslationServer:
+    """Start a mock server on a background thread; ``port=0`` picks a free port. Stop it with ``shutdown()``."""
+    server = MockTranslationServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock Azure Translator and Ollama endpoints for benchmarks.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with HTTP 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with HTTP 429")
+    args = parser.parse_args()
+
+    server = MockTranslationServer((args.host, args.port), args.latency_ms, args.error_rate, args.throttle_rate)
+    base = f"http://{args.host}:{server.server_port}"
+    print(f"AZURE_TRANSLATOR_ENDPOINT={base}  OLLAMA_ENDPOINT={base}/api/generate  (counters at {base}/stats)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import io
+import multiprocessing
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from excel_translator.batch import translate_files
+
+
+def _workbook(*values: str) -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    for row, value in enumerate(values, start=1):
+        ws.cell(row=row, column=1, value=value)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _fake_translate(self, texts, source, target):
+    return [f"T[{text}]" for text in texts], "fake_engine"
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_translate_files_returns_every_result_and_reports_progress(monkeypatch, max_workers):
+    if max_workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("monkeypatched translator only reaches workers under fork")
+    from excel_translator import processor
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+    files = [(f"book{idx}.xlsx", _workbook("Total", f"Row {idx}")) for idx in range(4)]
+    progress: list[tuple[int, int | None, str]] = []
+
+    results = dict(
+        translate_files(files, "en", "fr", "azure", max_workers=max_workers, progress=lambda *args: progress.append(args))
+    )
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert [p[0] for p in progress] == [1, 2, 3, 4]
+    assert all(p[1] == 4 for p in progress)
+    for idx, result in results.items():
+        assert result.output_filename == f"T[book{idx}]_fr.xlsx"
+        ws = load_workbook(io.BytesIO(result.output_bytes)).active
+        assert [ws["A1"].value, ws["A2"].value] == ["T[Total]", f"T[Row {idx}]"]
+
+
+def test_serial_batch_shares_translations_across_files(monkeypatch, tmp_path):
+    from excel_translator import processor
+
+    calls: list[list[str]] = []
+
+    def _counting_translate(self, texts, source, target):
+        calls.append(list(texts))
+        return _fake_translate(self, texts, source, target)
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _counting_translate)
+    files = [("a.xlsx", _workbook("Total", "Alpha")), ("b.xlsx", _workbook("Total", "Beta"))]
+
+    results = dict(translate_files(files, "en", "fr", "azure", memory_path=str(tmp_path / "tm.sqlite")))
+
+    assert sum(text == "Total" for call in calls for text in call) == 1
+    assert results[1].stats["dedup_hits"] >= 1
+
+
+def test_translate_directory_streams_dirs_and_zips_to_output(monkeypatch, tmp_path):
+    import json
+    import zipfile
+
+    from excel_translator import processor
+    from excel_translator.cli import main
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+    src = tmp_path / "share"
+    (src / "finance").mkdir(parents=True)
+    (src / "finance" / "q1.xlsx").write_bytes(_workbook("Revenue"))
+    (src / "broken.xlsx").write_bytes(b"not a workbook")
+    with zipfile.ZipFile(tmp_path / "upload.zip", "w") as zf:
+        zf.writestr("nested/q2.xlsx", _workbook("Cost"))
+
+    out_dir = tmp_path / "out"
+    exit_code = main([str(src), str(tmp_path / "upload.zip"), "-o", str(out_dir), "--target", "fr", "--jobs", "1", "--quiet"])
+
+    assert exit_code == 1  # broken.xlsx is reported, the rest still succeeds
+    assert (out_dir / "finance" / "T[q1]_fr.xlsx").exists()
+    assert (out_dir / "upload" / "nested" / "T[q2]_fr.xlsx").exists()
+    log_lines = (out_dir / "translation_logs.jsonl").read_text(encoding="utf-8").splitlines()
+    assert {json.loads(line)["original_text"] for line in log_lines} >= {"Revenue", "Cost"}
+
+    from excel_translator import translate_directory
+
+    summary = translate_directory([str(src / "finance" / "*.xlsx")], str(tmp_path / "out.zip"), "en", "fr")
+    assert summary["written"] == ["T[q1]_fr.xlsx"] and summary["failed"] == {}
+    with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+        assert sorted(zf.namelist()) == ["T[q1]_fr.xlsx", "translation_logs.jsonl"]
+
+
+def test_same_named_workbooks_in_different_folders_keep_separate_manifests(monkeypatch, tmp_path):
+    from excel_translator import processor, translate_directory
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+    src = tmp_path / "in"
+    (src / "sub").mkdir(parents=True)
+    (src / "a.xlsx").write_bytes(_workbook("Revenue"))
+    (src / "sub" / "a.xlsx").write_bytes(_workbook("Cost"))
+    manifests = tmp_path / "manifests"
+
+    translate_directory([str(src)], str(tmp_path / "out1"), "en", "fr", manifest_dir=str(manifests))
+    summary = translate_directory([str(src)], str(tmp_path / "out2"), "en", "fr", manifest_dir=str(manifests))
+
+    assert (manifests / "a.xlsx.manifest.json").exists()
+    assert (manifests / "sub" / "a.xlsx.manifest.json").exists()
+    assert summary["stats"]["strings_changed"] == 0
+    assert summary["stats"]["strings_reused"] == 4  # one cell and one sheet title per workbook
+
+
+def test_iter_inputs_extracts_zip_members_only_when_pulled(tmp_path):
+    import zipfile
+
+    from excel_translator.batch import iter_inputs
+
+    with zipfile.ZipFile(tmp_path / "upload.zip", "w") as zf:
+        zf.writestr("a.xlsx", b"first")
+        zf.writestr("sub/b.xlsx", b"second")
+    scratch = tmp_path / "scratch"
+    scratch.mkdir()
+    sources: dict = {}
+
+    inputs = iter_inputs([str(tmp_path / "upload.zip")], str(scratch), sources)
+    assert list(scratch.iterdir()) == []
+    name, path = next(inputs)
+    assert name == "a.xlsx" and open(path, "rb").read() == b"first"
+    assert len(list(scratch.iterdir())) == 1
+    name, path = next(inputs)
+    assert name == "b.xlsx" and str(sources[1][0]) == "upload/sub"
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from excel_translator.batching import iter_chunks, translate_texts
+from excel_translator.segmentation import Segmenter
+
+
+class _FakeRouter:
+    def __init__(self, fail_on: str | None = None):
+        self.calls: list[list[str]] = []
+        self.fail_on = fail_on
+
+    def translate_batch_with_engine(self, texts, source_lang, target_lang):
+        self.calls.append(list(texts))
+        if self.fail_on in texts:
+            raise RuntimeError("engine down")
+        return [f"T[{text}]" for text in texts], "fake"
+
+
+def test_iter_chunks_caps_elements_and_characters():
+    texts = ["aaaa", "bbbb", "cccc", "dddd", "e" * 20, "f"]
+
+    assert list(iter_chunks(texts, max_items=3, max_chars=100)) == [[0, 1, 2], [3, 4, 5]]
+    assert list(iter_chunks(texts, max_items=10, max_chars=10)) == [[0, 1], [2, 3], [4], [5]]
+
+
+def test_translate_texts_batches_and_isolates_failed_chunks():
+    router = _FakeRouter(fail_on="bad")
+
+    outcomes = translate_texts(router, ["one", "two", "bad", "four"], "en", "fr", max_items=2)
+
+    assert router.calls == [["one", "two"], ["bad", "four"]]
+    assert [o.text for o in outcomes] == ["T[one]", "T[two]", "bad", "four"]
+    assert [o.engine for o in outcomes] == ["fake", "fake", "none", "none"]
+    assert outcomes[2].error == "engine down"
+
+
+def test_translate_texts_sends_each_unique_text_once_and_fans_out():
+    router = _FakeRouter()
+    memo: dict = {}
+    stats: dict = {}
+
+    outcomes = translate_texts(router, ["Total", "N/A", "Total", "Total"], "en", "fr", memo=memo, stats=stats)
+    again = translate_texts(router, ["N/A", "May"], "en", "fr", memo=memo, stats=stats)
+
+    assert router.calls == [["Total", "N/A"], ["May"]]
+    assert [o.text for o in outcomes] == ["T[Total]", "T[N/A]", "T[Total]", "T[Total]"]
+    assert [o.text for o in again] == ["T[N/A]", "T[May]"]
+    assert stats == {"dedup_hits": 3, "dedup_misses": 3, "engine_strings": 3, "engine_chars": 11}
+
+
+def test_translate_texts_segments_long_texts_and_caches_shared_paragraphs():
+    router = _FakeRouter()
+    stats: dict = {}
+    disclaimer = "Figures are unaudited and subject to change."
+    texts = [f"Q1 revenue grew.\n\n{disclaimer}", f"Q2 costs fell.\n{disclaimer}\n", "Short"]
+
+    outcomes = translate_texts(router, texts, "en", "fr", stats=stats, segmenter=Segmenter(min_chars=10, max_chars=100))
+
+    assert router.calls == [["Q1 revenue grew.", disclaimer, "Q2 costs fell.", "Short"]]
+    assert [o.text for o in outcomes] == [f"T[Q1 revenue grew.]\n\nT[{disclaimer}]", f"T[Q2 costs fell.]\nT[{disclaimer}]\n", "T[Short]"]
+    assert [o.engine for o in outcomes] == ["fake", "fake", "fake"]
+    assert stats["segmented_texts"] == 2 and stats["segments"] == 4
+
+
+def test_translate_texts_fails_a_segmented_text_when_any_segment_fails():
+    router = _FakeRouter(fail_on="bad")
+    text = "Fine sentence.\nbad"
+
+    outcomes = translate_texts(router, [text, "ok"], "en", "fr", max_items=1, segmenter=Segmenter(min_chars=5, max_chars=100))
+
+    assert outcomes[0].text == text and outcomes[0].error == "engine down"
+    assert outcomes[1].text == "T[ok]"
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from excel_translator.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from excel_translator.translators import RoutedTranslator
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_probes_and_closes():
+    clock = _Clock()
+    breaker = CircuitBreaker("azure", failure_threshold=2, window_seconds=10, reset_timeout=5, clock=clock)
+
+    breaker.record_failure("boom")
+    clock.now = 20  # first failure falls out of the window
+    breaker.record_failure("boom")
+    assert breaker.state == CLOSED
+    breaker.record_failure("boom")
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    assert not breaker.available()
+
+    clock.now = 26
+    assert breaker.available() and breaker.state == OPEN  # asking does not start the probe
+    assert breaker.allow_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow_request()  # only one probe at a time
+    assert not breaker.available()
+    breaker.record_failure("still down")
+    assert breaker.state == OPEN
+
+    clock.now = 32
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert [(t.from_state, t.to_state) for t in breaker.transitions] == [
+        (CLOSED, OPEN),
+        (OPEN, HALF_OPEN),
+        (HALF_OPEN, OPEN),
+        (OPEN, HALF_OPEN),
+        (HALF_OPEN, CLOSED),
+    ]
+
+
+def test_breaker_keeps_a_bounded_transition_history():
+    clock = _Clock()
+    breaker = CircuitBreaker("azure", failure_threshold=1, reset_timeout=1, clock=clock, max_transitions=4)
+    for _ in range(10):  # a flapping endpoint: open, probe, close, over and over
+        breaker.record_failure("boom")
+        clock.now += 1
+        breaker.allow_request()
+        breaker.record_success()
+    before = breaker.transition_count
+    breaker.record_failure("boom")
+
+    assert len(breaker.transitions) == 4 and breaker.transition_count == 31
+    assert [(t.from_state, t.to_state) for t in breaker.transitions_since(before)] == [(CLOSED, OPEN)]
+    assert len(breaker.transitions_since(0)) == 4
+
+
+def test_router_skips_azure_while_circuit_is_open(monkeypatch):
+    monkeypatch.setenv("AZURE_TRANSLATOR_ENDPOINT", "https://example.invalid")
+    monkeypatch.setenv("AZURE_TRANSLATOR_KEY", "key")
+    monkeypatch.setenv("AZURE_TRANSLATOR_REGION", "region")
+    monkeypatch.setenv("AZURE_BREAKER_FAILURES", "2")
+    router = RoutedTranslator("azure")
+    calls = []
+
+    def failing_azure(texts, source_lang, target_lang):
+        calls.append(texts)
+        raise RuntimeError("Azure down")
+
+    monkeypatch.setattr(router.azure, "translate_batch", failing_azure)
+    monkeypatch.setattr(router.local, "translate_batch", lambda texts, s, t: [f"L[{x}]" for x in texts])
+
+    for _ in range(4):
+        assert router.translate_batch_with_engine(["a"], "en", "fr") == (["L[a]"], "ollama_gemma")
+
+    assert len(calls) == 2
+    assert router.azure_breaker.state == OPEN
+    assert router.engine_stats() == {"circuit_skips": 2, "fallbacks": 4}
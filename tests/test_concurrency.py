@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import random
+import time
+
+import requests
+
+from excel_translator import translators
+from excel_translator.batching import translate_texts
+from excel_translator.concurrency import TokenBucket, map_ordered, retry_after_seconds
+from excel_translator.translators import AzureTranslator
+
+
+def test_map_ordered_keeps_input_order_under_concurrency():
+    def _slow_square(value: int) -> int:
+        time.sleep(random.uniform(0, 0.01))
+        return value * value
+
+    assert map_ordered(_slow_square, list(range(20)), max_workers=8) == [v * v for v in range(20)]
+
+
+def test_token_bucket_blocks_until_refilled_and_honours_pause():
+    bucket = TokenBucket(rate_per_minute=6000)  # 100 tokens per second
+    bucket.acquire(6000)
+
+    start = time.monotonic()
+    bucket.acquire(10)
+    assert time.monotonic() - start >= 0.08
+
+    bucket.pause(0.1)
+    start = time.monotonic()
+    bucket.acquire(1)
+    assert time.monotonic() - start >= 0.09
+
+
+def test_retry_after_parses_seconds_and_falls_back():
+    assert retry_after_seconds("7", default=1.0) == 7.0
+    assert retry_after_seconds(None, default=1.5) == 1.5
+    assert retry_after_seconds("not-a-date", default=2.0) == 2.0
+
+
+class _Response:
+    def __init__(self, status_code: int, payload=None, headers=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._payload
+
+
+def test_azure_waits_for_retry_after_on_429(monkeypatch):
+    responses = [
+        _Response(429, headers={"Retry-After": "4"}),
+        _Response(200, payload=[{"translations": [{"text": "Bonjour"}]}]),
+    ]
+    sleeps: list[float] = []
+    monkeypatch.setattr(requests.Session, "post", lambda self, *args, **kwargs: responses.pop(0))
+    monkeypatch.setattr(translators.time, "sleep", sleeps.append)
+
+    azure = AzureTranslator(endpoint="https://example.invalid", key="k", region="r")
+
+    assert azure.translate_batch(["Hello"], "en", "fr") == ["Bonjour"]
+    assert sleeps == [4.0]
+
+
+def test_concurrent_chunks_are_merged_in_order():
+    class _SlowRouter:
+        max_in_flight = 4
+
+        def translate_batch_with_engine(self, texts, source_lang, target_lang):
+            time.sleep(random.uniform(0, 0.01))
+            return [f"T[{text}]" for text in texts], "fake"
+
+    texts = [f"row {idx}" for idx in range(50)]
+    outcomes = translate_texts(_SlowRouter(), texts, "en", "fr", max_items=3)
+
+    assert [o.text for o in outcomes] == [f"T[{text}]" for text in texts]
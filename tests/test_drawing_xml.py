@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import xml.etree.ElementTree as ET
 
-from excel_translator.drawing_xml import _translate_in_xml
+from excel_translator.drawing_xml import apply_xml_translations, extract_xml_texts
 
 
-def test_translate_in_xml_only_updates_a_t_nodes():
+def test_xml_translation_only_updates_a_t_nodes():
     xml = b"""<?xml version=\"1.0\" encoding=\"UTF-8\"?>
 <c:chartSpace xmlns:c=\"http://schemas.openxmlformats.org/drawingml/2006/chart\" xmlns:a=\"http://schemas.openxmlformats.org/drawingml/2006/main\">
   <c:chart>
@@ -36,7 +36,8 @@ def test_translate_in_xml_only_updates_a_t_nodes():
 </c:chartSpace>
 """
 
-    translated_xml, logs = _translate_in_xml(xml, lambda text, _id: (f"T[{text}]", "fake"), "xl/charts/chart1.xml")
+    texts = extract_xml_texts(xml)
+    translated_xml = apply_xml_translations(xml, {idx: f"T[{text}]" for idx, text in texts}, "xl/charts/chart1.xml")
     root = ET.fromstring(translated_xml)
 
     translated_text_nodes = [node.text for node in root.iter("{http://schemas.openxmlformats.org/drawingml/2006/main}t")]
@@ -44,10 +45,10 @@ def test_translate_in_xml_only_updates_a_t_nodes():
 
     assert translated_text_nodes == ["T[Chart Title]", "T[Axis Label]"]
     assert chart_value_nodes == ["100"]
-    assert len(logs) == 2
+    assert texts == [(0, "Chart Title"), (1, "Axis Label")]
 
 
-def test_translate_in_xml_skips_empty_or_whitespace_a_t_nodes():
+def test_xml_translation_skips_empty_or_whitespace_a_t_nodes():
     xml = b"""<?xml version=\"1.0\" encoding=\"UTF-8\"?>
 <xdr:wsDr xmlns:xdr=\"http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing\" xmlns:a=\"http://schemas.openxmlformats.org/drawingml/2006/main\">
   <xdr:twoCellAnchor>
@@ -61,10 +62,11 @@ def test_translate_in_xml_skips_empty_or_whitespace_a_t_nodes():
 </xdr:wsDr>
 """
 
-    translated_xml, logs = _translate_in_xml(xml, lambda text, _id: (f"T[{text}]", "fake"), "xl/drawings/drawing1.xml")
+    texts = extract_xml_texts(xml)
+    translated_xml = apply_xml_translations(xml, {idx: f"T[{text}]" for idx, text in texts}, "xl/drawings/drawing1.xml")
     root = ET.fromstring(translated_xml)
     text_nodes = [node.text for node in root.iter("{http://schemas.openxmlformats.org/drawingml/2006/main}t")]
 
     assert text_nodes == ["  ", "T[Flow Step]"]
-    assert len(logs) == 1
+    assert texts == [(1, "Flow Step")]
 
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+import pytest
+
+from excel_translator.circuit_breaker import CLOSED, OPEN, CircuitBreaker
+from excel_translator.engines import ENGINE_TYPES, WEIGHTED, EnginePool, PoolMember, build_pools
+from excel_translator.translators import RoutedTranslator
+
+
+class _FakeEngine:
+    engine_name = "fake"
+
+    def __init__(self, label: str, fail: bool = False, gate: threading.Event | None = None):
+        self.label = label
+        self.fail = fail
+        self.gate = gate
+        self.calls = 0
+        self.pings = 0
+
+    def translate_batch(self, texts, source_lang, target_lang):
+        self.calls += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError(f"{self.label} down")
+        return [f"{self.label}[{text}]" for text in texts]
+
+    def ping(self):
+        self.pings += 1
+        if self.fail:
+            raise RuntimeError(f"{self.label} down")
+
+
+def _breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(name, failure_threshold=1, reset_timeout=3600)
+
+
+def test_least_in_flight_spreads_concurrent_batches():
+    gate = threading.Event()
+    engines = [_FakeEngine("a", gate=gate), _FakeEngine("b", gate=gate), _FakeEngine("c", gate=gate)]
+    pool = EnginePool([PoolMember(engine.label, engine) for engine in engines])
+
+    threads = [threading.Thread(target=pool.translate_batch, args=(["x"], "en", "fr")) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while sum(member.in_flight for member in pool.members) < 3:
+        time.sleep(0.001)
+    assert [member.in_flight for member in pool.members] == [1, 1, 1]
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert pool.engine_stats() == {"instance_a_batches": 1, "instance_b_batches": 1, "instance_c_batches": 1}
+
+
+def test_weighted_round_robin_follows_weights():
+    engines = [_FakeEngine("a"), _FakeEngine("b")]
+    pool = EnginePool([PoolMember("a", engines[0], weight=2), PoolMember("b", engines[1], weight=1)], balance=WEIGHTED)
+
+    answers = [pool.translate_batch(["x"], "en", "fr")[0] for _ in range(6)]
+
+    assert answers == ["a[x]", "b[x]", "a[x]", "a[x]", "b[x]", "a[x]"]
+
+
+def test_failover_skips_open_instances_until_a_health_check_passes():
+    now = [0.0]
+    down, up = _FakeEngine("down", fail=True), _FakeEngine("up")
+    pool = EnginePool(
+        [PoolMember("down", down, breaker=_breaker("down")), PoolMember("up", up, breaker=_breaker("up"))],
+        health_interval=10,
+        clock=lambda: now[0],
+    )
+
+    assert [pool.translate_batch(["x"], "en", "fr") for _ in range(3)] == [["up[x]"]] * 3
+    assert down.calls == 1
+    assert pool.members[0].breaker.state == OPEN
+    assert pool.engine_stats()["instance_failures"] == 1
+
+    down.fail = False
+    now[0] = 11.0
+    pool.translate_batch(["x"], "en", "fr")
+    assert down.pings == 1
+    assert pool.members[0].breaker.state == CLOSED
+
+
+def test_pool_raises_when_every_instance_fails():
+    pool = EnginePool([PoolMember("a", _FakeEngine("a", fail=True)), PoolMember("b", _FakeEngine("b", fail=True))])
+
+    with pytest.raises(RuntimeError, match="All fake instances failed"):
+        pool.translate_batch(["x"], "en", "fr")
+
+
+def test_engine_configuration_builds_pools_from_the_environment(monkeypatch):
+    monkeypatch.setitem(ENGINE_TYPES, "fake", lambda options, pool_size: _FakeEngine(**options))
+    config = {
+        "balance": "weighted",
+        "local": [{"name": "gpu1", "type": "fake", "label": "g1", "weight": 3}, {"name": "gpu2", "type": "fake", "label": "g2"}],
+    }
+    monkeypatch.setenv("EXCEL_TRANSLATOR_ENGINES", json.dumps(config))
+
+    router = RoutedTranslator("local")
+
+    assert [member.name for member in router.local.members] == ["gpu1", "gpu2"]
+    assert [breaker.name for breaker in router.breakers()] == ["azure", "local:gpu1", "local:gpu2"]
+    assert len(router.azure.members) == 1 and not router.azure.configured
+    assert router.translate_batch_with_engine(["x"], "en", "fr") == (["g1[x]"], "fake")
+
+    with pytest.raises(ValueError, match="Invalid options"):
+        build_pools(10, config={"local": [{"type": "fake", "colour": "red"}]})
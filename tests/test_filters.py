@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pytest
+
+from excel_translator.filters import SkipRules
+
+
+@pytest.mark.parametrize(
+    "text, category",
+    [
+        ("1,234.50", "number"),
+        ("(12 500) €", "number"),
+        ("-4.5%", "number"),
+        ("2024-03-31", "date"),
+        ("31.03.2024", "date"),
+        ("31/03/2024 17:45", "date"),
+        ("ap@example.com", "email"),
+        ("https://example.com/report?id=3", "url"),
+        ("SKU-10442", "code"),
+        ("INV/2024/001", "code"),
+        ("--", "punctuation"),
+        ("Net revenue", None),
+        ("Q1 forecast", None),
+        ("USA", None),
+    ],
+)
+def test_default_rules_classify_passthrough_strings(text, category):
+    assert SkipRules().classify(text, "fr") == category
+
+
+def test_parse_selects_categories_and_custom_patterns():
+    rules = SkipRules.parse("number,url", patterns=(r"ACC-\w+",))
+
+    assert rules.classify("42", "fr") == "number"
+    assert rules.classify("SKU-10442", "fr") is None
+    assert rules.classify("ACC-x9", "fr") == "custom"
+    assert SkipRules.parse("none").classify("42", "fr") is None
+    with pytest.raises(ValueError):
+        SkipRules.parse("numbers")
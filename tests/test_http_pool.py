@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from excel_translator.http_pool import PooledSession
+from excel_translator.translators import OllamaGemmaTranslator
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"response": payload["prompt"].rsplit("\n", 1)[-1].upper()}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_engine_session_reuses_one_keep_alive_connection():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        engine = OllamaGemmaTranslator(endpoint=f"http://127.0.0.1:{server.server_port}/api/generate", session=PooledSession(pool_size=2))
+
+        assert engine.translate_batch(["one", "two", "three"], "en", "fr") == ["ONE", "TWO", "THREE"]
+        assert engine.session.stats() == {"connections_opened": 1, "connections_reused": 2, "requests": 3}
+
+        engine.session.close()
+        assert engine.session.stats()["requests"] == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_session_stats_survive_pool_eviction():
+    servers = [ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler) for _ in range(2)]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    session = PooledSession(pool_size=1)  # room for a single host's pool
+    try:
+        first, second = (f"http://127.0.0.1:{server.server_port}/api/generate" for server in servers)
+        for url in (first, first, second):
+            session.post(url, json={"prompt": "x"}).raise_for_status()
+        # Talking to the second host evicted the first host's pool and its counters.
+        assert session.stats() == {"connections_opened": 2, "connections_reused": 1, "requests": 3}
+        session.post(first, json={"prompt": "x"}).raise_for_status()
+        assert session.stats() == {"connections_opened": 3, "connections_reused": 1, "requests": 4}
+    finally:
+        session.close()
+        for server in servers:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import io
+
+from openpyxl import Workbook, load_workbook
+
+from excel_translator.incremental import TranslationManifest, manifest_from_workbooks
+from excel_translator.processor import process_excel_file
+
+
+def _workbook(values: list[str]) -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for row, value in enumerate(values, start=1):
+        ws.cell(row=row, column=1, value=value)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _recording_translator(monkeypatch):
+    from excel_translator import processor
+
+    sent: list[str] = []
+
+    def _fake_translate(self, texts, source, target):
+        sent.extend(texts)
+        return [f"T[{text}]" for text in texts], "azure"
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+    return sent
+
+
+def test_only_changed_strings_are_sent_on_incremental_run(monkeypatch, tmp_path):
+    sent = _recording_translator(monkeypatch)
+    first = process_excel_file("book.xlsx", _workbook(["Alpha", "Beta", "Gamma"]), "en", "fr", "azure", record_manifest=True)
+    manifest_path = str(tmp_path / "book.manifest.json")
+    first.manifest.save(manifest_path)
+
+    sent.clear()
+    second = process_excel_file(
+        "book.xlsx", _workbook(["Alpha", "Beta v2", "Gamma"]), "en", "fr", "azure", previous=TranslationManifest.load(manifest_path)
+    )
+
+    assert sent == ["Beta v2", "book"]
+    ws = load_workbook(io.BytesIO(second.output_bytes)).active
+    assert [ws[f"A{row}"].value for row in (1, 2, 3)] == ["T[Alpha]", "T[Beta v2]", "T[Gamma]"]
+    engines = {log.original_text: log.engine for log in second.logs}
+    assert engines["Alpha"] == "incremental:azure" and engines["Beta v2"] == "azure"
+    assert second.stats["strings_reused"] == 3  # two cells plus the sheet title
+    assert second.stats["strings_changed"] == 1
+    assert second.manifest is not None
+
+
+def test_manifest_can_be_rebuilt_from_previous_source_and_output(monkeypatch):
+    sent = _recording_translator(monkeypatch)
+    source = _workbook(["Alpha", "Beta"])
+    translated = process_excel_file("book.xlsx", source, "en", "fr", "azure").output_bytes
+
+    manifest = manifest_from_workbooks(source, translated, "en", "fr")
+
+    sent.clear()
+    process_excel_file("book.xlsx", _workbook(["Alpha", "Beta", "Delta"]), "en", "fr", "azure", previous=manifest)
+    assert sent == ["Delta", "book"]
+
+
+def test_rebuilt_manifest_leaves_untranslated_strings_to_be_retried(monkeypatch):
+    sent = _recording_translator(monkeypatch)
+    source = _workbook(["Alpha", "Beta"])
+    # The earlier run failed on "Beta" (and the sheet title) and kept the source text.
+    previous_output = _workbook(["T[Alpha]", "Beta"])
+
+    manifest = manifest_from_workbooks(source, previous_output, "en", "fr")
+
+    process_excel_file("book.xlsx", source, "en", "fr", "azure", previous=manifest)
+    assert sent == ["Data", "Beta", "book"]
+
+
+def test_every_sheet_title_is_reused_from_the_manifest(monkeypatch):
+    sent = _recording_translator(monkeypatch)
+    wb = Workbook()
+    wb.active.title = "Data"
+    wb.create_sheet("Sales")
+    wb.create_sheet("Costs")
+    buf = io.BytesIO()
+    wb.save(buf)
+    source = buf.getvalue()
+    first = process_excel_file("book.xlsx", source, "en", "fr", "azure", record_manifest=True)
+
+    sent.clear()
+    second = process_excel_file("book.xlsx", source, "en", "fr", "azure", previous=first.manifest)
+
+    assert sent == ["book"]
+    assert second.stats["strings_reused"] == 3
+    assert second.stats["strings_changed"] == 0
+
+
+def test_skip_filtered_strings_do_not_count_as_changed(monkeypatch):
+    _recording_translator(monkeypatch)
+    source = _workbook(["Alpha", "12345"])
+    first = process_excel_file("book.xlsx", source, "en", "fr", "azure", record_manifest=True)
+
+    second = process_excel_file("book.xlsx", source, "en", "fr", "azure", previous=first.manifest)
+
+    assert second.stats["skipped_number"] == 1
+    assert second.stats["strings_reused"] == 2  # the cell and the sheet title
+    assert second.stats["strings_changed"] == 0
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+
+from excel_translator.job_queue import CANCELLED, JobQueue
+from excel_translator.jobs import COMPLETED, PAUSED
+
+
+class _FakeRunner:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeStore:
+    """Stands in for JobStore: each job needs ``slices[job_id]`` runs to finish."""
+
+    def __init__(self, engines: dict, slices: dict):
+        self.engines = engines
+        self.left = dict(slices)
+        self.order: list[str] = []
+        self.gate = threading.Event()
+        self.lock = threading.Lock()
+        self.active: dict[str, int] = {}
+        self.peak: dict[str, int] = {}
+        self.runners: dict[str, list] = {}
+
+    def runner(self, job_id, max_workers=1, memory_path=None):
+        return _FakeRunner()
+
+    def status(self, job_id):
+        return SimpleNamespace(engine=self.engines[job_id], completed=0, total=self.left[job_id])
+
+    def run(self, job_id, progress=None, runner=None, **kwargs):
+        self.gate.wait(5)
+        engine = self.engines[job_id]
+        with self.lock:
+            self.order.append(job_id)
+            self.runners.setdefault(job_id, []).append(runner)
+            self.active[engine] = self.active.get(engine, 0) + 1
+            self.peak[engine] = max(self.peak.get(engine, 0), self.active[engine])
+        time.sleep(0.01)
+        with self.lock:
+            self.active[engine] -= 1
+            self.left[job_id] -= 1
+            state = PAUSED if self.left[job_id] else COMPLETED
+        if progress is not None:
+            progress(1, 1, job_id)
+        return SimpleNamespace(state=state)
+
+
+def _wait_idle(queue: JobQueue) -> None:
+    deadline = time.time() + 5
+    while any(not job.finished for job in queue.jobs()) and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_owners_are_served_round_robin_between_slices():
+    store = _FakeStore({"a1": "azure", "a2": "azure", "b1": "azure"}, {"a1": 3, "a2": 1, "b1": 2})
+    queue = JobQueue(store, workers=1, slice_files=1)
+    with queue._cond:  # submit all three before the worker picks anything
+        queue.submit("a1", owner="alice")
+        queue.submit("a2", owner="alice")
+        queue.submit("b1", owner="bob")
+    store.gate.set()
+    _wait_idle(queue)
+    queue.shutdown()
+
+    # Alice's unfinished a1 goes behind a2, and bob gets every other slice.
+    assert store.order == ["a1", "b1", "a2", "b1", "a1", "a1"]
+    assert {job.job_id: job.state for job in queue.jobs()} == {"a1": COMPLETED, "a2": COMPLETED, "b1": COMPLETED}
+    # Every slice of a job ran on the same runner, closed once the job was done.
+    for job_id, runners in store.runners.items():
+        assert len({id(runner) for runner in runners}) == 1 and runners[0].closed
+    assert queue._runners == {}
+
+
+def test_engine_limits_cap_concurrent_jobs_and_cancel_drops_queued_work():
+    engines = {"l1": "local", "l2": "local", "z1": "azure", "z2": "azure"}
+    store = _FakeStore(engines, {job_id: 2 for job_id in engines})
+    queue = JobQueue(store, workers=3, engine_limits={"local": 1, "azure": 2}, slice_files=1)
+    for job_id in engines:
+        queue.submit(job_id, owner=job_id)
+    store.gate.set()
+    _wait_idle(queue)
+    queue.shutdown()
+
+    assert store.peak == {"local": 1, "azure": 2}
+    assert queue.get("l1").done == 1
+
+    store = _FakeStore({"x": "local", "y": "local"}, {"x": 1, "y": 1})
+    queue = JobQueue(store, workers=1, slice_files=1)
+    queue.submit("x", owner="u")
+    queue.submit("y", owner="u")
+    assert queue.cancel("y")
+    store.gate.set()
+    _wait_idle(queue)
+    queue.shutdown()
+    assert store.order == ["x"] and queue.get("y").state == CANCELLED
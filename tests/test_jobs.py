@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import io
+import json
+import time
+import zipfile
+
+import pytest
+from openpyxl import Workbook
+
+from excel_translator import batch, processor
+from excel_translator.cli import main
+from excel_translator.jobs import COMPLETED, FAILED, PAUSED, RUNNING, JobStore
+
+
+class _Crash(BaseException):
+    """Stands in for the process dying mid-batch."""
+
+
+def _workbook(*values: str) -> bytes:
+    wb = Workbook()
+    ws = wb.active
+    for row, value in enumerate(values, start=1):
+        ws.cell(row=row, column=1, value=value)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def test_job_resumes_from_checkpoints_and_reuses_translations(monkeypatch, tmp_path):
+    calls: list[list[str]] = []
+    broken = {"Cost"}
+
+    def _fake_translate(self, texts, source, target):
+        if broken & set(texts):
+            raise _Crash()
+        calls.append(list(texts))
+        return [f"T[{text}]" for text in texts], "ollama_gemma"
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+    monkeypatch.setenv("AZURE_TRANSLATOR_KEY", "")
+    with zipfile.ZipFile(tmp_path / "upload.zip", "w") as zf:
+        zf.writestr("q1.xlsx", _workbook("Revenue"))
+        zf.writestr("q2.xlsx", _workbook("Revenue", "Cost"))
+
+    store = JobStore(str(tmp_path / "jobs"))
+    job_id = store.create([str(tmp_path / "upload.zip")], "en", "fr", "local", job_id="nightly")
+    progress: list[tuple[int, int]] = []
+
+    with pytest.raises(_Crash):
+        store.run(job_id, progress=lambda done, total, name: progress.append((done, total)))
+    first = store.status(job_id)
+    assert first.state == RUNNING and first.completed == 1 and first.pending == 1
+
+    broken.clear()
+    calls.clear()
+    second = store.run(job_id, progress=lambda done, total, name: progress.append((done, total)))
+    assert second.state == COMPLETED and second.completed == 2 and second.failed == {}
+    # q1 was not re-processed; "Sheet" and "Revenue" came from the job's translation memory.
+    assert calls == [["Cost"], ["q2"]]
+    assert progress == [(1, 2), (2, 2)]
+
+    assert store.export(job_id, str(tmp_path / "out.zip")) == ["upload/T[q1]_fr.xlsx", "upload/T[q2]_fr.xlsx"]
+    with zipfile.ZipFile(tmp_path / "out.zip") as zf:
+        logs = [json.loads(line) for line in zf.read("translation_logs.jsonl").decode("utf-8").splitlines()]
+    assert [row["original_text"] for row in logs if row["object_id"].startswith("cell:")] == ["Revenue", "Revenue", "Cost"]
+    assert len(store.logs(job_id)) == len(logs)
+    assert store.checkpoints(job_id)[1].to_result().stats["cache_hits"] == 2
+
+
+def test_cli_runs_resumable_job_and_reports_status(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", lambda self, texts, s, t: ([f"T[{x}]" for x in texts], "fake"))
+    (tmp_path / "q1.xlsx").write_bytes(_workbook("Revenue"))
+    job_dir = str(tmp_path / "jobs")
+
+    args = ["--job", "j1", "--job-dir", job_dir, "-o", str(tmp_path / "out"), "--jobs", "1", "--quiet"]
+    assert main([str(tmp_path / "q1.xlsx"), "--target", "fr", *args]) == 0
+    assert (tmp_path / "out" / "T[q1]_fr.xlsx").exists()
+    capsys.readouterr()
+
+    # Re-running without inputs resumes the stored job; nothing is left to do.
+    assert main(args) == 0
+    assert json.loads(capsys.readouterr().out)["completed"] == 1
+
+    assert main(["--status", "j1", "--job-dir", job_dir]) == 0
+    status = json.loads(capsys.readouterr().out)
+    assert status["state"] == COMPLETED and status["total"] == 1 and status["pending"] == 0
+
+
+def test_cli_job_honours_manifest_dir(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", lambda self, texts, s, t: ([f"T[{x}]" for x in texts], "fake"))
+    (tmp_path / "in" / "sub").mkdir(parents=True)
+    (tmp_path / "in" / "sub" / "q1.xlsx").write_bytes(_workbook("Revenue"))
+    manifests = tmp_path / "manifests"
+
+    args = ["--target", "fr", "--job-dir", str(tmp_path / "jobs"), "--manifest-dir", str(manifests), "--jobs", "1", "--quiet"]
+    assert main([str(tmp_path / "in"), "--job", "j1", "-o", str(tmp_path / "out1"), *args]) == 0
+    assert (manifests / "sub" / "q1.xlsx.manifest.json").exists()
+    capsys.readouterr()
+
+    assert main([str(tmp_path / "in"), "--job", "j2", "-o", str(tmp_path / "out2"), *args]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["completed"] == 1
+    checkpoint = JobStore(str(tmp_path / "jobs")).checkpoints("j2")[0]
+    assert checkpoint.stats["strings_reused"] == 2 and checkpoint.stats["strings_changed"] == 0
+
+
+def test_resubmitted_job_retries_every_earlier_failure_across_slices(monkeypatch, tmp_path):
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", lambda self, texts, s, t: ([f"T[{x}]" for x in texts], "fake"))
+    real_process = batch.process_excel_file
+    broken = [True]
+
+    def _process(*args, **kwargs):
+        if broken[0]:
+            raise RuntimeError("engine down")
+        return real_process(*args, **kwargs)
+
+    monkeypatch.setattr(batch, "process_excel_file", _process)
+    for i in range(8):
+        (tmp_path / f"in{i}.xlsx").write_bytes(_workbook("Revenue"))
+    store = JobStore(str(tmp_path / "jobs"))
+    job_id = store.create([str(tmp_path / f"in{i}.xlsx") for i in range(8)], "en", "fr", "local")
+
+    def _submit() -> str:
+        submitted = time.time()
+        while (state := store.run(job_id, max_files=5, skip_failed_since=submitted).state) == PAUSED:
+            pass
+        return state
+
+    assert _submit() == FAILED
+    assert len(store.status(job_id).failed) == 8
+
+    broken[0] = False
+    assert _submit() == COMPLETED
+    assert store.status(job_id).completed == 8
+
+
+def test_slices_sharing_a_runner_keep_the_same_engines(monkeypatch, tmp_path):
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", lambda self, texts, s, t: ([f"T[{x}]" for x in texts], "fake"))
+    for i in range(3):
+        (tmp_path / f"in{i}.xlsx").write_bytes(_workbook(f"Row {i}"))
+    store = JobStore(str(tmp_path / "jobs"))
+    job_id = store.create([str(tmp_path / f"in{i}.xlsx") for i in range(3)], "en", "fr", "local")
+
+    routers = []
+    with store.runner(job_id) as runner:
+        while store.run(job_id, max_files=1, runner=runner).state == PAUSED:
+            routers.append(runner._state.translators["local"])
+
+    assert len(routers) == 2 and routers[0] is routers[1]
+    assert store.status(job_id).completed == 3
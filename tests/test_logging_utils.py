@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import io
+import json
+import pickle
+
+from excel_translator.logging_utils import TranslationLog, TranslationLogEntry, log_to_dict
+
+
+def test_columnar_log_round_trips_entries_and_interns_names():
+    entry = TranslationLogEntry("a.xlsx", "Sheet", "cell:A1", "Hello", "Bonjour", "azure", "ok", timestamp="2024-05-01T10:00:00.250000Z")
+    log = TranslationLog([entry])
+    log.add("a.xlsx", "Sheet", "cell:A2", "Bye", "Bye", "none", "error", error="boom", timestamp=0.0)
+
+    assert len(log) == 2
+    assert log[0] == entry
+    assert log[-1].error == "boom"
+    assert log[-1].timestamp == "1970-01-01T00:00:00Z"
+    assert [e.object_id for e in log] == ["cell:A1", "cell:A2"]
+    assert log.row(0) == log_to_dict(entry)
+    # File and sheet names are stored once however many rows use them.
+    assert log._names == ["a.xlsx", "Sheet", "azure", "ok", "none", "error"]
+
+
+def test_extend_page_jsonl_and_pickle():
+    first, second = TranslationLog(), TranslationLog()
+    first.add("a.xlsx", "S1", "cell:A1", "x", "X", "azure", "ok")
+    second.add("b.xlsx", "S2", "cell:B1", "y", "y", "none", "error", error="down")
+    second.add("b.xlsx", "S2", "cell:B2", "z", "Z", "azure", "ok")
+    first.extend(pickle.loads(pickle.dumps(second)))
+
+    assert [row["file_name"] for row in first.page(1, 5)] == ["b.xlsx", "b.xlsx"]
+    assert first[1].error == "down" and first[2].error is None
+
+    out = io.StringIO()
+    first.write_jsonl(out)
+    rows = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [row["translated_text"] for row in rows] == ["X", "y", "Z"]
+
+
+def test_route_column_is_sparse_and_survives_jsonl():
+    log = TranslationLog()
+    log.add("a.xlsx", "S1", "cell:A1", "x", "X", "azure", "ok", route="azure:long_text")
+    log.add("a.xlsx", "S1", "cell:A2", "y", "Y", "azure", "ok")
+
+    out = io.StringIO()
+    log.write_jsonl(out)
+    loaded = TranslationLog.read_jsonl(io.StringIO(out.getvalue()))
+
+    assert [entry.route for entry in loaded] == ["azure:long_text", None]
+    assert loaded.row(0)["route"] == "azure:long_text"
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from excel_translator.metrics import StageTimer, otel_json, prometheus_text
+
+
+def test_stage_timer_accumulates_time_calls_and_peak_rss():
+    timer = StageTimer()
+    for _ in range(2):
+        with timer.stage("collect"):
+            sum(range(1000))
+    with timer.stage("write"):
+        pass
+
+    stages = timer.as_dict()
+    assert list(stages) == ["collect", "write"]
+    assert stages["collect"]["calls"] == 2
+    assert stages["collect"]["seconds"] >= 0
+    assert stages["write"]["peak_rss_bytes"] > 0
+
+
+def test_peak_rss_is_only_reset_when_a_benchmark_asks(monkeypatch):
+    from excel_translator import metrics
+
+    resets: list[None] = []
+    monkeypatch.setattr(metrics, "_reset_peak_rss", lambda: resets.append(None))
+    monkeypatch.setattr(metrics, "_stage_peaks", False)
+    timer = StageTimer()
+    with timer.stage("collect"):
+        pass
+    assert resets == []
+
+    metrics.measure_stage_peaks()
+    with timer.stage("collect"):
+        pass
+    assert len(resets) == 1
+
+
+def _result():
+    from excel_translator.processor import ProcessingResult
+
+    timer = StageTimer()
+    with timer.stage("translate"):
+        with timer.span("engine_call", parent="translate", strings=2) as span:
+            span.attributes["engine"] = "azure"
+    return ProcessingResult("out.xlsx", b"", [], stats={"dedup_hits": 3}, stages=timer.as_dict(), spans=timer.spans)
+
+
+def test_prometheus_text_exposes_stages_engine_calls_and_counters():
+    text = prometheus_text([_result()])
+
+    assert "# TYPE excel_translator_stage_seconds gauge" in text
+    assert 'excel_translator_engine_call_seconds_count{file="out.xlsx",engine="azure"} 1' in text
+    assert 'excel_translator_dedup_hits_total{file="out.xlsx"} 3' in text
+
+
+def test_otel_json_nests_engine_calls_under_their_stage():
+    spans = otel_json([_result()])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+
+    assert by_name["translate"]["parentSpanId"] == by_name["process_excel_file"]["spanId"]
+    assert by_name["engine_call"]["parentSpanId"] == by_name["translate"]["spanId"]
+    assert {"key": "strings", "value": {"intValue": "2"}} in by_name["engine_call"]["attributes"]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import json
+
+from excel_translator.translators import OllamaGemmaTranslator
+
+
+def _items(prompt: str):
+    return json.loads(prompt.split("Input:\n", 1)[1])["items"]
+
+
+def test_batched_prompt_packs_strings_and_splits_misaligned_batches(monkeypatch):
+    engine = OllamaGemmaTranslator(batch_size=4)
+    prompts = []
+
+    def fake_generate(prompt, json_output=False):
+        prompts.append(prompt)
+        if not json_output:
+            return prompt.rsplit("\n", 1)[-1].upper()
+        items = _items(prompt)
+        if len(items) == 4:
+            items = items[:-1]  # the model dropped an item
+        return json.dumps({"translations": [{"id": item["id"], "text": item["text"].upper()} for item in items]})
+
+    monkeypatch.setattr(engine, "_generate", fake_generate)
+
+    texts = [f"cell {i}" for i in range(6)]
+    assert engine.translate_batch(texts, "en", "fr") == [t.upper() for t in texts]
+    # 4 + 2 packed; the misaligned 4 is retried as 2 + 2.
+    assert [len(_items(p)) for p in prompts] == [4, 2, 2, 2]
+
+
+def test_batches_are_sized_to_the_context_window():
+    engine = OllamaGemmaTranslator(batch_size=50, context_tokens=1000)
+    groups = engine._pack(["x" * 300] * 10)
+    assert all(sum(engine._estimated_tokens("x" * 300) for _ in group) <= 1000 - 256 for group in groups)
+    assert sum(len(group) for group in groups) == 10
+    assert len(groups) > 1
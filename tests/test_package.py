@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import io
+import random
+import zipfile
+
+import pytest
+
+from excel_translator import package
+from excel_translator.package import DeflatedMember, copy_member_raw, rewritten_info
+
+
+def _raw_bytes(archive: bytes, name: str) -> bytes:
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        info = zf.getinfo(name)
+        data_start = info.header_offset + 30 + len(info.filename.encode("utf-8")) + len(info.extra)
+        return archive[data_start : data_start + info.compress_size]
+
+
+def test_copy_member_raw_keeps_compressed_bytes_and_metadata():
+    src = io.BytesIO()
+    with zipfile.ZipFile(src, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(zipfile.ZipInfo("xl/media/image1.png", date_time=(2020, 5, 17, 10, 30, 0)), b"\x89PNG" + bytes(range(256)) * 50)
+        zf.writestr("xl/workbook.xml", b"<workbook/>")
+        zf.writestr("docProps/app.xml", b"<app/>", compress_type=zipfile.ZIP_STORED)
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(src.getvalue())) as zin, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            if info.filename == "xl/workbook.xml":
+                zout.writestr(rewritten_info(info), b"<workbook changed='1'/>")
+            else:
+                copy_member_raw(zin, zout, info)
+
+    with zipfile.ZipFile(io.BytesIO(out.getvalue())) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["xl/media/image1.png", "xl/workbook.xml", "docProps/app.xml"]
+        assert zf.getinfo("xl/media/image1.png").date_time == (2020, 5, 17, 10, 30, 0)
+        assert zf.getinfo("docProps/app.xml").compress_type == zipfile.ZIP_STORED
+        assert zf.read("xl/workbook.xml") == b"<workbook changed='1'/>"
+
+    assert _raw_bytes(out.getvalue(), "xl/media/image1.png") == _raw_bytes(src.getvalue(), "xl/media/image1.png")
+
+
+def test_deflated_member_is_compressed_off_thread_and_spills_to_disk():
+    info = zipfile.ZipInfo("xl/worksheets/sheet1.xml", date_time=(2021, 1, 2, 3, 4, 6))
+    payload = random.Random(3).randbytes(100_000)
+    member = DeflatedMember(info, spool_bytes=1024)
+    for start in range(0, len(payload), 4096):
+        member.write(payload[start : start + 4096])
+    member.finish()
+    assert member._data._rolled  # larger than the spool limit, so it went to a temp file
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w") as zout:
+        zout.writestr("first.txt", b"first")
+        member.write_to(zout)
+        zout.writestr("last.txt", b"last")
+
+    with zipfile.ZipFile(io.BytesIO(out.getvalue())) as zf:
+        assert zf.testzip() is None
+        assert zf.read("xl/worksheets/sheet1.xml") == payload
+        assert zf.getinfo("xl/worksheets/sheet1.xml").date_time == (2021, 1, 2, 3, 4, 6)
+        assert zf.read("last.txt") == b"last"
+
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_package_writes_stay_readable_without_zipfile_internals(monkeypatch, raw):
+    if not raw:
+
+        def _missing(*args):
+            raise AttributeError("'ZipFile' object has no attribute '_writing'")
+
+        monkeypatch.setattr(package, "_write_raw", _missing)
+    src = io.BytesIO()
+    with zipfile.ZipFile(src, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("xl/media/image1.png", b"\x89PNG" + bytes(range(256)) * 50)
+        zf.writestr("docProps/app.xml", b"<app/>", compress_type=zipfile.ZIP_STORED)
+
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(src.getvalue())) as zin, zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zout:
+        copy_member_raw(zin, zout, zin.getinfo("xl/media/image1.png"))
+        member = DeflatedMember(zipfile.ZipInfo("xl/workbook.xml"))
+        member.write(b"<workbook changed='1'/>")
+        member.finish().write_to(zout)
+        copy_member_raw(zin, zout, zin.getinfo("docProps/app.xml"))
+
+    with zipfile.ZipFile(io.BytesIO(out.getvalue())) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist() == ["xl/media/image1.png", "xl/workbook.xml", "docProps/app.xml"]
+        assert zf.read("xl/media/image1.png") == b"\x89PNG" + bytes(range(256)) * 50
+        assert zf.read("xl/workbook.xml") == b"<workbook changed='1'/>"
+        assert zf.getinfo("docProps/app.xml").compress_type == zipfile.ZIP_STORED
@@ -84,8 +84,8 @@ def test_translation_preserves_formula_and_formatting(monkeypatch):
 
     monkeypatch.setattr(
         processor.RoutedTranslator,
-        "translate_with_engine",
-        lambda self, text, source, target: (f"T[{text}]", "fake_engine"),
+        "translate_batch_with_engine",
+        lambda self, texts, source, target: ([f"T[{text}]" for text in texts], "fake_engine"),
     )
 
     result = process_excel_file(
@@ -116,7 +116,10 @@ def test_translation_preserves_formula_and_formatting(monkeypatch):
 
     assert len(wb.sheetnames) == 2
     assert result.output_filename == "T[input]_fr.xlsx"
-    assert any(log.object_id == "sheet_title" for log in result.logs)
+    assert any(log.object_id.startswith("sheet_title:") for log in result.logs)
+    assert list(result.stages) == ["unzip", "sheet_names", "worksheets", "comments", "drawings", "translate", "rezip", "filename"]
+    assert [span.attributes["engine"] for span in result.spans if span.name == "engine_call"] == ["fake_engine"]
+    assert result.stats["strings"] == len(result.logs)
 
     wb.close()
 
@@ -124,12 +127,12 @@ def test_translation_preserves_formula_and_formatting(monkeypatch):
 def test_translation_output_filename_falls_back_when_name_translation_fails(monkeypatch):
     from excel_translator import processor
 
-    def _fake_translate(self, text, source, target):
-        if text == "input":
+    def _fake_translate(self, texts, source, target):
+        if texts == ["input"]:
             raise RuntimeError("name translation failed")
-        return (f"T[{text}]", "fake_engine")
+        return ([f"T[{text}]" for text in texts], "fake_engine")
 
-    monkeypatch.setattr(processor.RoutedTranslator, "translate_with_engine", _fake_translate)
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
 
     result = process_excel_file(
         file_name="input.xlsx",
@@ -140,3 +143,136 @@ def test_translation_output_filename_falls_back_when_name_translation_fails(monk
     )
 
     assert result.output_filename == "input_fr.xlsx"
+
+
+def test_workbook_text_is_translated_in_a_single_batch(monkeypatch):
+    from excel_translator import processor
+
+    calls: list[list[str]] = []
+
+    def _fake_translate(self, texts, source, target):
+        calls.append(list(texts))
+        return ([f"T[{text}]" for text in texts], "fake_engine")
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+
+    result = process_excel_file(
+        file_name="input.xlsx",
+        file_bytes=_inject_custom_drawing(_sample_workbook_bytes()),
+        source_lang="en",
+        target_lang="fr",
+        selected_engine="azure",
+    )
+
+    # One batch for the workbook contents plus one for the output file name.
+    assert len(calls) == 2
+    assert calls[1] == ["input"]
+    assert len(calls[0]) == sum(1 for log in result.logs if log.status == "ok")
+    assert {log.sheet_name for log in result.logs if log.object_id.startswith("cell:")} == {"T_Sales_", "T_Ops_"}
+
+
+def _shared_strings_workbook_bytes() -> bytes:
+    main = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+    rel = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+    parts = {
+        "xl/workbook.xml": f'<workbook {main} {rel}><sheets><sheet name="Main" sheetId="1" r:id="rId1"/>'
+        f'<sheet name="Lookup" sheetId="2" state="hidden" r:id="rId2"/></sheets></workbook>',
+        "xl/_rels/workbook.xml.rels": '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="worksheet" Target="worksheets/sheet2.xml"/></Relationships>',
+        "xl/worksheets/sheet1.xml": f'<worksheet {main}><sheetData><row r="1"><c r="A1" t="s"><v>0</v></c>'
+        '<c r="B1" t="s"><v>2</v></c></row></sheetData></worksheet>',
+        "xl/worksheets/sheet2.xml": f'<worksheet {main}><sheetData><row r="1"><c r="A1" t="s"><v>3</v></c></row></sheetData></worksheet>',
+        "xl/sharedStrings.xml": f'<sst {main} count="4" uniqueCount="4"><si><t>Hello</t></si><si><t>Orphan</t></si>'
+        '<si><r><rPr><b/></rPr><t xml:space="preserve">Total </t></r><r><t>revenue</t></r><rPh sb="0" eb="1"><t>ph</t></rPh></si>'
+        "<si><t>Hidden only</t></si></sst>",
+    }
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in parts.items():
+            zf.writestr(name, xml)
+    return buf.getvalue()
+
+
+def test_shared_strings_skip_orphans_and_translate_rich_text_as_one_unit(monkeypatch):
+    from excel_translator import processor
+
+    calls: list[list[str]] = []
+
+    def _fake_translate(self, texts, source, target):
+        calls.append(list(texts))
+        return ([text.upper() for text in texts], "fake_engine")
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+
+    result = process_excel_file("book.xlsx", _shared_strings_workbook_bytes(), "en", "fr", "azure")
+
+    assert calls[0] == ["Main", "Lookup", "Hello", "Total ⟦1⟧revenue"]
+    assert result.stats["shared_strings_orphaned"] == 2
+
+    with zipfile.ZipFile(io.BytesIO(result.output_bytes)) as zf:
+        root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+    ns = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+    items = root.findall(f"{ns}si")
+    assert items[0].find(f"{ns}t").text == "HELLO"
+    assert items[1].find(f"{ns}t").text == "Orphan"
+    assert [t.text for r in items[2].findall(f"{ns}r") for t in r.findall(f"{ns}t")] == ["TOTAL ", "REVENUE"]
+    assert items[2].find(f"{ns}rPh/{ns}t").text == "ph"
+    assert items[3].find(f"{ns}t").text == "Hidden only"
+
+
+def test_skip_filters_pass_codes_and_numbers_through(monkeypatch):
+    from excel_translator import processor
+
+    calls: list[list[str]] = []
+
+    def _fake_translate(self, texts, source, target):
+        calls.append(list(texts))
+        return ([f"T[{text}]" for text in texts], "fake_engine")
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", _fake_translate)
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for ref, value in {"A1": "Revenue", "A2": "SKU-10442", "A3": "1,234.50", "A4": "ap@example.com"}.items():
+        ws[ref] = value
+    buf = io.BytesIO()
+    wb.save(buf)
+
+    result = process_excel_file("codes.xlsx", buf.getvalue(), "en", "fr", "azure")
+
+    assert calls[0] == ["Data", "Revenue"]
+    assert result.stats["skipped_code"] == 1
+    assert result.stats["skipped_number"] == 1
+    assert result.stats["skipped_email"] == 1
+    assert {log.engine for log in result.logs if log.original_text == "SKU-10442"} == {"skip:code"}
+    out = load_workbook(io.BytesIO(result.output_bytes))
+    assert [out.active[f"A{row}"].value for row in range(1, 5)] == ["T[Revenue]", "SKU-10442", "1,234.50", "ap@example.com"]
+
+
+def test_part_workers_do_not_change_output(monkeypatch):
+    from excel_translator import processor
+
+    monkeypatch.setattr(processor.RoutedTranslator, "translate_batch_with_engine", lambda self, texts, s, t: ([f"T[{x}]" for x in texts], "fake_engine"))
+    wb = Workbook()
+    for n in range(12):
+        ws = wb.active if n == 0 else wb.create_sheet()
+        ws.title = f"Sheet {n}"
+        for row in range(1, 30):
+            ws.cell(row=row, column=1, value=f"Row {row} of sheet {n}")
+        ws["B1"].comment = Comment(f"Note {n}", "qa")
+    buf = io.BytesIO()
+    wb.save(buf)
+    source = _inject_custom_drawing(buf.getvalue())
+
+    results = [
+        process_excel_file("input.xlsx", source, "en", "fr", "azure", part_workers=workers)
+        for workers in (1, 4)
+    ]
+
+    assert results[0].output_bytes == results[1].output_bytes
+    assert [log.__dict__ | {"timestamp": None} for log in results[0].logs] == [log.__dict__ | {"timestamp": None} for log in results[1].logs]
+    translated = load_workbook(io.BytesIO(results[1].output_bytes))
+    assert translated["T_Sheet 11_"]["A29"].value == "T[Row 29 of sheet 11]"
+    assert translated["T_Sheet 3_"]["B1"].comment.text == "T[Note 3]"
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from excel_translator.rich_text import join_runs, split_runs
+
+
+def test_markers_round_trip_run_boundaries():
+    runs = ["Total ", "revenue", " (net)"]
+    joined = join_runs(runs)
+
+    assert joined == "Total ⟦1⟧revenue⟦2⟧ (net)"
+    assert split_runs(joined.replace("Total", "Chiffre").replace("revenue", "d'affaires"), runs) == ["Chiffre ", "d'affaires", " (net)"]
+
+
+def test_lost_markers_fall_back_to_proportional_split_on_word_boundaries():
+    pieces = split_runs("Chiffre d'affaires total net", ["Total ", "revenue net"])
+
+    assert len(pieces) == 2
+    assert "".join(pieces) == "Chiffre d'affaires total net"
+    assert pieces[0].endswith(" ") or pieces[1].startswith(" ")
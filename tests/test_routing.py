@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from excel_translator.batching import translate_texts
+from excel_translator.circuit_breaker import CLOSED, OPEN
+from excel_translator.routing import AZURE, LOCAL, RouteDecision, RoutingPolicy
+from excel_translator.translators import RoutedTranslator
+
+
+def test_policy_routes_by_length_and_spends_the_azure_budget():
+    policy = RoutingPolicy(short_chars=5, long_chars=50, azure_char_budget=120)
+
+    assert policy.decide(["Total", "Q1"]) == RouteDecision(LOCAL, "short_text")
+    assert policy.decide(["x" * 60]) == RouteDecision(AZURE, "long_text")
+    assert policy.decide(["x" * 20]) == RouteDecision(AZURE, "default")
+    assert policy.azure_chars == 80
+    assert policy.decide(["x" * 60]) == RouteDecision(LOCAL, "azure_budget")
+    policy.refund(60)
+    assert policy.decide(["x" * 60]).engine == AZURE
+    assert policy.decide(["x" * 60], azure_available=False) == RouteDecision(LOCAL, "azure_unavailable")
+
+
+def test_policies_sharing_a_budget_file_draw_on_one_budget(tmp_path):
+    path = str(tmp_path / "budget.sqlite")
+    first = RoutingPolicy(long_chars=50, azure_char_budget=150, budget_path=path)
+    second = RoutingPolicy(long_chars=50, azure_char_budget=150, budget_path=path)
+
+    assert first.decide(["x" * 60]).engine == AZURE
+    assert second.decide(["x" * 60]).engine == AZURE
+    assert first.decide(["x" * 60]) == RouteDecision(LOCAL, "azure_budget")
+    second.refund(60)
+    assert first.azure_chars == 60
+    first.close()
+    second.close()
+    # The count outlives the routers, so a resumed job keeps its spend.
+    resumed = RoutingPolicy(azure_char_budget=150, budget_path=path)
+    assert resumed.azure_chars == 60
+    resumed.close()
+
+
+def test_policy_follows_observed_latency_and_errors():
+    policy = RoutingPolicy(short_chars=5, long_chars=500, min_samples=2)
+    for _ in range(2):
+        policy.observe(AZURE, 100, 2.0, ok=True)
+        policy.observe(LOCAL, 100, 0.5, ok=True)
+
+    assert policy.decide(["x" * 50]) == RouteDecision(LOCAL, "latency")
+
+    for _ in range(5):
+        policy.observe(LOCAL, 100, 0.5, ok=False)
+    assert policy.observations[LOCAL].error_rate > 0.5
+    assert policy.decide(["word"]) == RouteDecision(AZURE, "local_errors")
+
+
+def test_budget_mode_sends_short_and_long_batches_to_different_engines(monkeypatch):
+    monkeypatch.setenv("AZURE_TRANSLATOR_ENDPOINT", "https://example.invalid")
+    monkeypatch.setenv("AZURE_TRANSLATOR_KEY", "key")
+    monkeypatch.setenv("AZURE_TRANSLATOR_REGION", "region")
+    monkeypatch.setenv("EXCEL_TRANSLATOR_ROUTE_SHORT_CHARS", "10")
+    router = RoutedTranslator("budget")
+    calls = []
+    monkeypatch.setattr(router.azure, "translate_batch", lambda texts, s, t: calls.append(("azure", texts)) or [f"A[{x}]" for x in texts])
+    monkeypatch.setattr(router.local, "translate_batch", lambda texts, s, t: calls.append(("local", texts)) or [f"L[{x}]" for x in texts])
+    prose = "Revenue grew in every region during the quarter. " * 5
+    texts = [prose, "Total", "Region", "Q1"]
+
+    outcomes = translate_texts(router, texts, "en", "fr", max_items=3)
+
+    assert calls == [("local", ["Q1", "Total", "Region"]), ("azure", [prose])]
+    assert [o.engine for o in outcomes] == ["azure", "ollama_gemma", "ollama_gemma", "ollama_gemma"]
+    assert [o.route for o in outcomes] == ["azure:long_text"] + ["local:short_text"] * 3
+    assert router.engine_stats() == {"route_short_text": 1, "route_long_text": 1}
+    assert router.policy.observations[AZURE].samples == 1 and router.policy.azure_chars == len(prose)
+
+
+def test_budget_mode_probes_azure_again_after_the_breaker_reset_timeout(monkeypatch):
+    monkeypatch.setenv("AZURE_TRANSLATOR_ENDPOINT", "https://example.invalid")
+    monkeypatch.setenv("AZURE_TRANSLATOR_KEY", "key")
+    monkeypatch.setenv("AZURE_TRANSLATOR_REGION", "region")
+    monkeypatch.setenv("AZURE_BREAKER_FAILURES", "1")
+    monkeypatch.setenv("AZURE_BREAKER_RESET_SECONDS", "0")
+    router = RoutedTranslator("budget")
+    azure_up = [False]
+
+    def azure(texts, s, t):
+        if not azure_up[0]:
+            raise RuntimeError("Azure down")
+        return [f"A[{x}]" for x in texts]
+
+    monkeypatch.setattr(router.azure, "translate_batch", azure)
+    monkeypatch.setattr(router.local, "translate_batch", lambda texts, s, t: [f"L[{x}]" for x in texts])
+    prose = ["x" * 300]
+
+    assert router.translate_batch_with_engine(prose, "en", "fr")[1] == "ollama_gemma"
+    assert router.azure_breaker.state == OPEN
+    assert router.route_batch(prose).engine == AZURE
+
+    azure_up[0] = True
+    assert router.translate_batch_with_engine(prose, "en", "fr") == (["A[" + prose[0] + "]"], "azure")
+    assert router.azure_breaker.state == CLOSED
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from excel_translator.segmentation import Segmenter, join_pieces
+
+
+def test_short_texts_are_not_split():
+    assert Segmenter(min_chars=50).split("Short note.\nSecond line.") == [("Short note.\nSecond line.", True)]
+    assert Segmenter(min_chars=0).split("x" * 5000) == [("x" * 5000, True)]
+
+
+def test_split_keeps_whitespace_and_line_breaks_out_of_segments():
+    text = "  Payment terms apply.\r\n\r\n\tSee the annex for details. Call us with questions!  \n"
+    pieces = Segmenter(min_chars=10, max_chars=30).split(text)
+
+    assert "".join(value for value, _ in pieces) == text
+    assert pieces == [
+        ("  ", False),
+        ("Payment terms apply.", True),
+        ("\r\n\r\n\t", False),
+        ("See the annex for details.", True),
+        (" ", False),
+        ("Call us with questions!", True),
+        ("  \n", False),
+    ]
+
+
+def test_long_paragraphs_regroup_sentences_and_cut_run_on_text():
+    text = "One. Two. Three. Four. " + "word " * 30
+    pieces = Segmenter(min_chars=10, max_chars=20).split(text)
+
+    assert "".join(value for value, _ in pieces) == text
+    assert all(len(value) <= 20 for value, translatable in pieces if translatable)
+    assert [value for value, translatable in pieces if translatable][:2] == ["One. Two. Three.", "Four."]
+
+
+def test_join_pieces_substitutes_translations_in_order():
+    pieces = Segmenter(min_chars=5, max_chars=10).split("Hello.\n\nWorld.")
+
+    assert join_pieces(pieces, ["Bonjour.", "Monde."]) == "Bonjour.\n\nMonde."
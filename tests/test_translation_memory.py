@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import time
+
+from excel_translator.batching import translate_texts
+from excel_translator.translation_memory import TranslationMemory
+
+
+class _FakeEngine:
+    def __init__(self, engine_name: str, model: str = ""):
+        self.engine_name = engine_name
+        self.model = model
+
+
+class _FakeRouter:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def route_engines(self):
+        return [_FakeEngine("azure"), _FakeEngine("ollama_gemma", "gemma:2b")]
+
+    def translate_batch_with_engine(self, texts, source_lang, target_lang):
+        self.calls.append(list(texts))
+        return [f"T[{text}]" for text in texts], "azure"
+
+
+def test_cached_strings_skip_the_engine_and_are_marked(tmp_path):
+    path = str(tmp_path / "tm.sqlite")
+    with TranslationMemory(path) as memory:
+        translate_texts(_FakeRouter(), ["Total", "Revenue"], "en", "fr", memory=memory)
+
+    router = _FakeRouter()
+    stats: dict = {}
+    with TranslationMemory(path) as memory:
+        outcomes = translate_texts(router, ["Total", "Cost"], "en", "fr", memory=memory, stats=stats)
+        assert memory.stats()["hit_rate"] == 0.5
+
+    assert router.calls == [["Cost"]]
+    assert [(o.text, o.engine) for o in outcomes] == [("T[Total]", "cache:azure"), ("T[Cost]", "azure")]
+    assert stats["cache_hits"] == 1 and stats["cache_misses"] == 1
+
+
+def test_invalidate_by_engine_and_model(tmp_path):
+    with TranslationMemory(str(tmp_path / "tm.sqlite")) as memory:
+        memory.store([("Total", "Gesamt")], "en", "de", "ollama_gemma", "gemma:2b")
+        memory.store([("Total", "Summe")], "en", "de", "ollama_gemma", "gemma:7b")
+        memory.store([("Total", "Insgesamt")], "en", "de", "azure")
+
+        assert memory.invalidate(engine="ollama_gemma", model="gemma:2b") == 1
+        assert memory.lookup(["Total"], "en", "de", [("ollama_gemma", "gemma:2b")]) == {}
+        assert memory.lookup(["Total"], "en", "de", [("ollama_gemma", "gemma:7b"), ("azure", "")]) == {"Total": ("Summe", "ollama_gemma")}
+
+
+def test_eviction_by_size_and_age(tmp_path):
+    path = str(tmp_path / "tm.sqlite")
+    with TranslationMemory(path, max_entries=None) as memory:
+        for idx in range(5):
+            memory.store([(f"text {idx}", f"texte {idx}")], "en", "fr", "azure")
+            time.sleep(0.01)
+
+    with TranslationMemory(path, max_entries=2) as memory:
+        assert memory.stats()["entries"] == 2
+        assert set(memory.lookup(["text 3", "text 4"], "en", "fr", [("azure", "")])) == {"text 3", "text 4"}
+
+    with TranslationMemory(path, max_entries=None, max_age_seconds=0) as memory:
+        assert memory.stats()["entries"] == 0
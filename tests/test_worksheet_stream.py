@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from excel_translator.worksheet_stream import iter_shared_string_refs, iter_string_cells, rewrite_string_cells
+
+SHEET = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<x:worksheet xmlns:x="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    b'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006" mc:Ignorable="x14ac" '
+    b'xmlns:x14ac="http://schemas.microsoft.com/office/spreadsheetml/2009/9/ac">'
+    b'<x:cols><x:col min="1" max="3" width="12"/></x:cols>'
+    b'<x:sheetData><x:row r="1" x14ac:dyDescent="0.25">'
+    b'<x:c r="A1" t="inlineStr"><x:is><x:t>Fish &amp; Chips</x:t></x:is></x:c>'
+    b'<x:c r="B1"><x:v>42</x:v></x:c>'
+    b'<x:c r="C1" t="str"><x:f>CONCAT("a","b")</x:f><x:v>ab</x:v></x:c>'
+    b'<x:c r="D1" t="str"><x:v>Plain text</x:v></x:c>'
+    b'<x:c r="E1" s="3"/>'
+    b'<x:c r="F1" t="inlineStr"><x:is><x:t>   </x:t></x:is></x:c>'
+    b"</x:row></x:sheetData></x:worksheet>"
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_iter_string_cells_finds_inline_and_str_cells(chunk_size):
+    found = list(iter_string_cells(io.BytesIO(SHEET), chunk_size=chunk_size))
+
+    assert found == [(0, "A1", "Fish & Chips"), (2, "D1", "Plain text")]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 13, 1 << 20])
+def test_rewrite_preserves_every_other_byte(chunk_size):
+    out = io.BytesIO()
+    rewrite_string_cells(io.BytesIO(SHEET), out, {0: "Poisson <frit>", 2: " Texte "}, chunk_size=chunk_size)
+
+    expected = SHEET.replace(b"Fish &amp; Chips", b"Poisson &lt;frit&gt;").replace(b"<x:v>Plain text</x:v>", b"<x:v> Texte </x:v>")
+    assert out.getvalue() == expected
+
+
+def test_rewrite_without_replacements_is_identity():
+    out = io.BytesIO()
+    rewrite_string_cells(io.BytesIO(SHEET), out, {}, chunk_size=5)
+
+    assert out.getvalue() == SHEET
+
+
+def test_rewrite_marks_padded_inline_text_as_preserved():
+    sheet = b'<worksheet><sheetData><row><c r="A1" t="inlineStr"><is><t>Hi</t></is></c></row></sheetData></worksheet>'
+    out = io.BytesIO()
+    rewrite_string_cells(io.BytesIO(sheet), out, {0: " Salut "})
+
+    assert b'<t xml:space="preserve"> Salut </t>' in out.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_iter_shared_string_refs_reads_only_shared_string_cells(chunk_size):
+    sheet = (
+        b'<sheetData><row><c r="A1" t="s"><v>3</v></c><c r="B1" t="n"><v>5</v></c>'
+        b'<c r="C1" s="2" t="s"><v>0</v></c><c r="D1" t="s"/><x:c r="E1" t="s"><x:v>12</x:v></x:c></row></sheetData>'
+    )
+
+    assert list(iter_shared_string_refs(io.BytesIO(sheet), chunk_size=chunk_size)) == [3, 0, 12]
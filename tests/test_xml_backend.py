@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from excel_translator import xml_backend
+from excel_translator.xml_backend import get_backend
+
+S_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+SST = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    b'xmlns:x14ac="http://schemas.microsoft.com/office/spreadsheetml/2009/9/ac" count="3" uniqueCount="3">'
+    b"<si><t>One</t></si><si><r><t>Two</t></r><r><t xml:space=\"preserve\"> parts</t></r></si><si><t>Three</t></si></sst>"
+)
+BACKENDS = ["stdlib"] + (["lxml"] if xml_backend.lxml_etree is not None else [])
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+def test_backends_share_the_element_api_and_iterparse(name):
+    backend = get_backend(name)
+    root = backend.fromstring(SST)
+    root.findall(f"{S_NS}si")[0].find(f"{S_NS}t").text = "Eins"
+    reparsed = backend.fromstring(backend.tostring(root))
+    assert [t.text for t in reparsed.iter(f"{S_NS}t")] == ["Eins", "Two", " parts", "Three"]
+
+    items = [[t.text for t in si.iter(f"{S_NS}t")] for si in backend.iterparse(SST, f"{S_NS}si")]
+    assert items == [["One"], ["Two", " parts"], ["Three"]]
+
+    big = b'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">' + b"".join(b"<si><t>%d</t></si>" % i for i in range(10_000)) + b"</sst>"
+    assert [si.find(f"{S_NS}t").text for si in backend.iterparse(big, f"{S_NS}si")] == [str(i) for i in range(10_000)]
+
+
+@pytest.mark.skipif(xml_backend.lxml_etree is None, reason="lxml not installed")
+def test_lxml_keeps_original_prefixes_and_standalone():
+    backend = get_backend("lxml")
+    output = backend.tostring(backend.fromstring(SST))
+    assert output.startswith(b"<?xml version='1.0' encoding='UTF-8' standalone='yes'?>")
+    assert b"xmlns:x14ac=" in output and b"ns0:" not in output
+
+
+def test_backend_selection(monkeypatch):
+    monkeypatch.setenv(xml_backend.XML_BACKEND_ENV, "stdlib")
+    assert get_backend().name == "stdlib"
+    monkeypatch.setenv(xml_backend.XML_BACKEND_ENV, "auto")
+    assert get_backend().name == ("lxml" if xml_backend.lxml_etree is not None else "stdlib")
+    with pytest.raises(ValueError):
+        get_backend("sax")
+    monkeypatch.setattr(xml_backend, "lxml_etree", None)
+    monkeypatch.setattr(xml_backend, "_instances", {})
+    with pytest.raises(ValueError):
+        get_backend("lxml")